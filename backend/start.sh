@@ -21,6 +21,14 @@ venv_new/bin/python manage.py migrate
 echo "Loading sample data..."
 venv_new/bin/python manage.py load_sample_data
 
+# Record the charges since the last start
+echo "Updating the billing ledger..."
+venv_new/bin/python manage.py build_ledger
+
+# Snapshot the days since the last start for the spending trends
+echo "Updating daily stats snapshots..."
+venv_new/bin/python manage.py snapshot_stats
+
 # Start server
 echo
 echo "Starting Django development server..."
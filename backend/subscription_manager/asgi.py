@@ -12,5 +12,8 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'subscription_manager.settings')
+# Each ASGI request runs its sync code in a thread of its own, so a kept
+# connection would never be reused or closed.
+os.environ.setdefault('DB_CONN_MAX_AGE', '0')
 
 application = get_asgi_application()
@@ -10,7 +10,10 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
+from corsheaders.defaults import default_headers
+from django.core.exceptions import ImproperlyConfigured
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -43,6 +46,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'subscriptions.middleware.RequestMetricsMiddleware',
+    'subscriptions.middleware.AsyncRoutingMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -83,6 +88,67 @@ DATABASES = {
     }
 }
 
+# Settings added to the default database by each DB_PROFILE. 'production'
+# tunes SQLite for the single-box deployment:
+# - WAL journal, so reads carry on while a write commits, with
+#   synchronous=NORMAL: fsync at checkpoints only, safe if the app crashes
+#   but a power cut can lose the last commits
+# - 256MB of the file memory-mapped, a 64MB page cache and temp tables in
+#   memory
+# - writers wait up to 5s for the lock instead of failing with "database is
+#   locked", and transactions take the write lock when they begin so a
+#   read-then-write transaction cannot deadlock on upgrading its lock
+# - connections are kept for DB_CONN_MAX_AGE seconds instead of being
+#   opened for every request (asgi.py turns this off: Django does not
+#   reuse connections across ASGI requests)
+DATABASE_PROFILES = {
+    'default': {},
+    'production': {
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 600)),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'init_command': (
+                'PRAGMA journal_mode=WAL;'
+                'PRAGMA synchronous=NORMAL;'
+                'PRAGMA mmap_size=268435456;'
+                'PRAGMA cache_size=-65536;'
+                'PRAGMA temp_store=MEMORY;'
+                'PRAGMA busy_timeout=5000;'
+            ),
+            'transaction_mode': 'IMMEDIATE',
+        },
+    },
+}
+
+DB_PROFILE = os.environ.get('DB_PROFILE', 'default')
+if DB_PROFILE not in DATABASE_PROFILES:
+    raise ImproperlyConfigured(
+        f'Unknown DB_PROFILE {DB_PROFILE!r}; use one of: {", ".join(DATABASE_PROFILES)}'
+    )
+DATABASES['default'].update(DATABASE_PROFILES[DB_PROFILE])
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+# The file-based 'stats' cache is shared by every worker process on the box.
+# Entries expire after TIMEOUT seconds and the cache is culled once it holds
+# MAX_ENTRIES files.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'stats': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache' / 'stats',
+        'TIMEOUT': 300,
+        'OPTIONS': {
+            'MAX_ENTRIES': 500,
+            'CULL_FREQUENCY': 4,
+        },
+    },
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -144,3 +210,16 @@ CORS_ALLOWED_ORIGINS = [
 ]
 
 CORS_ALLOW_CREDENTIALS = True
+
+# Let the frontend make conditional GETs and read the validators
+CORS_ALLOW_HEADERS = (*default_headers, 'if-none-match')
+CORS_EXPOSE_HEADERS = ['ETag', 'Last-Modified']
+
+# Log requests slower than this many milliseconds (None to disable)
+SLOW_REQUEST_THRESHOLD_MS = None
+
+# Serve the read endpoints with the async views under ASGI (see
+# subscriptions.async_views). Off unless ASYNC_READ_VIEWS=1: they measure
+# about half the throughput of the sync views, and the async ORM runs every
+# query on one shared thread, so a slow query stalls all of them.
+ASYNC_READ_VIEWS = os.environ.get('ASYNC_READ_VIEWS') == '1'
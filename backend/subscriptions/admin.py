@@ -1,20 +1,100 @@
-from django.contrib import admin
-from .models import Subscription
+from datetime import date, datetime
+from django.contrib import admin, messages
+from django.core.paginator import Paginator
+from django.db.models import DateField, DurationField, ExpressionWrapper, F, Max, Min, Value
+from django.utils.functional import cached_property
+from .models import Category, Subscription, SubscriptionQuerySet
+from .search import search_subscriptions
+
+
+# Rows counted for the changelist's paginator; larger results show this many
+CHANGELIST_COUNT_LIMIT = 10000
+
+
+class CappedCountPaginator(Paginator):
+    """
+    Paginator that stops counting at CHANGELIST_COUNT_LIMIT rows, so the
+    count query reads a bounded number of index entries however large the
+    table is.
+    """
+    
+    @cached_property
+    def count(self):
+        # Only the primary key, so annotations are not computed for every row
+        return self.object_list.order_by().values('pk')[:CHANGELIST_COUNT_LIMIT].count()
+
+
+class ChangeListQuerySet(SubscriptionQuerySet):
+    """
+    Subscription queryset for the admin changelist.
+    """
+    
+    def aggregate(self, *args, **kwargs):
+        """
+        Run MIN() and MAX() aggregates (the date hierarchy's bounds) as one
+        query each: SQLite only reads them off the end of an index when the
+        query has no other aggregate, and scans the whole index otherwise.
+        """
+        if args or len(kwargs) < 2 or not all(isinstance(value, (Min, Max)) for value in kwargs.values()):
+            return super().aggregate(*args, **kwargs)
+        result = {}
+        for name, value in kwargs.items():
+            result.update(super().aggregate(**{name: value}))
+        return result
+    
+    def dates(self, field_name, kind, order='ASC'):
+        """
+        Get the years, months or days with rows for the date hierarchy by
+        checking each period between the first and last date with an
+        index range query, instead of truncating every row's date.
+        """
+        bounds = self.aggregate(first=Min(field_name), last=Max(field_name))
+        if bounds['first'] is None:
+            return []
+    
+        periods = []
+        period = bounds['first'].replace(day=1) if kind != 'day' else bounds['first']
+        if kind == 'year':
+            period = period.replace(month=1)
+        while period <= bounds['last']:
+            if kind == 'year':
+                following = date(period.year + 1, 1, 1)
+            elif kind == 'month':
+                following = date(period.year + period.month // 12, period.month % 12 + 1, 1)
+            else:
+                following = date.fromordinal(period.toordinal() + 1)
+            if self.filter(**{f'{field_name}__gte': period, f'{field_name}__lt': following}).exists():
+                periods.append(period)
+            period = following
+        return periods if order == 'ASC' else periods[::-1]
 
 
 @admin.register(Subscription)
 class SubscriptionAdmin(admin.ModelAdmin):
     """
     Admin interface for Subscription model with enhanced functionality.
+    
+    Built for large tables: pages are read in renewal_date index order, the
+    result count is capped, filters only offer fixed or small choice lists
+    without facet counts, and searches use the full-text index.
     """
     list_display = [
         'name', 'cost', 'billing_cycle', 'category', 
         'start_date', 'renewal_date', 'is_active', 'days_until_renewal'
     ]
-    list_filter = ['billing_cycle', 'category', 'is_active', 'start_date']
-    search_fields = ['name', 'category']
+    list_filter = ['is_active', 'billing_cycle', 'category']
+    search_fields = ['name', 'category__name']
     list_editable = ['is_active']
+    list_select_related = ['category']
     readonly_fields = ['created_at', 'updated_at', 'renewal_date']
+    date_hierarchy = 'renewal_date'
+    # id makes the ordering unique, so the changelist adds no -pk tiebreaker
+    # and the renewal_date index serves the whole ORDER BY
+    ordering = ['renewal_date', 'id']
+    paginator = CappedCountPaginator
+    show_full_result_count = False
+    show_facets = admin.ShowFacets.NEVER
+    actions = ['deactivate_subscriptions', 'recompute_renewal_dates']
     
     fieldsets = (
         ('Basic Information', {
@@ -29,15 +109,68 @@ class SubscriptionAdmin(admin.ModelAdmin):
         }),
     )
     
+    def get_queryset(self, request):
+        """
+        Annotate days until renewal, computed by the database for the rows
+        of the page only.
+        """
+        today = datetime.now().date()
+        queryset = ChangeListQuerySet(self.model).annotate(
+            days_until_renewal=ExpressionWrapper(
+                F('renewal_date') - Value(today, output_field=DateField()),
+                output_field=DurationField(),
+            )
+        )
+        ordering = self.get_ordering(request)
+        if ordering:
+            queryset = queryset.order_by(*ordering)
+        return queryset
+    
+    def get_search_results(self, request, queryset, search_term):
+        """
+        Search names and categories through the full-text index.
+        """
+        queryset, _ = search_subscriptions(queryset, search_term)
+        return queryset, False
+    
     def days_until_renewal(self, obj):
         """Display days until renewal in admin list."""
-        return obj.days_until_renewal
+        return obj.days_until_renewal.days
     days_until_renewal.short_description = 'Days Until Renewal'
+    days_until_renewal.admin_order_field = 'renewal_date'
+    
+    @admin.action(description='Deactivate selected subscriptions')
+    def deactivate_subscriptions(self, request, queryset):
+        """
+        Soft delete the selected subscriptions with a single UPDATE.
+        """
+        deactivated = queryset.deactivate()
+        self.message_user(request, f'Deactivated {deactivated} subscriptions.', messages.SUCCESS)
+    
+    @admin.action(description='Recompute renewal dates of selected subscriptions')
+    def recompute_renewal_dates(self, request, queryset):
+        """
+        Recalculate the selected renewal dates from their start dates with
+        a single UPDATE.
+        """
+        updated = queryset.recompute_renewal_dates()
+        self.message_user(request, f'Changed {updated} renewal dates.', messages.SUCCESS)
+
+
+@admin.register(Category)
+class CategoryAdmin(admin.ModelAdmin):
+    """
+    Admin interface for categories; the counters are read-only.
+    """
+    list_display = ['name', 'active_count', 'monthly_total']
+    search_fields = ['name']
+    readonly_fields = ['active_count', 'monthly_total']
     
-    def save_model(self, request, obj, form, change):
+    def get_readonly_fields(self, request, obj=None):
         """
-        Override save to ensure renewal_date is calculated.
+        Subscriptions reference categories by name, so an existing name
+        cannot change.
         """
-        if not obj.renewal_date:
-            obj._calculate_renewal_date()
-        super().save_model(request, obj, form, change)
+        if obj is not None:
+            return [*self.readonly_fields, 'name']
+        return self.readonly_fields
@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class SubscriptionsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'subscriptions'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+        from . import checks, signals  # noqa: F401
+        from .metrics import install_sql_wrapper
+
+        connection_created.connect(install_sql_wrapper, dispatch_uid='subscriptions.metrics')
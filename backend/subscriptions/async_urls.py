@@ -0,0 +1,38 @@
+from django.conf import settings
+from django.urls import include, path, re_path
+from . import async_views
+from .urls import router
+
+# Router route name -> async view serving its reads
+ASYNC_READ_VIEWS = {
+    'subscription-list': async_views.subscription_list,
+    'subscription-detail': async_views.subscription_detail,
+    'subscription-stats': async_views.subscription_stats,
+    'subscription-categories': async_views.subscription_categories,
+}
+
+
+def use_async_views(patterns):
+    """
+    Swap the async read views into the router's URL patterns, keeping their
+    regexes, names and order. Format-suffix variants stay on the viewset.
+    """
+    return [
+        re_path(pattern.pattern.regex.pattern, ASYNC_READ_VIEWS[pattern.name], name=pattern.name)
+        if pattern.name in ASYNC_READ_VIEWS and 'format' not in pattern.pattern.regex.groupindex
+        else pattern
+        for pattern in patterns
+    ]
+
+
+# URLconf for ASGI requests: the event stream, the API routes with the
+# async read views when settings.ASYNC_READ_VIEWS is on, then every other
+# route exactly as for WSGI. Route names are unchanged, so metrics and
+# reverse() see the same routes either way.
+urlpatterns = [
+    # Ahead of the router, whose detail route would take "events" as a pk
+    path('api/subscriptions/events/', async_views.subscription_events, name='subscription-events'),
+]
+if settings.ASYNC_READ_VIEWS:
+    urlpatterns.append(path('api/', include(use_async_views(router.urls))))
+urlpatterns.append(path('', include('subscription_manager.urls')))
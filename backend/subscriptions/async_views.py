@@ -0,0 +1,193 @@
+import asyncio
+from datetime import datetime
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.paginator import InvalidPage
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET
+from rest_framework.exceptions import APIException, NotFound
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import api_settings
+
+from .cache import aget_cached_stats, aget_stats_version
+from .events import KEEPALIVE_INTERVAL, RECONNECT_DELAY, SUBSCRIBER_QUEUE_SIZE, Subscriber, broker
+from .models import Subscription
+from .pagination import SubscriptionCursorPagination
+from .stats import category_rows
+from .serializers import SubscriptionSerializer, SubscriptionStatsSerializer, SubscriptionReadSerializer
+from .views import SubscriptionViewSet, add_validators, filter_subscriptions, get_validators, parse_fields
+
+
+# Async versions of the SubscriptionViewSet read endpoints, served to ASGI
+# requests by AsyncRoutingMiddleware when settings.ASYNC_READ_VIEWS is on.
+# Responses are the same as the viewset's, but a request waiting on the
+# database does not hold a worker thread. Writes and every other method
+# still go to the viewset.
+
+READ_METHODS = ('GET', 'HEAD')
+
+# The router's method -> action mappings, for the methods handed back to the viewset
+subscription_list_view = SubscriptionViewSet.as_view({'get': 'list', 'post': 'create'})
+subscription_detail_view = SubscriptionViewSet.as_view({
+    'get': 'retrieve', 'put': 'update', 'patch': 'partial_update', 'delete': 'destroy',
+})
+subscription_stats_view = SubscriptionViewSet.as_view({'get': 'stats'})
+subscription_categories_view = SubscriptionViewSet.as_view({'get': 'categories'})
+
+renderer = JSONRenderer()
+
+
+def render(data, status=200, headers=None):
+    """
+    A JSON response rendered like the viewset's.
+    """
+    return HttpResponse(renderer.render(data), content_type=renderer.media_type, status=status, headers=headers)
+
+
+def read_view(viewset_view):
+    """
+    Serve GET and HEAD with the decorated async view and hand every other
+    method to the (sync) viewset view. API exceptions become error
+    responses, as the viewset's exception handler would make them.
+    """
+    allow = ', '.join(
+        method.upper() for method in SubscriptionViewSet.http_method_names
+        if method in viewset_view.actions or method == 'options'
+        or (method == 'head' and 'get' in viewset_view.actions)
+    )
+    to_viewset = sync_to_async(viewset_view)
+
+    def decorator(view):
+        @csrf_exempt
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            if request.method not in READ_METHODS:
+                return await to_viewset(request, *args, **kwargs)
+            try:
+                response = await view(request, *args, **kwargs)
+            except APIException as exc:
+                detail = exc.detail if isinstance(exc.detail, (list, dict)) else {'detail': exc.detail}
+                response = render(detail, status=exc.status_code)
+            response['Allow'] = allow
+            return response
+        return wrapper
+    return decorator
+
+
+async def not_modified(request):
+    """
+    Get (304 response or None, validators) for a conditional read endpoint.
+    """
+    validators = get_validators(await aget_stats_version(), request, renderer.media_type)
+    etag, last_modified = validators
+    return get_conditional_response(request, etag=etag, last_modified=last_modified), validators
+
+
+async def paginate(request, queryset):
+    """
+    Get (pagination, page of subscriptions) with the pagination the viewset
+    would use: keyset when asked for, page numbers otherwise.
+    """
+    if request.GET.get('pagination') == 'cursor' or 'cursor' in request.GET:
+        pagination = SubscriptionCursorPagination()
+        return pagination, await pagination.apaginate_queryset(queryset, request)
+
+    pagination = api_settings.DEFAULT_PAGINATION_CLASS()
+    paginator = pagination.django_paginator_class(queryset, pagination.page_size)
+    # Count once, asynchronously, instead of in the paginator's cached property
+    paginator.count = await queryset.acount()
+    page_number = request.GET.get(pagination.page_query_param) or 1
+    if page_number in pagination.last_page_strings:
+        page_number = paginator.num_pages
+    try:
+        pagination.page = paginator.page(page_number)
+    except InvalidPage as exc:
+        raise NotFound(pagination.invalid_page_message.format(page_number=page_number, message=str(exc)))
+    pagination.request = request
+    return pagination, [subscription async for subscription in pagination.page.object_list]
+
+
+@read_view(subscription_list_view)
+async def subscription_list(request):
+    response, validators = await not_modified(request)
+    if response is None:
+        context = {'today': datetime.now().date(), 'fields': parse_fields(request.GET)}
+        pagination, page = await paginate(request, filter_subscriptions(request.GET))
+        serializer = SubscriptionReadSerializer(page, many=True, context=context)
+        response = render(pagination.get_paginated_response(serializer.data).data)
+    add_validators(response, validators)
+    return response
+
+
+@read_view(subscription_detail_view)
+async def subscription_detail(request, pk):
+    try:
+        subscription = await filter_subscriptions(request.GET).aget(pk=pk)
+    except Subscription.DoesNotExist:
+        raise NotFound(f'No {Subscription._meta.object_name} matches the given query.')
+    except (TypeError, ValueError, DjangoValidationError):
+        raise NotFound()
+    return render(SubscriptionSerializer(subscription).data)
+
+
+@read_view(subscription_stats_view)
+async def subscription_stats(request):
+    response, validators = await not_modified(request)
+    if response is None:
+        stats_data, hit = await aget_cached_stats()
+        response = render(SubscriptionStatsSerializer(stats_data).data, headers={'X-Cache': 'HIT' if hit else 'MISS'})
+    add_validators(response, validators)
+    return response
+
+
+@read_view(subscription_categories_view)
+async def subscription_categories(request):
+    response, validators = await not_modified(request)
+    if response is None:
+        response = render([row['category'] async for row in category_rows()])
+    add_validators(response, validators)
+    return response
+
+
+@require_GET
+async def subscription_events(request):
+    """
+    Stream subscription changes as Server-Sent Events: created, updated,
+    deactivated and renewal_moved with the subscription and its stats
+    delta, and refresh when many rows changed at once.
+
+    A reconnecting client's Last-Event-ID header (or ?last_event_id=, for
+    the first connection) replays what it missed. Only served over ASGI,
+    where an open stream holds no worker thread.
+    """
+    subscriber = Subscriber(asyncio.get_running_loop(), asyncio.Queue(SUBSCRIBER_QUEUE_SIZE))
+    last_event_id = request.headers.get('Last-Event-ID') or request.GET.get('last_event_id')
+    initial = broker.subscribe(subscriber, last_event_id)
+
+    async def stream():
+        try:
+            yield f'retry: {RECONNECT_DELAY}\n\n'.encode()
+            for message in initial:
+                yield message
+            while not subscriber.overflowed:
+                try:
+                    message = await asyncio.wait_for(subscriber.queue.get(), KEEPALIVE_INTERVAL)
+                except asyncio.TimeoutError:
+                    yield b': keepalive\n\n'
+                    continue
+                if message is None or subscriber.overflowed:
+                    break
+                yield message
+        finally:
+            # Also runs when the client disconnects and the stream is cancelled
+            broker.unsubscribe(subscriber)
+
+    response = StreamingHttpResponse(stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Keep proxies such as nginx from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,405 @@
+import io
+import json
+import statistics
+import time
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client
+from django.test.utils import (
+    CaptureQueriesContext, override_settings, setup_test_environment, teardown_test_environment,
+)
+from rest_framework.settings import api_settings
+
+from .cache import bump_stats_version
+from .models import Subscription
+from .pagination import SubscriptionCursorPagination
+from .serializers import SubscriptionSerializer, SubscriptionReadSerializer
+
+
+# Rows used by the in-process scenarios (renewal dates, serializers)
+SAMPLE_SIZE = 1000
+
+# Slowdowns smaller than this are timer noise, whatever the percentage
+NOISE_FLOOR_MS = 1.0
+
+# Keep benchmark runs away from the shared stats cache of the dev server
+BENCHMARK_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'benchmark-default'},
+    'stats': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'benchmark-stats'},
+}
+
+
+@contextmanager
+def benchmark_database(db_file=None):
+    """
+    Run the block against a throwaway test database (in memory, or in
+    `db_file` for SQLite) with private caches and DEBUG off, as in
+    production, so the query log does not skew the timings.
+    """
+    if db_file:
+        connection.settings_dict['TEST']['NAME'] = db_file
+    setup_test_environment(debug=False)
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        with override_settings(CACHES=BENCHMARK_CACHES):
+            yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+@contextmanager
+def database_profile(name):
+    """
+    Switch the default database to settings.DATABASE_PROFILES[name] for the
+    block, whatever DB_PROFILE the process started with. Connections opened
+    in the block (in any thread) get the profile's options.
+    """
+    database = settings.DATABASES['default']
+    saved = {key: database[key] for key in ('CONN_MAX_AGE', 'CONN_HEALTH_CHECKS', 'OPTIONS')}
+    connection.close()
+    database.update({'CONN_MAX_AGE': 0, 'CONN_HEALTH_CHECKS': False, 'OPTIONS': {}})
+    database.update(settings.DATABASE_PROFILES[name])
+    try:
+        yield
+    finally:
+        connection.close()
+        database.update(saved)
+
+
+def seed_subscriptions(size, seed):
+    """
+    Grow the subscriptions table to `size` rows of generated data. Each
+    step uses its own seed, so growing in steps does not repeat rows.
+    """
+    existing = Subscription.objects.count()
+    if size > existing:
+        call_command(
+            'generate_subscriptions', count=size - existing, seed=seed + existing, stdout=io.StringIO()
+        )
+
+
+def measure(run, repeat, setup=None):
+    """
+    Time `run` `repeat` times after one warm-up call, then count the
+    queries of one more call. `setup` runs untimed before every call.
+    """
+    timings = []
+    for i in range(repeat + 1):
+        if setup:
+            setup()
+        started = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - started
+        if i:
+            timings.append(elapsed * 1000)
+
+    if setup:
+        setup()
+    with CaptureQueriesContext(connection) as queries:
+        run()
+
+    return {
+        'median_ms': round(statistics.median(timings), 3),
+        'min_ms': round(min(timings), 3),
+        'mean_ms': round(statistics.fmean(timings), 3),
+        'queries': len(queries),
+    }
+
+
+def get(client, url):
+    """
+    A GET that fails the benchmark instead of timing an error page.
+    """
+    def run():
+        response = client.get(url)
+        assert response.status_code == 200, f'GET {url} returned {response.status_code}'
+    return run
+
+
+def deep_cursor_url(base_url):
+    """
+    A keyset pagination URL positioned near the end of the list.
+    """
+    active = Subscription.objects.filter(is_active=True).order_by('renewal_date', 'id')
+    position = max(active.count() - api_settings.PAGE_SIZE * 2, 0)
+    subscription = active.only('id', 'renewal_date')[position]
+    paginator = SubscriptionCursorPagination()
+    paginator.base_url = base_url
+    return paginator.encode_cursor(subscription, reverse=False)
+
+
+def run_benchmarks(repeat):
+    """
+    Run every scenario against the current database and return a
+    {scenario: measurements} dict.
+    """
+    client = Client()
+    results = {}
+    active_count = Subscription.objects.filter(is_active=True).count()
+    last_page = max((active_count + api_settings.PAGE_SIZE - 1) // api_settings.PAGE_SIZE, 1)
+
+    results['list first page'] = measure(get(client, '/api/subscriptions/'), repeat)
+    results['list deep page'] = measure(get(client, f'/api/subscriptions/?page={last_page}'), repeat)
+    results['list deep page (cursor)'] = measure(
+        get(client, deep_cursor_url('http://testserver/api/subscriptions/?pagination=cursor')), repeat
+    )
+    results['list by category'] = measure(get(client, '/api/subscriptions/?category=Music'), repeat)
+    # Every write bumps the data version, so a miss is what the first
+    # dashboard load after a change pays
+    results['stats (cache miss)'] = measure(
+        get(client, '/api/subscriptions/stats/'), repeat, setup=bump_stats_version
+    )
+    results['stats (cache hit)'] = measure(get(client, '/api/subscriptions/stats/'), repeat)
+    results['categories'] = measure(get(client, '/api/subscriptions/categories/'), repeat)
+
+    subscription = Subscription.objects.filter(is_active=True).order_by('id').first()
+    renewal_date = (date.today() + timedelta(days=30)).isoformat()
+
+    def update_renewal_date():
+        response = client.patch(
+            f'/api/subscriptions/{subscription.pk}/update_renewal_date/',
+            {'renewal_date': renewal_date},
+            content_type='application/json',
+        )
+        assert response.status_code == 200, f'update_renewal_date returned {response.status_code}'
+    results['update_renewal_date'] = measure(update_renewal_date, repeat)
+
+    def create():
+        response = client.post(
+            '/api/subscriptions/',
+            {
+                'name': 'Benchmark Subscription',
+                'monthly_price': '9.99',
+                'yearly_price': '99.99',
+                'billing_cycle': 'monthly',
+                'start_date': '2021-01-31',
+                'category': 'Software',
+            },
+            content_type='application/json',
+        )
+        assert response.status_code == 201, f'create returned {response.status_code}'
+    results['create'] = measure(create, repeat)
+
+    sample = list(Subscription.objects.order_by('id')[:SAMPLE_SIZE])
+
+    def calculate_renewal_dates():
+        for subscription in sample:
+            subscription.calculate_renewal_date()
+    results[f'calculate_renewal_date x{len(sample)}'] = measure(calculate_renewal_dates, repeat)
+
+    results[f'SubscriptionSerializer x{len(sample)}'] = measure(
+        lambda: SubscriptionSerializer(sample, many=True).data, repeat
+    )
+    results[f'SubscriptionReadSerializer x{len(sample)}'] = measure(
+        lambda: SubscriptionReadSerializer(sample, many=True).data, repeat
+    )
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """
+    List regressions of `results` against `baseline` (both keyed by row
+    count, then scenario): a median slower by more than `tolerance` (a
+    fraction) and by more than NOISE_FLOOR_MS, or any extra query.
+    """
+    regressions = []
+    for rows, scenarios in results.items():
+        for scenario, current in scenarios.items():
+            previous = baseline.get(rows, {}).get(scenario)
+            if previous is None:
+                continue
+            slowdown = current['median_ms'] - previous['median_ms']
+            if slowdown > NOISE_FLOOR_MS and slowdown > previous['median_ms'] * tolerance:
+                regressions.append(
+                    f'{scenario} @ {rows} rows: {previous["median_ms"]:.2f}ms -> {current["median_ms"]:.2f}ms'
+                )
+            if current['queries'] > previous['queries']:
+                regressions.append(
+                    f'{scenario} @ {rows} rows: {previous["queries"]} -> {current["queries"]} queries'
+                )
+    return regressions
+
+
+def load_paths():
+    """
+    The read requests a dashboard makes, for the concurrency benchmarks.
+    """
+    subscription = Subscription.objects.filter(is_active=True).order_by('id').first()
+    paths = [
+        '/api/subscriptions/',
+        '/api/subscriptions/?page=5',
+        '/api/subscriptions/stats/',
+        '/api/subscriptions/categories/',
+    ]
+    if subscription is not None:
+        paths.append(f'/api/subscriptions/{subscription.pk}/')
+    return paths
+
+
+def summarize(latencies, errors, elapsed):
+    latencies = sorted(latencies)
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'throughput_rps': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(latencies[len(latencies) // 2] * 1000, 3),
+        'p99_ms': round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000, 3),
+    }
+
+
+def mixed_requests(count, write_share):
+    """
+    `count` requests of a dashboard under edits: the read mix of
+    load_paths(), with every n-th request a write instead, cycling through
+    renewal date updates, edits, creates and deletes (each of a different
+    subscription).
+    """
+    reads = load_paths()
+    ids = list(Subscription.objects.filter(is_active=True).order_by('id').values_list('id', flat=True))
+    renewal_date = (date.today() + timedelta(days=30)).isoformat()
+    write_every = max(round(1 / write_share), 1) if write_share > 0 else None
+
+    requests = []
+    writes = 0
+    for i in range(count):
+        if write_every is None or i % write_every:
+            requests.append(reads[i % len(reads)])
+            continue
+        pk = ids[writes % len(ids)]
+        kind = writes % 4
+        if kind == 0:
+            requests.append(('PATCH', f'/api/subscriptions/{pk}/update_renewal_date/', {'renewal_date': renewal_date}))
+        elif kind == 1:
+            requests.append(('PATCH', f'/api/subscriptions/{pk}/', {'name': f'Renamed {pk}'}))
+        elif kind == 2:
+            requests.append(('POST', '/api/subscriptions/', {
+                'name': f'Benchmark Subscription {i}',
+                'monthly_price': '9.99',
+                'billing_cycle': 'monthly',
+                'start_date': '2021-01-31',
+                'category': 'Software',
+            }))
+        else:
+            # Deleted subscriptions drop out of the active set, so delete from the far end
+            requests.append(('DELETE', f'/api/subscriptions/{ids[-1 - writes // 4]}/', None))
+        writes += 1
+    return requests
+
+
+def run_wsgi_load(paths, requests, concurrency):
+    """
+    Send `requests` requests round-robin over `paths` to the WSGI
+    application from `concurrency` threads, as a threaded WSGI server
+    would. Paths are GET paths or (method, path, JSON data) tuples.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    from subscription_manager.wsgi import application
+
+    def call(i):
+        request = paths[i % len(paths)]
+        method, path, data = ('GET', request, None) if isinstance(request, str) else request
+        body = b'' if data is None else json.dumps(data).encode()
+        path, _, query = path.partition('?')
+        environ = {
+            'REQUEST_METHOD': method,
+            'PATH_INFO': path,
+            'QUERY_STRING': query,
+            'CONTENT_TYPE': 'application/json',
+            'CONTENT_LENGTH': str(len(body)),
+            'SERVER_NAME': 'testserver',
+            'SERVER_PORT': '80',
+            'SERVER_PROTOCOL': 'HTTP/1.1',
+            'HTTP_HOST': 'testserver',
+            'wsgi.input': io.BytesIO(body),
+            'wsgi.errors': io.StringIO(),
+            'wsgi.url_scheme': 'http',
+            'wsgi.multithread': True,
+            'wsgi.multiprocess': False,
+            'wsgi.run_once': False,
+        }
+        response_status = []
+        started = time.perf_counter()
+        body = application(environ, lambda status, headers: response_status.append(status))
+        try:
+            b''.join(body)
+        finally:
+            body.close()
+        return time.perf_counter() - started, not response_status[0].startswith('2')
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        outcomes = list(executor.map(call, range(requests)))
+    elapsed = time.perf_counter() - started
+    return summarize([latency for latency, _ in outcomes], sum(error for _, error in outcomes), elapsed)
+
+
+def run_asgi_load(paths, requests, concurrency):
+    """
+    Send `requests` GETs round-robin over `paths` to the ASGI application
+    from `concurrency` concurrent tasks on one event loop, as an ASGI
+    server would.
+    """
+    import asyncio
+    from subscription_manager.asgi import application
+
+    async def call(i):
+        path, _, query = paths[i % len(paths)].partition('?')
+        scope = {
+            'type': 'http',
+            'asgi': {'version': '3.0'},
+            'http_version': '1.1',
+            'method': 'GET',
+            'scheme': 'http',
+            'path': path,
+            'raw_path': path.encode(),
+            'query_string': query.encode(),
+            'root_path': '',
+            'headers': [(b'host', b'testserver')],
+            'client': ('127.0.0.1', 50000),
+            'server': ('testserver', 80),
+        }
+        received = False
+
+        async def receive():
+            nonlocal received
+            if not received:
+                received = True
+                return {'type': 'http.request', 'body': b'', 'more_body': False}
+            # The client never disconnects; Django cancels this wait
+            await asyncio.Future()
+
+        response_status = []
+
+        async def send(message):
+            if message['type'] == 'http.response.start':
+                response_status.append(message['status'])
+
+        started = time.perf_counter()
+        await application(scope, receive, send)
+        return time.perf_counter() - started, response_status[0] != 200
+
+    async def worker(queue, outcomes):
+        while True:
+            try:
+                i = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            outcomes.append(await call(i))
+
+    async def main():
+        queue = asyncio.Queue()
+        for i in range(requests):
+            queue.put_nowait(i)
+        outcomes = []
+        await asyncio.gather(*(worker(queue, outcomes) for _ in range(concurrency)))
+        return outcomes
+
+    started = time.perf_counter()
+    outcomes = asyncio.run(main())
+    elapsed = time.perf_counter() - started
+    return summarize([latency for latency, _ in outcomes], sum(error for _, error in outcomes), elapsed)
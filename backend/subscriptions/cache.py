@@ -0,0 +1,123 @@
+import time
+from datetime import datetime
+from asgiref.sync import sync_to_async
+from django.core.cache import caches
+
+
+STATS_CACHE_ALIAS = 'stats'
+
+VERSION_KEY = 'stats:version'
+HITS_KEY = 'stats:hits'
+MISSES_KEY = 'stats:misses'
+
+
+def get_stats_cache():
+    return caches[STATS_CACHE_ALIAS]
+
+
+def get_stats_version():
+    """
+    Get the current write version of the subscriptions data.
+    A missing version (first use, or evicted) starts a new one.
+    """
+    version = get_stats_cache().get(VERSION_KEY)
+    if version is None:
+        version = bump_stats_version()
+    return version
+
+
+async def aget_stats_version():
+    """
+    Async version of get_stats_version.
+    """
+    version = await get_stats_cache().aget(VERSION_KEY)
+    if version is None:
+        version = await sync_to_async(bump_stats_version)()
+    return version
+
+
+def bump_stats_version():
+    """
+    Invalidate every cached stats entry by moving to a new version.
+
+    The version is a nanosecond timestamp rather than a counter, so two
+    processes bumping at once can never both land on the same old value.
+    """
+    version = time.time_ns()
+    get_stats_cache().set(VERSION_KEY, version, timeout=None)
+    return version
+
+
+def get_cached_stats(today=None):
+    """
+    Get stats for the current data version, computing them on a miss.
+    Returns a (stats_data, hit) tuple.
+    """
+    from .stats import compute_stats
+
+    if today is None:
+        today = datetime.now().date()
+
+    # Upcoming renewals and day counts depend on the date as well as the data
+    cache = get_stats_cache()
+    key = f'stats:{get_stats_version()}:{today.isoformat()}'
+
+    stats_data = cache.get(key)
+    if stats_data is not None:
+        _increment(HITS_KEY)
+        return stats_data, True
+
+    stats_data = compute_stats(today)
+    cache.set(key, stats_data)
+    _increment(MISSES_KEY)
+    return stats_data, False
+
+
+async def aget_cached_stats(today=None):
+    """
+    Async version of get_cached_stats.
+    """
+    from .stats import acompute_stats
+
+    if today is None:
+        today = datetime.now().date()
+
+    cache = get_stats_cache()
+    key = f'stats:{await aget_stats_version()}:{today.isoformat()}'
+
+    stats_data = await cache.aget(key)
+    if stats_data is not None:
+        await _aincrement(HITS_KEY)
+        return stats_data, True
+
+    stats_data = await acompute_stats(today)
+    await cache.aset(key, stats_data)
+    await _aincrement(MISSES_KEY)
+    return stats_data, False
+
+
+def get_cache_counters():
+    """
+    Get the stats cache hit/miss counters shared by all processes.
+    """
+    cache = get_stats_cache()
+    counters = cache.get_many([HITS_KEY, MISSES_KEY, VERSION_KEY])
+    return {
+        'hits': counters.get(HITS_KEY, 0),
+        'misses': counters.get(MISSES_KEY, 0),
+        'version': counters.get(VERSION_KEY),
+    }
+
+
+def _increment(key):
+    cache = get_stats_cache()
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # The counter was culled between add() and incr()
+        cache.set(key, 1, timeout=None)
+
+
+async def _aincrement(key):
+    await sync_to_async(_increment)(key)
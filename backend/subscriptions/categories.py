@@ -0,0 +1,66 @@
+"""
+Per-category counters: how many subscriptions of each category are active
+and what they cost per month.
+
+On SQLite, triggers on the subscriptions table keep Category.active_count
+and Category.monthly_total current. They run inside the statement that
+changes the subscription, so the counters commit or roll back with it, and
+they also see bulk_create(), queryset updates and soft deletes. Reading the
+category list or breakdown is then a scan of the small categories table.
+
+Other databases group the subscriptions table instead (see
+stats.category_rows).
+
+The SQL below is the current definition of the triggers. Migrations keep
+their own copies, so a change here needs a new migration; checks.py
+reports a database that lost them.
+"""
+
+
+CATEGORY_TABLE = 'subscriptions_category'
+SUBSCRIPTION_TABLE = 'subscriptions_subscription'
+
+# Costs are rounded to the 6 decimal places the ORM reads them with, and
+# totals back to 6 places after every change, so totals are exact sums and
+# float arithmetic never accumulates error
+ADD_SUBSCRIPTION = f"""
+    UPDATE {CATEGORY_TABLE}
+    SET active_count = active_count + 1,
+        monthly_total = ROUND(monthly_total + ROUND(new.monthly_equivalent_cost, 6), 6)
+    WHERE name = new.category
+"""
+REMOVE_SUBSCRIPTION = f"""
+    UPDATE {CATEGORY_TABLE}
+    SET active_count = active_count - 1,
+        monthly_total = ROUND(monthly_total - ROUND(old.monthly_equivalent_cost, 6), 6)
+    WHERE name = old.category
+"""
+
+# monthly_equivalent_cost is generated from billing_cycle, cost and yearly_price
+CREATE_COUNTER_TRIGGERS = [
+    f"""
+    CREATE TRIGGER {CATEGORY_TABLE}_count_insert AFTER INSERT ON {SUBSCRIPTION_TABLE}
+    WHEN new.is_active BEGIN
+        {ADD_SUBSCRIPTION};
+    END
+    """,
+    f"""
+    CREATE TRIGGER {CATEGORY_TABLE}_count_delete AFTER DELETE ON {SUBSCRIPTION_TABLE}
+    WHEN old.is_active BEGIN
+        {REMOVE_SUBSCRIPTION};
+    END
+    """,
+    f"""
+    CREATE TRIGGER {CATEGORY_TABLE}_count_update
+    AFTER UPDATE OF is_active, category, billing_cycle, cost, yearly_price ON {SUBSCRIPTION_TABLE}
+    BEGIN
+        {REMOVE_SUBSCRIPTION} AND old.is_active;
+        {ADD_SUBSCRIPTION} AND new.is_active;
+    END
+    """,
+]
+
+COUNTER_TRIGGERS = [f'{CATEGORY_TABLE}_count_{event}' for event in ('insert', 'delete', 'update')]
+
+DROP_COUNTER_TRIGGERS = [f'DROP TRIGGER IF EXISTS {trigger}' for trigger in COUNTER_TRIGGERS]
+
@@ -0,0 +1,64 @@
+"""
+System checks for the database objects the ORM does not manage.
+
+The search table and the triggers behind search and the category counters
+are created by migrations 0008 and 0009 on SQLite. Rebuilding the
+subscriptions table outside those migrations drops the triggers without
+any error, after which search and the counters silently go stale; this
+check reports it. Like every database check, it runs with migrate and
+"check --database"; it only warns, so migrate can still apply a migration
+putting them back.
+"""
+from django.core.checks import Tags, Warning, register
+from django.db import connections
+from django.db.migrations.recorder import MigrationRecorder
+
+from .categories import COUNTER_TRIGGERS
+from .search import SEARCH_TABLE, SEARCH_TRIGGERS
+
+
+# Migration -> the objects it leaves in sqlite_master
+MIGRATION_OBJECTS = {
+    '0008_subscription_search_index': [SEARCH_TABLE, *SEARCH_TRIGGERS],
+    '0009_category_table': COUNTER_TRIGGERS,
+}
+
+
+@register(Tags.database)
+def check_database_objects(app_configs, databases=None, **kwargs):
+    """
+    Report search and counter objects missing from a SQLite database that
+    has applied the migrations creating them.
+    """
+    errors = []
+    for alias in databases or []:
+        connection = connections[alias]
+        if connection.vendor != 'sqlite':
+            continue
+        applied = MigrationRecorder(connection).applied_migrations()
+        expected = [
+            name
+            for migration, names in MIGRATION_OBJECTS.items()
+            if ('subscriptions', migration) in applied
+            for name in names
+        ]
+        if not expected:
+            continue
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT name FROM sqlite_master WHERE name IN ({', '.join(['%s'] * len(expected))})",
+                expected,
+            )
+            present = {name for name, in cursor.fetchall()}
+        errors.extend(
+            Warning(
+                f'{name} is missing from the {alias!r} database.',
+                hint='Search and the category counters are stale without it. Recreate it from '
+                     'subscriptions/search.py or subscriptions/categories.py.',
+                obj=alias,
+                id='subscriptions.W001',
+            )
+            for name in expected
+            if name not in present
+        )
+    return errors
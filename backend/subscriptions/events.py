@@ -0,0 +1,171 @@
+"""
+Live change events for the Server-Sent Events stream.
+
+Subscription signals publish an event for every committed change to one
+subscription (created, updated, deactivated, renewal_moved) with the row
+and its stats delta (see stats.stats_delta). Writes that change many rows
+at once publish a single refresh event, after which clients re-fetch.
+
+The broker lives in the process serving the stream: each connected client
+is an asyncio queue, so an idle client costs no thread and no database
+work. Every event is rendered once and fanned out as the same bytes, and
+not at all while no client is connected (always, under WSGI). A bounded
+history lets a reconnecting client resume after its Last-Event-ID; older
+or unknown ids (another process, or a restart) get a refresh event.
+"""
+import threading
+import time
+from collections import deque
+from functools import partial
+
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+
+# Events kept for clients resuming from a Last-Event-ID
+EVENT_HISTORY_SIZE = 1000
+
+# Events waiting for one client before it is disconnected to catch up
+# from the history on reconnect
+SUBSCRIBER_QUEUE_SIZE = 100
+
+# Seconds between comment lines keeping idle connections open
+KEEPALIVE_INTERVAL = 15
+
+# Milliseconds browsers wait before reconnecting
+RECONNECT_DELAY = 3000
+
+REFRESH_EVENT = 'refresh'
+
+renderer = JSONRenderer()
+
+
+def format_event(event, data, event_id=None):
+    """
+    Encode one event as a text/event-stream message.
+    """
+    lines = [] if event_id is None else [f'id: {event_id}']
+    lines.append(f'event: {event}')
+    lines.append(f'data: {renderer.render(data).decode()}')
+    return ('\n'.join(lines) + '\n\n').encode()
+
+
+class Subscriber:
+    """
+    One connected client's queue of encoded events, filled from any thread
+    and read on the client's event loop.
+    """
+
+    def __init__(self, loop, queue):
+        self.loop = loop
+        self.queue = queue
+        # Set when the client falls too far behind; its stream then ends
+        # and the client resumes from the history
+        self.overflowed = False
+
+    def deliver(self, message):
+        try:
+            self.loop.call_soon_threadsafe(self._put, message)
+        except RuntimeError:
+            # The client's event loop is closed
+            self.overflowed = True
+
+    def _put(self, message):
+        if self.overflowed:
+            return
+        if self.queue.full():
+            self.overflowed = True
+            # Wake the reader so it notices
+            self.queue.get_nowait()
+            self.queue.put_nowait(None)
+            return
+        self.queue.put_nowait(message)
+
+
+class EventBroker:
+    """
+    In-process publish/subscribe of encoded events with a replay history.
+
+    Event ids are "<epoch>-<sequence>": the epoch is the broker's creation
+    time, so ids from another process or an earlier run are recognized as
+    unknown instead of being confused with this broker's.
+    """
+
+    def __init__(self, history_size=EVENT_HISTORY_SIZE):
+        self.epoch = time.time_ns()
+        self.sequence = 0
+        self.history = deque(maxlen=history_size)
+        self.subscribers = set()
+        self.lock = threading.Lock()
+
+    def publish(self, event, data):
+        """
+        Send an event to every connected client and keep it for resuming
+        ones. data may be a function making it, called only if a client is
+        connected. Safe to call from any thread.
+        """
+        with self.lock:
+            self.sequence += 1
+            if not self.subscribers:
+                # Not kept either, so clients resuming from before this
+                # event cannot be caught up and get a refresh instead
+                self.history.clear()
+                return
+            if callable(data):
+                data = data()
+            message = format_event(event, data, f'{self.epoch}-{self.sequence}')
+            self.history.append((self.sequence, message))
+            subscribers = list(self.subscribers)
+        for subscriber in subscribers:
+            subscriber.deliver(message)
+
+    def subscribe(self, subscriber, last_event_id=None):
+        """
+        Connect a client. Returns the messages to send it first: the events
+        it missed after last_event_id, a refresh event if those are no
+        longer known, or for a new client just the current event id, so it
+        can resume from there even if it hears nothing before reconnecting.
+        """
+        with self.lock:
+            self.subscribers.add(subscriber)
+            current_id = f'{self.epoch}-{self.sequence}'
+            if not last_event_id:
+                return [f'id: {current_id}\n\n'.encode()]
+            sequence = self.parse_event_id(last_event_id)
+            oldest = self.history[0][0] if self.history else self.sequence + 1
+            if sequence is None or sequence > self.sequence or sequence < oldest - 1:
+                return [format_event(REFRESH_EVENT, {}, current_id)]
+            return [message for message_sequence, message in self.history if message_sequence > sequence]
+
+    def unsubscribe(self, subscriber):
+        with self.lock:
+            self.subscribers.discard(subscriber)
+
+    def parse_event_id(self, event_id):
+        """
+        Get the sequence number of one of this broker's event ids, or None.
+        """
+        epoch, _, sequence = event_id.partition('-')
+        if epoch != str(self.epoch) or not sequence.isdigit():
+            return None
+        return int(sequence)
+
+
+broker = EventBroker()
+
+
+def publish_on_commit(event, data):
+    """
+    Publish an event once the current transaction commits, so clients
+    never hear of changes that are rolled back (immediately outside one).
+    data may be a function making it, as for EventBroker.publish.
+    """
+    transaction.on_commit(partial(broker.publish, event, data))
+
+
+def publish_refresh():
+    """
+    Tell clients that many subscriptions changed at once and they should
+    re-fetch what they show.
+    """
+    publish_on_commit(REFRESH_EVENT, {})
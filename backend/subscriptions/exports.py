@@ -0,0 +1,85 @@
+import csv
+import io
+import json
+from datetime import datetime
+
+
+EXPORT_COLUMNS = [
+    'id', 'name', 'monthly_price', 'yearly_price', 'cost', 'billing_cycle',
+    'start_date', 'renewal_date', 'is_active', 'category', 'created_at',
+    'updated_at', 'monthly_equivalent_cost', 'yearly_equivalent_cost',
+    'days_until_renewal',
+]
+
+# Rows fetched per database round trip and written per chunk of output
+EXPORT_CHUNK_SIZE = 2000
+
+
+def export_rows(queryset, today=None):
+    """
+    Stream (column -> value) rows for a subscription queryset, including the
+    computed columns, without loading the queryset into memory.
+    """
+    if today is None:
+        today = datetime.now().date()
+
+    rows = queryset.values_list(*EXPORT_COLUMNS[:-1])
+
+    for row in rows.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        values = dict(zip(EXPORT_COLUMNS, row))
+        values['monthly_equivalent_cost'] = float(values['monthly_equivalent_cost'])
+        values['yearly_equivalent_cost'] = float(values['yearly_equivalent_cost'])
+        values['days_until_renewal'] = (values['renewal_date'] - today).days
+        yield values
+
+
+def _chunks(rows):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == EXPORT_CHUNK_SIZE:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _format(value):
+    if value is None:
+        return None
+    if isinstance(value, (int, float, bool)):
+        return value
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    # Decimals are written as strings, matching the JSON API
+    return str(value)
+
+
+def stream_csv(rows):
+    """
+    Yield CSV text: a header line, then one chunk of lines at a time.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    yield buffer.getvalue()
+
+    for chunk in _chunks(rows):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(
+            ['' if value is None else _format(value) for value in row.values()]
+            for row in chunk
+        )
+        yield buffer.getvalue()
+
+
+def stream_ndjson(rows):
+    """
+    Yield newline-delimited JSON, one object per subscription.
+    """
+    for chunk in _chunks(rows):
+        yield ''.join(
+            json.dumps({column: _format(value) for column, value in row.items()}) + '\n'
+            for row in chunk
+        )
@@ -0,0 +1,148 @@
+"""
+Cash-flow forecast: every charge of the active subscriptions over the next
+months, totalled per day, week or month and per category.
+
+The columns needed are loaded once into arrays and each subscription's
+charges are expanded with the vectorized month arithmetic of
+``renewals.add_months_array``, so the cost grows with the number of charges
+rather than with Python work per subscription.
+"""
+from datetime import datetime
+
+import numpy as np
+from django.db.models import CharField, FloatField
+from django.db.models.functions import Cast
+
+from .models import Subscription
+from .renewals import add_months_array, cycle_steps, next_renewal_dates
+
+
+# Period lengths for forecasts and trends
+GRANULARITIES = ('day', 'week', 'month')
+FORECAST_MAX_HORIZON = 60
+
+# Same bucket as the stats category breakdown
+UNCATEGORIZED = 'Uncategorized'
+
+
+def period_starts(dates, granularity):
+    """
+    Get the first day of the day/week (Monday)/month period of each date in
+    a datetime64[D] array.
+    """
+    if granularity == 'month':
+        return dates.astype('datetime64[M]').astype('datetime64[D]')
+    if granularity == 'week':
+        # 1970-01-01 was a Thursday, three days after a Monday
+        weekdays = (dates.astype(np.int64) + 3) % 7
+        return dates - weekdays.astype('timedelta64[D]')
+    return dates
+
+
+def expand_charges(start_dates, renewal_dates, steps, end):
+    """
+    Get (row index, charge date) arrays of every charge before end.
+
+    The first charge of each row is its renewal date, which may have been
+    set by hand. Later charges follow the start date schedule, so a renewal
+    on the 31st still comes back to the 31st after shorter months.
+    """
+    rows = [np.array([], dtype=np.int64)]
+    dates = [np.array([], dtype='datetime64[D]')]
+    for step in np.unique(steps):
+        selected = np.flatnonzero(steps == step)
+        renewals = renewal_dates[selected]
+        starts = start_dates[selected]
+        # Schedule cycle the renewal falls in; later charges are the cycles after it
+        cycles = (
+            renewals.astype('datetime64[M]') - starts.astype('datetime64[M]')
+        ).astype(np.int64) // step
+        # Charges a row can have before end, counting from its first charge
+        months = (end.astype('datetime64[M]') - renewals.min().astype('datetime64[M]')).astype(np.int64)
+        count = max(1, int(months) // step + 1)
+
+        # One row per subscription, one column per charge
+        offsets = np.arange(1, count, dtype=np.int64)
+        later = add_months_array(starts[:, np.newaxis], (cycles[:, np.newaxis] + offsets) * step)
+        step_dates = np.column_stack([renewals, later])
+        due = step_dates < end
+        rows.append(np.broadcast_to(selected[:, np.newaxis], due.shape)[due])
+        dates.append(step_dates[due])
+    return np.concatenate(rows), np.concatenate(dates)
+
+
+def compute_forecast(horizon, granularity, category=None, today=None):
+    """
+    Build the forecast of the charges from today (included) up to the same
+    day horizon months later (excluded).
+    """
+    if today is None:
+        today = datetime.now().date()
+    start = np.datetime64(today, 'D')
+    end = add_months_array(np.array([start]), np.array([horizon]))[0]
+
+    queryset = Subscription.objects.filter(is_active=True)
+    if category:
+        queryset = queryset.filter(category=category)
+    # Dates as ISO strings and costs as floats skip the per-row date and
+    # Decimal converters; NumPy parses whole columns of them at once.
+    rows = list(queryset.order_by().values_list(
+        Cast('start_date', CharField()),
+        Cast('renewal_date', CharField()),
+        'billing_cycle',
+        Cast('cost', FloatField()),
+        'category',
+    ))
+
+    periods = np.arange(period_starts(np.array([start]), granularity)[0], end, dtype='datetime64[D]')
+    if granularity != 'day':
+        periods = np.unique(period_starts(periods, granularity))
+
+    columns = list(zip(*rows)) or [()] * 5
+    start_dates = np.array(columns[0], dtype='datetime64[D]')
+    renewal_dates = np.array(columns[1], dtype='datetime64[D]')
+    billing_cycles = np.array(columns[2], dtype=str)
+    steps = cycle_steps(billing_cycles)
+    # Whole cents, so totals add up exactly
+    cents = np.rint(np.array(columns[3], dtype=np.float64) * 100).astype(np.int64)
+    category_names, category_index = np.unique(
+        np.array([name or UNCATEGORIZED for name in columns[4]], dtype=str), return_inverse=True
+    )
+
+    # Renewal dates roll_renewals has not moved forward yet
+    stale = renewal_dates < start
+    if stale.any():
+        renewal_dates[stale] = next_renewal_dates(start_dates[stale], billing_cycles[stale], today)
+
+    charge_rows, charge_dates = expand_charges(start_dates, renewal_dates, steps, end)
+    period_index = np.searchsorted(periods, period_starts(charge_dates, granularity))
+
+    # One cell per (period, category)
+    cells = period_index * len(category_names) + category_index[charge_rows]
+    shape = (len(periods), len(category_names))
+    cell_cents = np.bincount(cells, weights=cents[charge_rows], minlength=shape[0] * shape[1]).reshape(shape)
+    cell_cents = np.rint(cell_cents).astype(np.int64)
+    period_charges = np.bincount(period_index, minlength=len(periods))
+
+    names = category_names.tolist()
+    return {
+        'start': today,
+        'end': end.item(),
+        'horizon': horizon,
+        'granularity': granularity,
+        'category': category,
+        'total': int(cell_cents.sum()) / 100,
+        'total_charges': len(charge_dates),
+        'category_totals': {
+            name: int(total) / 100 for name, total in zip(names, cell_cents.sum(axis=0).tolist())
+        },
+        'periods': [
+            {
+                'start': period,
+                'total': sum(totals) / 100,
+                'charges': charges,
+                'categories': {name: total / 100 for name, total in zip(names, totals) if total},
+            }
+            for period, totals, charges in zip(periods.tolist(), cell_cents.tolist(), period_charges.tolist())
+        ],
+    }
@@ -0,0 +1,93 @@
+import json
+import platform
+from datetime import datetime
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from subscriptions.benchmarks import benchmark_database, compare, run_benchmarks, seed_subscriptions
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark the API hot paths against a throwaway test database seeded '
+        'with generated subscriptions, and optionally compare with a baseline'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rows',
+            type=int,
+            nargs='+',
+            default=[10000],
+            help='Database sizes to benchmark, e.g. --rows 10000 100000 1000000',
+        )
+        parser.add_argument('--repeat', type=int, default=5, help='Timed runs per scenario')
+        parser.add_argument('--seed', type=int, default=42, help='Seed for the generated data')
+        parser.add_argument('--output', help='Write the JSON results to this file instead of stdout')
+        parser.add_argument('--baseline', help='JSON results of an earlier run to compare against')
+        parser.add_argument(
+            '--tolerance',
+            type=float,
+            default=0.2,
+            help='Allowed slowdown against the baseline as a fraction (default 0.2)',
+        )
+        parser.add_argument(
+            '--db-file',
+            help='Put the test database in this file instead of in memory (SQLite)',
+        )
+
+    def handle(self, *args, **options):
+        """
+        Seed the test database up to each requested size in turn (smallest
+        first, so each size adds to the previous one) and run the scenarios.
+        """
+        sizes = sorted(set(options['rows']))
+        if sizes[0] < 1 or options['repeat'] < 1:
+            raise CommandError('--rows and --repeat must be at least 1')
+
+        baseline = None
+        if options['baseline']:
+            try:
+                with open(options['baseline']) as f:
+                    baseline = json.load(f)['results']
+            except (OSError, ValueError, KeyError) as e:
+                raise CommandError(f'Cannot read baseline {options["baseline"]}: {e}')
+
+        results = {}
+        with benchmark_database(options['db_file']):
+            for size in sizes:
+                self.stderr.write(f'Seeding up to {size} subscriptions...')
+                seed_subscriptions(size, options['seed'])
+                self.stderr.write(f'Benchmarking {size} rows...')
+                results[str(size)] = run_benchmarks(options['repeat'])
+
+        database = connection.vendor
+        if connection.vendor == 'sqlite':
+            database += f' {connection.Database.sqlite_version}'
+        report = {
+            'meta': {
+                'created': datetime.now().isoformat(timespec='seconds'),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': database,
+                'repeat': options['repeat'],
+                'seed': options['seed'],
+            },
+            'results': results,
+        }
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(output + '\n')
+            self.stderr.write(f'Results written to {options["output"]}')
+        else:
+            self.stdout.write(output)
+
+        if baseline is not None:
+            regressions = compare(results, baseline, options['tolerance'])
+            if regressions:
+                for regression in regressions:
+                    self.stderr.write(self.style.ERROR(regression))
+                raise CommandError(f'{len(regressions)} regressions against {options["baseline"]}')
+            self.stderr.write(self.style.SUCCESS(f'No regressions against {options["baseline"]}'))
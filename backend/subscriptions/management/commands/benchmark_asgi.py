@@ -0,0 +1,78 @@
+import json
+import platform
+from datetime import datetime
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from subscriptions.benchmarks import (
+    benchmark_database, load_paths, run_asgi_load, run_wsgi_load, seed_subscriptions,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare throughput and latency of the read endpoints under concurrent '
+        'load through the WSGI application (sync views) and the ASGI application '
+        '(async views), against a throwaway test database'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10000, help='Subscriptions to seed')
+        parser.add_argument('--requests', type=int, default=2000, help='Requests per run')
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            nargs='+',
+            default=[1, 10, 50],
+            help='Concurrent clients, one run per value',
+        )
+        parser.add_argument('--seed', type=int, default=42, help='Seed for the generated data')
+        parser.add_argument('--output', help='Write the JSON results to this file instead of stdout')
+        parser.add_argument(
+            '--db-file',
+            help='Put the test database in this file instead of in memory (SQLite)',
+        )
+
+    def handle(self, *args, **options):
+        """
+        Run the same request mix through both entry points at each
+        concurrency level and report throughput, p50 and p99 latency.
+        """
+        if options['rows'] < 1 or options['requests'] < 1 or min(options['concurrency']) < 1:
+            raise CommandError('--rows, --requests and --concurrency must be at least 1')
+
+        results = {'wsgi': {}, 'asgi': {}}
+        with benchmark_database(options['db_file']):
+            self.stderr.write(f'Seeding {options["rows"]} subscriptions...')
+            seed_subscriptions(options['rows'], options['seed'])
+            paths = load_paths()
+
+            for concurrency in options['concurrency']:
+                for server, run in (('wsgi', run_wsgi_load), ('asgi', run_asgi_load)):
+                    # One untimed pass warms caches and imports
+                    run(paths, len(paths), 1)
+                    result = run(paths, options['requests'], concurrency)
+                    results[server][str(concurrency)] = result
+                    self.stderr.write(
+                        f'{server} x{concurrency}: {result["throughput_rps"]} req/s, '
+                        f'p50 {result["p50_ms"]}ms, p99 {result["p99_ms"]}ms, {result["errors"]} errors'
+                    )
+
+        report = {
+            'meta': {
+                'created': datetime.now().isoformat(timespec='seconds'),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'rows': options['rows'],
+                'requests': options['requests'],
+                'paths': paths,
+            },
+            'results': results,
+        }
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(output + '\n')
+            self.stderr.write(f'Results written to {options["output"]}')
+        else:
+            self.stdout.write(output)
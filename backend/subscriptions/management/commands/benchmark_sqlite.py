@@ -0,0 +1,88 @@
+import json
+import os
+import tempfile
+from datetime import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from subscriptions.benchmarks import (
+    benchmark_database, database_profile, mixed_requests, run_wsgi_load, seed_subscriptions,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare mixed read/write throughput through the WSGI application under '
+        'each SQLite DB_PROFILE, on throwaway database files'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--profiles',
+            nargs='+',
+            default=list(settings.DATABASE_PROFILES),
+            choices=list(settings.DATABASE_PROFILES),
+            help='Database profiles to compare (default: all)',
+        )
+        parser.add_argument('--rows', type=int, default=10000, help='Subscriptions to seed')
+        parser.add_argument('--requests', type=int, default=2000, help='Requests per run')
+        parser.add_argument('--concurrency', type=int, default=8, help='Concurrent clients')
+        parser.add_argument(
+            '--write-share',
+            type=float,
+            default=0.2,
+            help='Share of requests that write (default 0.2)',
+        )
+        parser.add_argument('--seed', type=int, default=42, help='Seed for the generated data')
+        parser.add_argument('--output', help='Write the JSON results to this file instead of stdout')
+
+    def handle(self, *args, **options):
+        """
+        Seed a fresh database file per profile (journal mode is stored in
+        the file) and send it the same request mix.
+        """
+        if connection.vendor != 'sqlite':
+            raise CommandError('The database profiles are SQLite settings')
+        if options['rows'] < 1 or options['requests'] < 1 or options['concurrency'] < 1:
+            raise CommandError('--rows, --requests and --concurrency must be at least 1')
+        if not 0 <= options['write_share'] <= 1:
+            raise CommandError('--write-share must be between 0 and 1')
+
+        results = {}
+        with tempfile.TemporaryDirectory() as directory:
+            for profile in options['profiles']:
+                with database_profile(profile), benchmark_database(os.path.join(directory, f'{profile}.sqlite3')):
+                    self.stderr.write(f'Seeding {options["rows"]} subscriptions ({profile})...')
+                    seed_subscriptions(options['rows'], options['seed'])
+                    with connection.cursor() as cursor:
+                        cursor.execute('PRAGMA journal_mode')
+                        journal_mode = cursor.fetchone()[0]
+
+                    requests = mixed_requests(options['requests'], options['write_share'])
+                    result = run_wsgi_load(requests, len(requests), options['concurrency'])
+                    result['journal_mode'] = journal_mode
+                    results[profile] = result
+                    self.stderr.write(
+                        f'{profile} ({journal_mode}): {result["throughput_rps"]} req/s, '
+                        f'p50 {result["p50_ms"]}ms, p99 {result["p99_ms"]}ms, {result["errors"]} errors'
+                    )
+
+        report = {
+            'meta': {
+                'created': datetime.now().isoformat(timespec='seconds'),
+                'sqlite': connection.Database.sqlite_version,
+                'rows': options['rows'],
+                'requests': options['requests'],
+                'concurrency': options['concurrency'],
+                'write_share': options['write_share'],
+            },
+            'results': results,
+        }
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(output + '\n')
+            self.stderr.write(f'Results written to {options["output"]}')
+        else:
+            self.stdout.write(output)
@@ -0,0 +1,134 @@
+import time
+from datetime import date, timedelta
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from subscriptions.cache import bump_stats_version
+from subscriptions.models import BillingEvent, Subscription, IN_CLAUSE_SIZE
+from subscriptions.renewals import billing_dates_between, cycle_steps
+
+
+class Command(BaseCommand):
+    help = 'Append billing events for the charges since each subscription was last billed'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=5000,
+            help='Number of subscriptions billed and written per transaction',
+        )
+        parser.add_argument(
+            '--date',
+            help='Bill up to this date (YYYY-MM-DD) instead of today',
+        )
+        parser.add_argument(
+            '--rebuild',
+            action='store_true',
+            help='Delete the ledger and bill every subscription from its start date again',
+        )
+
+    def handle(self, *args, **options):
+        """
+        Extend the ledger of every subscription from its watermark
+        (billed_through) up to today, one chunk at a time.
+
+        A subscription is charged on its start date and then on every
+        renewal until it is deactivated. Each chunk's events and watermarks
+        are written in one transaction, so an interrupted run carries on
+        where it stopped.
+        """
+        chunk_size = options['chunk_size']
+        if chunk_size < 1:
+            raise CommandError('--chunk-size must be at least 1')
+
+        try:
+            today = date.fromisoformat(options['date']) if options['date'] else date.today()
+        except ValueError:
+            raise CommandError('Invalid date format. Use YYYY-MM-DD')
+
+        if options['rebuild']:
+            with transaction.atomic():
+                BillingEvent.objects.all().delete()
+                Subscription.objects.update(billed_through=None)
+
+        # Never billed, or billed before today and still active or only
+        # deactivated since. Inactive rows without a deactivation time
+        # (written by bulk inserts before they set one) have no known last
+        # charge, so they are left out rather than billed up to today.
+        pending = (
+            Subscription.objects
+            .filter(
+                Q(billed_through__isnull=True)
+                | Q(billed_through__lt=today) & (Q(is_active=True) | Q(deactivated_at__date__gt=F('billed_through')))
+            )
+            .exclude(is_active=False, deactivated_at__isnull=True)
+            .order_by('id')
+            .values_list('id', 'start_date', 'billing_cycle', 'cost', 'billed_through', 'deactivated_at')
+        )
+
+        last_id = 0
+        total_rows = 0
+        total_events = 0
+        started = time.perf_counter()
+        chunk_number = 0
+
+        while True:
+            chunk_started = time.perf_counter()
+            chunk = list(pending.filter(id__gt=last_id)[:chunk_size])
+            if not chunk:
+                break
+
+            chunk_number += 1
+            last_id = chunk[-1][0]
+            ids, start_dates, billing_cycles, costs, billed_through, deactivated_at = zip(*chunk)
+
+            # Bill from the day after the watermark to today, or to the day
+            # before deactivation
+            first_dates = [
+                start if billed is None else billed + timedelta(days=1)
+                for start, billed in zip(start_dates, billed_through)
+            ]
+            last_dates = [
+                today if deactivated is None else min(today, timezone.localdate(deactivated) - timedelta(days=1))
+                for deactivated in deactivated_at
+            ]
+            rows, dates = billing_dates_between(
+                np.array(start_dates, dtype='datetime64[D]'),
+                cycle_steps(np.array(billing_cycles)),
+                np.array(first_dates, dtype='datetime64[D]'),
+                np.array(last_dates, dtype='datetime64[D]'),
+            )
+            events = [
+                BillingEvent(subscription_id=ids[row], date=billed, amount=costs[row])
+                for row, billed in zip(rows.tolist(), dates.tolist())
+            ]
+
+            with transaction.atomic():
+                # Conflicts only come from a concurrent run billing the same rows
+                BillingEvent.objects.bulk_create(events, ignore_conflicts=True)
+                for offset in range(0, len(ids), IN_CLAUSE_SIZE):
+                    Subscription.objects.filter(
+                        id__in=ids[offset:offset + IN_CLAUSE_SIZE]
+                    ).update(billed_through=today)
+
+            total_rows += len(chunk)
+            total_events += len(events)
+            self.stdout.write(
+                f'Chunk {chunk_number}: {len(chunk)} subscriptions, {len(events)} events in '
+                f'{time.perf_counter() - chunk_started:.2f}s'
+            )
+
+        # The ledger feeds total_spent, so invalidate stats here
+        if total_events or options['rebuild']:
+            transaction.on_commit(bump_stats_version)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Billed {total_rows} subscriptions through {today}: {total_events} new events '
+                f'in {time.perf_counter() - started:.2f}s'
+            )
+        )
@@ -0,0 +1,115 @@
+import textwrap
+from datetime import date, timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from subscriptions.models import Subscription
+from subscriptions.stats import category_rows
+
+
+def view_querysets(today):
+    """
+    The querysets SubscriptionViewSet issues, keyed by a short label.
+    """
+    active = Subscription.objects.filter(is_active=True)
+    next_week = today + timedelta(days=7)
+    return {
+        'list': active.order_by('renewal_date')[:20],
+        'list by category': active.filter(category='Entertainment').order_by('renewal_date')[:20],
+        'list by billing cycle': active.filter(billing_cycle='monthly').order_by('renewal_date')[:20],
+        'list by monthly cost': active.order_by('-monthly_equivalent_cost', '-id')[:20],
+        'list in a yearly cost range': (
+            active.filter(yearly_equivalent_cost__gte=100, yearly_equivalent_cost__lte=120)
+            .order_by('renewal_date')[:20]
+        ),
+        'categories': category_rows(),
+        'upcoming renewals': (
+            active.filter(renewal_date__range=[today, next_week])
+            .values('id', 'name', 'renewal_date', 'cost', 'billing_cycle')
+        ),
+    }
+
+
+def explain(queryset, phase):
+    """
+    Get the query plan for a queryset as one line per plan step.
+
+    The phase is appended as an SQL comment so each phase gets its own
+    prepared statement; sqlite3 would otherwise reuse the plan it cached
+    before the indexes were dropped.
+    """
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'{connection.ops.explain_query_prefix()} {sql} -- {phase}', params)
+        return '\n'.join(str(row[-1]) for row in cursor.fetchall())
+
+
+def is_full_scan(plan):
+    """
+    Whether a query plan reads the whole subscriptions table.
+    """
+    table = Subscription._meta.db_table
+    for line in plan.splitlines():
+        # SQLite: "SCAN subscriptions_subscription" without an index
+        if f'SCAN {table}' in line and 'USING' not in line:
+            return True
+        # PostgreSQL
+        if f'Seq Scan on {table}' in line:
+            return True
+    return False
+
+
+class Command(BaseCommand):
+    help = 'Compare query plans of the API queries with and without the Subscription indexes'
+
+    def handle(self, *args, **options):
+        """
+        Explain each API query with the indexes in place, then drop the
+        indexes inside a transaction that is rolled back and explain again.
+        """
+        if not connection.features.can_rollback_ddl:
+            raise CommandError(
+                f'{connection.vendor} cannot roll back DROP INDEX, so the '
+                'before/after comparison is not available'
+            )
+
+        today = date.today()
+        indexes = Subscription._meta.indexes
+        with connection.cursor() as cursor:
+            existing = connection.introspection.get_constraints(cursor, Subscription._meta.db_table)
+        missing = [index.name for index in indexes if index.name not in existing]
+        if missing:
+            raise CommandError(
+                f'Indexes {", ".join(missing)} are not in the database. Run migrate first.'
+            )
+
+        after = {label: explain(queryset, 'with indexes') for label, queryset in view_querysets(today).items()}
+
+        with transaction.atomic():
+            sql_delete_index = connection.schema_editor().sql_delete_index
+            with connection.cursor() as cursor:
+                for index in indexes:
+                    cursor.execute(sql_delete_index % {
+                        'table': connection.ops.quote_name(Subscription._meta.db_table),
+                        'name': connection.ops.quote_name(index.name),
+                    })
+            before = {label: explain(queryset, 'without indexes') for label, queryset in view_querysets(today).items()}
+            transaction.set_rollback(True)
+
+        regressions = []
+        for label in after:
+            self.stdout.write(self.style.MIGRATE_HEADING(label))
+            self.stdout.write('  without indexes:')
+            self.stdout.write(textwrap.indent(before[label], '    '))
+            self.stdout.write('  with indexes:')
+            self.stdout.write(textwrap.indent(after[label], '    '))
+            if is_full_scan(after[label]):
+                regressions.append(label)
+                self.stdout.write(self.style.ERROR('  full table scan'))
+            elif is_full_scan(before[label]):
+                self.stdout.write(self.style.SUCCESS('  full table scan avoided'))
+            else:
+                self.stdout.write('  no full table scan either way')
+
+        if regressions:
+            raise CommandError(f'Full table scans remain for: {", ".join(regressions)}')
+        self.stdout.write(self.style.SUCCESS('No API query scans the whole subscriptions table'))
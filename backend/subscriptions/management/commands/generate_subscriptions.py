@@ -0,0 +1,158 @@
+import time
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from subscriptions.cache import bump_stats_version
+from subscriptions.models import Category, Subscription
+from subscriptions.renewals import next_renewal_dates
+
+
+# Category -> (share of subscriptions, [(service, monthly price)])
+CATALOG = {
+    'Entertainment': (0.28, [
+        ('Netflix', 15.49), ('Disney+', 13.99), ('Hulu', 7.99), ('Max', 16.99),
+        ('YouTube Premium', 13.99), ('Paramount+', 7.99), ('Apple TV+', 9.99),
+    ]),
+    'Music': (0.14, [
+        ('Spotify Premium', 11.99), ('Apple Music', 10.99), ('Tidal', 10.99),
+        ('YouTube Music', 10.99), ('Deezer', 11.99),
+    ]),
+    'Software': (0.12, [
+        ('Adobe Creative Cloud', 59.99), ('JetBrains All Products', 28.90),
+        ('GitHub Copilot', 10.00), ('1Password', 2.99), ('Figma Professional', 15.00),
+    ]),
+    'Productivity': (0.12, [
+        ('Microsoft 365', 9.99), ('Notion Plus', 10.00), ('Todoist Pro', 5.00),
+        ('Evernote Personal', 14.99), ('Grammarly Premium', 30.00),
+    ]),
+    'Health': (0.09, [
+        ('Gym Membership', 49.99), ('Peloton App', 12.99), ('Headspace', 12.99),
+        ('Calm', 14.99), ('Strava', 11.99),
+    ]),
+    'Storage': (0.09, [
+        ('Dropbox Plus', 11.99), ('iCloud+', 2.99), ('Google One', 2.99),
+        ('Backblaze', 9.00),
+    ]),
+    'News': (0.06, [
+        ('The New York Times', 17.00), ('The Economist', 19.90), ('Medium', 5.00),
+    ]),
+    'Gaming': (0.06, [
+        ('Xbox Game Pass Ultimate', 19.99), ('PlayStation Plus', 9.99),
+        ('Nintendo Switch Online', 3.99),
+    ]),
+    None: (0.04, [
+        ('Domain Renewal', 1.67), ('VPN Service', 12.99), ('Cloud Hosting', 6.00),
+    ]),
+}
+
+YEARLY_SHARE = 0.3
+INACTIVE_SHARE = 0.12
+# Share of subscriptions that only have a price for their own billing cycle
+SINGLE_PRICE_SHARE = 0.1
+HISTORY_YEARS = 6
+
+
+class Command(BaseCommand):
+    help = 'Generate a large, reproducible set of realistic subscriptions for performance testing'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, required=True, help='Number of subscriptions to create')
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=42,
+            help='Random seed; the same seed and chunk size give the same data',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=10000,
+            help='Number of subscriptions inserted per transaction',
+        )
+
+    def handle(self, *args, **options):
+        """
+        Generate subscriptions chunk by chunk with vectorized sampling, so a
+        million rows need no more memory than one chunk.
+        """
+        count = options['count']
+        chunk_size = options['chunk_size']
+        if count < 1 or chunk_size < 1:
+            raise CommandError('--count and --chunk-size must be at least 1')
+
+        services = []
+        service_weights = []
+        for category, (share, catalog) in CATALOG.items():
+            for name, monthly_price in catalog:
+                services.append((name, category, monthly_price))
+                service_weights.append(share / len(catalog))
+        service_weights = np.array(service_weights) / sum(service_weights)
+        base_prices = np.array([monthly_price for _, _, monthly_price in services])
+
+        rng = np.random.default_rng(options['seed'])
+        today = date.today()
+        history_days = HISTORY_YEARS * 365
+        first_day = np.datetime64(today - timedelta(days=history_days), 'D')
+
+        Category.objects.ensure(CATALOG)
+        created = 0
+        started = time.perf_counter()
+        while created < count:
+            chunk_started = time.perf_counter()
+            size = min(chunk_size, count - created)
+
+            service_index = rng.choice(len(services), size=size, p=service_weights)
+            # Prices vary a little around the list price (plans, regions)
+            monthly = np.round(base_prices[service_index] * rng.uniform(0.8, 1.25, size), 2)
+            # Yearly plans are discounted by 10-20%
+            yearly = np.round(monthly * 12 * rng.uniform(0.8, 0.9, size), 2)
+            is_yearly = rng.random(size) < YEARLY_SHARE
+            single_price = rng.random(size) < SINGLE_PRICE_SHARE
+            is_active = rng.random(size) >= INACTIVE_SHARE
+            # More subscriptions started recently than years ago
+            start_offsets = rng.triangular(0, history_days, history_days, size).astype(np.int64)
+            start_dates = first_day + start_offsets.astype('timedelta64[D]')
+            billing_cycles = np.where(is_yearly, 'yearly', 'monthly')
+            renewals = next_renewal_dates(start_dates, billing_cycles, today)
+            # Inactive subscriptions were cancelled at some point after they started
+            active_days = (np.datetime64(today, 'D') - start_dates).astype(np.int64)
+            deactivated_dates = start_dates + np.ceil(rng.random(size) * active_days).astype('timedelta64[D]')
+
+            subscriptions = []
+            for i in range(size):
+                name, category, _ = services[service_index[i]]
+                monthly_price = Decimal(f'{monthly[i]:.2f}')
+                yearly_price = Decimal(f'{yearly[i]:.2f}')
+                if single_price[i]:
+                    if is_yearly[i]:
+                        monthly_price = None
+                    else:
+                        yearly_price = None
+                subscriptions.append(Subscription(
+                    name=name,
+                    monthly_price=monthly_price,
+                    yearly_price=yearly_price,
+                    cost=yearly_price if is_yearly[i] else monthly_price,
+                    billing_cycle=str(billing_cycles[i]),
+                    start_date=start_dates[i].item(),
+                    renewal_date=renewals[i].item(),
+                    is_active=bool(is_active[i]),
+                    deactivated_at=None if is_active[i] else datetime.combine(
+                        deactivated_dates[i].item(), datetime.min.time(), tzinfo=timezone.utc
+                    ),
+                    category_id=category,
+                ))
+
+            with transaction.atomic():
+                Subscription.objects.bulk_create(subscriptions)
+            created += size
+            self.stdout.write(
+                f'{created}/{count} subscriptions ({time.perf_counter() - chunk_started:.2f}s for this chunk)'
+            )
+
+        transaction.on_commit(bump_stats_version)
+        self.stdout.write(
+            self.style.SUCCESS(f'Generated {created} subscriptions in {time.perf_counter() - started:.2f}s')
+        )
@@ -0,0 +1,208 @@
+import csv
+import json
+import sys
+import time
+from datetime import date
+from decimal import Decimal, InvalidOperation
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from subscriptions.cache import bump_stats_version
+from subscriptions.models import Category, Subscription, IN_CLAUSE_SIZE
+from subscriptions.renewals import apply_renewal_dates
+
+
+BILLING_CYCLES = dict(Subscription.BILLING_CYCLE_CHOICES)
+NAME_MAX_LENGTH = Subscription._meta.get_field('name').max_length
+CATEGORY_MAX_LENGTH = Category._meta.get_field('name').max_length
+
+
+def parse_price(value, field):
+    if value in (None, ''):
+        return None
+    try:
+        price = Decimal(str(value)).quantize(Decimal('0.01'))
+    except InvalidOperation:
+        raise ValueError(f'{field} is not a number')
+    if price <= 0:
+        raise ValueError(f'{field} must be greater than 0')
+    return price
+
+
+def parse_row(row):
+    """
+    Turn one input record into an unsaved Subscription, applying the same
+    rules as SubscriptionSerializer. Raises ValueError for invalid records.
+    """
+    name = (row.get('name') or '').strip()
+    if not name:
+        raise ValueError('name is required')
+    if len(name) > NAME_MAX_LENGTH:
+        raise ValueError(f'name is longer than {NAME_MAX_LENGTH} characters')
+
+    billing_cycle = row.get('billing_cycle')
+    if billing_cycle not in BILLING_CYCLES:
+        raise ValueError(f'billing_cycle must be one of: {", ".join(BILLING_CYCLES)}')
+
+    try:
+        start_date = date.fromisoformat(row.get('start_date') or '')
+    except (TypeError, ValueError):
+        raise ValueError('start_date must be YYYY-MM-DD')
+
+    monthly_price = parse_price(row.get('monthly_price'), 'monthly_price')
+    yearly_price = parse_price(row.get('yearly_price'), 'yearly_price')
+    cost = monthly_price if billing_cycle == 'monthly' else yearly_price
+    if cost is None:
+        raise ValueError(f'{billing_cycle} price is required when billing cycle is {billing_cycle}')
+
+    category = (row.get('category') or '').strip() or None
+    if category and len(category) > CATEGORY_MAX_LENGTH:
+        raise ValueError(f'category is longer than {CATEGORY_MAX_LENGTH} characters')
+
+    is_active = row.get('is_active', True)
+    if isinstance(is_active, str):
+        is_active = is_active.strip().lower() not in ('0', 'false', 'no', '')
+
+    return Subscription(
+        name=name,
+        monthly_price=monthly_price,
+        yearly_price=yearly_price,
+        cost=cost,
+        billing_cycle=billing_cycle,
+        start_date=start_date,
+        category_id=category,
+        is_active=bool(is_active),
+        # As Subscription.save() does
+        deactivated_at=None if is_active else timezone.now(),
+    )
+
+
+def read_records(stream, input_format):
+    """
+    Yield (line number, record dict) pairs from CSV or NDJSON input.
+    """
+    if input_format == 'csv':
+        reader = csv.DictReader(stream)
+        for record in reader:
+            yield reader.line_num, record
+    else:
+        for line_number, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                record = None
+            yield line_number, record if isinstance(record, dict) else None
+
+
+class Command(BaseCommand):
+    help = 'Bulk import subscriptions from a CSV or NDJSON file, skipping names that already exist'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='File to import, or - to read standard input')
+        parser.add_argument(
+            '--format',
+            dest='input_format',
+            choices=['csv', 'ndjson'],
+            help='Input format (defaults to the file extension)',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=5000,
+            help='Number of records inserted per transaction',
+        )
+
+    def handle(self, *args, **options):
+        """
+        Stream the input, validating and inserting one chunk at a time.
+        """
+        path = options['path']
+        chunk_size = options['chunk_size']
+        if chunk_size < 1:
+            raise CommandError('--chunk-size must be at least 1')
+
+        input_format = options['input_format']
+        if input_format is None:
+            if path.endswith('.csv'):
+                input_format = 'csv'
+            elif path.endswith(('.ndjson', '.jsonl')):
+                input_format = 'ndjson'
+            else:
+                raise CommandError('Cannot tell the input format from the file name; pass --format')
+
+        if path == '-':
+            stream = sys.stdin
+        else:
+            try:
+                stream = open(path, newline='', encoding='utf-8')
+            except OSError as e:
+                raise CommandError(f'Cannot open {path}: {e}')
+
+        self.today = date.today()
+        self.created = 0
+        self.duplicates = 0
+        invalid = 0
+        started = time.perf_counter()
+
+        try:
+            chunk = []
+            for line_number, record in read_records(stream, input_format):
+                if record is None:
+                    invalid += 1
+                    self.stderr.write(f'Line {line_number}: not a JSON object')
+                    continue
+                try:
+                    chunk.append(parse_row(record))
+                except ValueError as e:
+                    invalid += 1
+                    self.stderr.write(f'Line {line_number}: {e}')
+                    continue
+
+                if len(chunk) == chunk_size:
+                    self.insert_chunk(chunk)
+                    chunk = []
+            if chunk:
+                self.insert_chunk(chunk)
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+        if self.created:
+            transaction.on_commit(bump_stats_version)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Imported {self.created} subscriptions in {time.perf_counter() - started:.2f}s '
+                f'({self.duplicates} duplicate names skipped, {invalid} invalid records)'
+            )
+        )
+
+    def insert_chunk(self, chunk):
+        """
+        Drop names already in the table (one query per IN_CLAUSE_SIZE names)
+        or earlier in the chunk, then insert the rest.
+        """
+        names = list({subscription.name for subscription in chunk})
+        existing = set()
+        for offset in range(0, len(names), IN_CLAUSE_SIZE):
+            existing.update(
+                Subscription.objects.filter(
+                    name__in=names[offset:offset + IN_CLAUSE_SIZE]
+                ).values_list('name', flat=True)
+            )
+
+        new_subscriptions = []
+        for subscription in chunk:
+            if subscription.name in existing:
+                self.duplicates += 1
+                continue
+            existing.add(subscription.name)
+            new_subscriptions.append(subscription)
+
+        apply_renewal_dates(new_subscriptions, self.today)
+        with transaction.atomic():
+            Category.objects.ensure(subscription.category_id for subscription in new_subscriptions)
+            Subscription.objects.bulk_create(new_subscriptions)
+        self.created += len(new_subscriptions)
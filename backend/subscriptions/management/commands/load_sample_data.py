@@ -1,6 +1,7 @@
 from django.core.management.base import BaseCommand
 from django.utils import timezone
 from datetime import date, timedelta
+from django.db.models import Count, Sum
 from subscriptions.models import Subscription
 
 
@@ -81,7 +82,7 @@ class Command(BaseCommand):
                     'yearly_price': sub_data.get('yearly_price'),
                     'cost': sub_data['cost'],
                     'billing_cycle': sub_data['billing_cycle'],
-                    'category': sub_data['category'],
+                    'category_id': sub_data['category'],
                     'start_date': sub_data['start_date'],
                     'is_active': True
                 }
@@ -102,13 +103,13 @@ class Command(BaseCommand):
         )
         
         # Display summary
-        total_subscriptions = Subscription.objects.filter(is_active=True).count()
-        total_monthly_cost = sum(
-            sub.get_monthly_equivalent_cost() 
-            for sub in Subscription.objects.filter(is_active=True)
+        summary = Subscription.objects.filter(is_active=True).aggregate(
+            total_subscriptions=Count('id'),
+            total_monthly_cost=Sum('monthly_equivalent_cost'),
         )
+        total_monthly_cost = summary['total_monthly_cost'] or 0
         
         self.stdout.write(f'\nSummary:')
-        self.stdout.write(f'Total active subscriptions: {total_subscriptions}')
+        self.stdout.write(f'Total active subscriptions: {summary["total_subscriptions"]}')
         self.stdout.write(f'Total monthly cost: ${total_monthly_cost:.2f}')
         self.stdout.write(f'Total yearly cost: ${total_monthly_cost * 12:.2f}')
@@ -0,0 +1,95 @@
+import time
+from collections import defaultdict
+from datetime import date
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from subscriptions.cache import bump_stats_version
+from subscriptions.models import Subscription, IN_CLAUSE_SIZE
+from subscriptions.renewals import next_renewal_dates
+
+
+class Command(BaseCommand):
+    help = 'Move stale renewal dates (before today) forward to the next upcoming renewal'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=5000,
+            help='Number of subscriptions recomputed and written per transaction',
+        )
+        parser.add_argument(
+            '--date',
+            help='Treat this date (YYYY-MM-DD) as today instead of the current date',
+        )
+
+    def handle(self, *args, **options):
+        """
+        Recompute renewal dates for active subscriptions whose stored
+        renewal_date has passed, one chunk at a time.
+        """
+        chunk_size = options['chunk_size']
+        if chunk_size < 1:
+            raise CommandError('--chunk-size must be at least 1')
+
+        try:
+            today = date.fromisoformat(options['date']) if options['date'] else date.today()
+        except ValueError:
+            raise CommandError('Invalid date format. Use YYYY-MM-DD')
+
+        stale = (
+            Subscription.objects
+            .filter(is_active=True, renewal_date__lt=today)
+            .order_by('id')
+            .values_list('id', 'start_date', 'billing_cycle')
+        )
+
+        # Walk the stale rows by primary key rather than holding one cursor
+        # open, since each chunk rewrites rows of the table being read.
+        last_id = 0
+        total_rows = 0
+        started = time.perf_counter()
+        chunk_number = 0
+
+        while True:
+            chunk_started = time.perf_counter()
+            chunk = list(stale.filter(id__gt=last_id)[:chunk_size])
+            if not chunk:
+                break
+
+            chunk_number += 1
+            last_id = chunk[-1][0]
+            ids, start_dates, billing_cycles = zip(*chunk)
+            renewals = next_renewal_dates(start_dates, billing_cycles, today).tolist()
+
+            # Renewals in a chunk share a few hundred distinct dates at most,
+            # so one UPDATE per date replaces a CASE expression per row.
+            ids_by_renewal = defaultdict(list)
+            for subscription_id, renewal in zip(ids, renewals):
+                ids_by_renewal[renewal].append(subscription_id)
+
+            now = timezone.now()
+            with transaction.atomic():
+                for renewal, renewal_ids in ids_by_renewal.items():
+                    for offset in range(0, len(renewal_ids), IN_CLAUSE_SIZE):
+                        Subscription.objects.filter(
+                            id__in=renewal_ids[offset:offset + IN_CLAUSE_SIZE]
+                        ).update(renewal_date=renewal, updated_at=now)
+
+            total_rows += len(chunk)
+            self.stdout.write(
+                f'Chunk {chunk_number}: {len(chunk)} rows in '
+                f'{time.perf_counter() - chunk_started:.2f}s'
+            )
+
+        # Queryset updates skip model signals, so invalidate stats here
+        if total_rows:
+            transaction.on_commit(bump_stats_version)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Rolled {total_rows} renewal dates forward in '
+                f'{time.perf_counter() - started:.2f}s'
+            )
+        )
@@ -0,0 +1,60 @@
+import time
+from datetime import date, timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Min
+from subscriptions.cache import bump_stats_version
+from subscriptions.models import DailySnapshot, Subscription
+from subscriptions.trends import build_snapshots, missing_days
+
+
+class Command(BaseCommand):
+    help = 'Write the daily stats snapshots that are missing, for the trends endpoint'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--since',
+            help='First day (YYYY-MM-DD) to snapshot; defaults to the earliest start date',
+        )
+        parser.add_argument(
+            '--until',
+            help='Last day (YYYY-MM-DD) to snapshot; defaults to yesterday, the last complete day',
+        )
+
+    def handle(self, *args, **options):
+        """
+        Snapshot every day in the range that has no snapshot yet. Existing
+        snapshots are never rewritten, so running it again does nothing
+        and a daily run only adds the day before.
+        """
+        try:
+            until = date.fromisoformat(options['until']) if options['until'] else date.today() - timedelta(days=1)
+            since = date.fromisoformat(options['since']) if options['since'] else None
+        except ValueError:
+            raise CommandError('Invalid date format. Use YYYY-MM-DD')
+
+        if since is None:
+            since = Subscription.objects.aggregate(first=Min('start_date'))['first']
+            if since is None:
+                self.stdout.write('No subscriptions to snapshot')
+                return
+        if since > until:
+            raise CommandError(f'Nothing to snapshot between {since} and {until}')
+
+        started = time.perf_counter()
+        days = missing_days(since, until)
+        snapshots = build_snapshots(days)
+        with transaction.atomic():
+            # A concurrent run may have written some of the same days
+            DailySnapshot.objects.bulk_create(snapshots, ignore_conflicts=True)
+
+        # Trends responses are validated against the stats version
+        if snapshots:
+            transaction.on_commit(bump_stats_version)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Wrote {len(snapshots)} snapshots between {since} and {until} '
+                f'in {time.perf_counter() - started:.2f}s'
+            )
+        )
@@ -0,0 +1,163 @@
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+RESPONSE_SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# SQL statistics of the request being handled, or None outside requests.
+# A context variable (not a thread local) so queries run by async views in
+# sync_to_async threads are still counted against their request.
+current_sql = ContextVar('current_sql', default=None)
+
+
+class SQLStats:
+    __slots__ = ('queries', 'duration')
+
+    def __init__(self):
+        self.queries = 0
+        self.duration = 0.0
+
+
+def record_sql(execute, sql, params, many, context):
+    """
+    Database execute wrapper counting and timing queries of the current request.
+    """
+    stats = current_sql.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.duration += time.perf_counter() - started
+        stats.queries += 1
+
+
+def install_sql_wrapper(sender, connection, **kwargs):
+    """
+    connection_created receiver adding record_sql to every new connection.
+    """
+    if record_sql not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_sql)
+
+
+class Histogram:
+    __slots__ = ('buckets', 'counts', 'sum')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        # One count per bucket plus +Inf; made cumulative when rendered
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    def samples(self, name, labels):
+        cumulative = 0
+        for bound, count in zip((*self.buckets, '+Inf'), self.counts):
+            cumulative += count
+            yield f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}'
+        yield f'{name}_sum{{{labels}}} {self.sum}'
+        yield f'{name}_count{{{labels}}} {cumulative}'
+
+
+class RouteMetrics:
+    __slots__ = ('latency', 'queries', 'response_size', 'sql_duration', 'responses')
+
+    def __init__(self):
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.queries = Histogram(QUERY_COUNT_BUCKETS)
+        self.response_size = Histogram(RESPONSE_SIZE_BUCKETS)
+        self.sql_duration = 0.0
+        self.responses = {}
+
+
+class MetricsRegistry:
+    """
+    In-process request metrics keyed by (view name, method).
+
+    Every worker process keeps its own numbers; Prometheus adds them up
+    when each worker is scraped as its own target.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.routes = {}
+
+    def observe(self, view, method, status_code, duration, sql, response_size):
+        with self.lock:
+            route = self.routes.get((view, method))
+            if route is None:
+                route = self.routes[(view, method)] = RouteMetrics()
+            route.latency.observe(duration)
+            route.queries.observe(sql.queries)
+            route.sql_duration += sql.duration
+            if response_size is not None:
+                route.response_size.observe(response_size)
+            route.responses[status_code] = route.responses.get(status_code, 0) + 1
+
+    def render(self):
+        """
+        Get all metrics in the Prometheus text exposition format.
+        """
+        with self.lock:
+            routes = sorted(self.routes.items())
+            lines = [
+                '# HELP subscriptions_http_request_duration_seconds Request latency.',
+                '# TYPE subscriptions_http_request_duration_seconds histogram',
+            ]
+            for (view, method), route in routes:
+                lines.extend(route.latency.samples(
+                    'subscriptions_http_request_duration_seconds', f'view="{view}",method="{method}"'
+                ))
+
+            lines += [
+                '# HELP subscriptions_http_request_sql_queries SQL queries per request.',
+                '# TYPE subscriptions_http_request_sql_queries histogram',
+            ]
+            for (view, method), route in routes:
+                lines.extend(route.queries.samples(
+                    'subscriptions_http_request_sql_queries', f'view="{view}",method="{method}"'
+                ))
+
+            lines += [
+                '# HELP subscriptions_http_request_sql_duration_seconds_total Time spent in SQL queries. '
+                'The rest of the request latency is Python: serialization, rendering, middleware.',
+                '# TYPE subscriptions_http_request_sql_duration_seconds_total counter',
+            ]
+            for (view, method), route in routes:
+                lines.append(
+                    f'subscriptions_http_request_sql_duration_seconds_total'
+                    f'{{view="{view}",method="{method}"}} {route.sql_duration}'
+                )
+
+            lines += [
+                '# HELP subscriptions_http_response_size_bytes Response body size (streamed responses excluded).',
+                '# TYPE subscriptions_http_response_size_bytes histogram',
+            ]
+            for (view, method), route in routes:
+                if any(route.response_size.counts):
+                    lines.extend(route.response_size.samples(
+                        'subscriptions_http_response_size_bytes', f'view="{view}",method="{method}"'
+                    ))
+
+            lines += [
+                '# HELP subscriptions_http_responses_total Responses by status code.',
+                '# TYPE subscriptions_http_responses_total counter',
+            ]
+            for (view, method), route in routes:
+                for status_code, count in sorted(route.responses.items()):
+                    lines.append(
+                        f'subscriptions_http_responses_total'
+                        f'{{view="{view}",method="{method}",status="{status_code}"}} {count}'
+                    )
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
@@ -0,0 +1,104 @@
+import logging
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+
+from .metrics import SQLStats, current_sql, registry
+
+
+logger = logging.getLogger(__name__)
+
+ASYNC_URLCONF = 'subscriptions.async_urls'
+
+# Methods recorded under their own label; anything else counts as OTHER
+HTTP_METHODS = frozenset({'GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS', 'TRACE', 'CONNECT'})
+
+
+class RequestMetricsMiddleware:
+    """
+    Record latency, SQL query count and time, and response size for every
+    request, labelled by URL name and method, for the /metrics endpoint.
+
+    Requests slower than settings.SLOW_REQUEST_THRESHOLD_MS (if set) are
+    logged with their SQL breakdown.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.slow_threshold = getattr(settings, 'SLOW_REQUEST_THRESHOLD_MS', None)
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        sql = SQLStats()
+        token = current_sql.set(sql)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            current_sql.reset(token)
+        self.record(request, response, time.perf_counter() - started, sql)
+        return response
+
+    async def __acall__(self, request):
+        sql = SQLStats()
+        token = current_sql.set(sql)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_sql.reset(token)
+        self.record(request, response, time.perf_counter() - started, sql)
+        return response
+
+    def record(self, request, response, duration, sql):
+        match = request.resolver_match
+        # Unmatched paths share one label so scanners cannot add new series
+        view = match.view_name if match and match.view_name else 'unmatched'
+        # Likewise made-up methods, which reach the middleware unchecked
+        method = request.method if request.method in HTTP_METHODS else 'OTHER'
+        if response.streaming:
+            size = None
+        else:
+            size = len(response.content)
+        registry.observe(view, method, response.status_code, duration, sql, size)
+
+        if self.slow_threshold is not None and duration * 1000 >= self.slow_threshold:
+            logger.warning(
+                'Slow request: %s %s took %.0fms (%d SQL queries, %.0fms in SQL) -> %s',
+                request.method, request.get_full_path(), duration * 1000,
+                sql.queries, sql.duration * 1000, response.status_code,
+            )
+
+
+class AsyncRoutingMiddleware:
+    """
+    Route ASGI requests through subscriptions.async_urls, which adds the
+    event stream and, with settings.ASYNC_READ_VIEWS, serves the read
+    endpoints with async views. WSGI keeps the sync viewset.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if isinstance(request, ASGIRequest):
+            request.urlconf = ASYNC_URLCONF
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        if isinstance(request, ASGIRequest):
+            request.urlconf = ASYNC_URLCONF
+        return await self.get_response(request)
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.6 on 2026-10-17 05:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('subscriptions', '0002_subscription_monthly_price_subscription_yearly_price_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='subscription',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['renewal_date'], name='sub_active_renewal_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='subscription',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['category', 'renewal_date'], name='sub_active_category_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='subscription',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['billing_cycle', 'renewal_date'], name='sub_active_cycle_idx'),
+        ),
+    ]
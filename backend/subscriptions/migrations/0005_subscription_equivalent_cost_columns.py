@@ -0,0 +1,32 @@
+# Generated by Django 5.2.6 on 2026-10-17 06:16
+
+import django.db.models.expressions
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('subscriptions', '0004_subscription_name_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='subscription',
+            name='monthly_equivalent_cost',
+            field=models.GeneratedField(db_persist=True, expression=models.Case(models.When(billing_cycle='monthly', then=models.F('cost')), models.When(models.Q(('yearly_price__isnull', False), models.Q(('yearly_price', 0), _negated=True)), then=models.ExpressionWrapper(django.db.models.expressions.CombinedExpression(models.F('yearly_price'), '/', models.Value(12.0)), output_field=models.DecimalField())), default=models.ExpressionWrapper(django.db.models.expressions.CombinedExpression(models.F('cost'), '/', models.Value(12.0)), output_field=models.DecimalField()), output_field=models.DecimalField(decimal_places=6, max_digits=16)), output_field=models.DecimalField(decimal_places=6, max_digits=16)),
+        ),
+        migrations.AddField(
+            model_name='subscription',
+            name='yearly_equivalent_cost',
+            field=models.GeneratedField(db_persist=True, expression=models.Case(models.When(billing_cycle='yearly', then=models.F('cost')), models.When(models.Q(('monthly_price__isnull', False), models.Q(('monthly_price', 0), _negated=True)), then=django.db.models.expressions.CombinedExpression(models.F('monthly_price'), '*', models.Value(12))), default=django.db.models.expressions.CombinedExpression(models.F('cost'), '*', models.Value(12)), output_field=models.DecimalField(decimal_places=6, max_digits=16)), output_field=models.DecimalField(decimal_places=6, max_digits=16)),
+        ),
+        migrations.AddIndex(
+            model_name='subscription',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['monthly_equivalent_cost'], name='sub_active_monthly_cost_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='subscription',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['yearly_equivalent_cost'], name='sub_active_yearly_cost_idx'),
+        ),
+    ]
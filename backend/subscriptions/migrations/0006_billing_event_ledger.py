@@ -0,0 +1,50 @@
+# Generated by Django 5.2.6 on 2026-10-17 06:31
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_deactivated_at(apps, schema_editor):
+    """
+    Subscriptions deactivated before deactivated_at existed were last
+    changed when they were deactivated, as far as anyone can tell.
+    """
+    Subscription = apps.get_model('subscriptions', 'Subscription')
+    Subscription.objects.filter(is_active=False).update(deactivated_at=models.F('updated_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('subscriptions', '0005_subscription_equivalent_cost_columns'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='subscription',
+            name='billed_through',
+            field=models.DateField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='subscription',
+            name='deactivated_at',
+            field=models.DateTimeField(blank=True, editable=False, help_text='When the subscription was last deactivated', null=True),
+        ),
+        migrations.CreateModel(
+            name='BillingEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(help_text='Day the subscription was charged')),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('subscription', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='billing_events', to='subscriptions.subscription')),
+            ],
+            options={
+                'verbose_name': 'Billing event',
+                'verbose_name_plural': 'Billing events',
+                'ordering': ['date'],
+                'indexes': [models.Index(fields=['date', 'subscription', 'amount'], name='billing_event_date_sub_idx')],
+                'constraints': [models.UniqueConstraint(fields=('subscription', 'date'), name='billing_event_sub_date_uniq')],
+            },
+        ),
+        migrations.RunPython(backfill_deactivated_at, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.6 on 2026-10-17 06:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('subscriptions', '0006_billing_event_ledger'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailySnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(unique=True)),
+                ('active_subscriptions', models.PositiveIntegerField()),
+                ('total_monthly_cost', models.DecimalField(decimal_places=2, max_digits=14)),
+                ('category_breakdown', models.JSONField(default=dict)),
+            ],
+            options={
+                'verbose_name': 'Daily snapshot',
+                'verbose_name_plural': 'Daily snapshots',
+                'ordering': ['date'],
+            },
+        ),
+    ]
@@ -0,0 +1,97 @@
+# Generated by Django 5.2.6 on 2026-10-17 06:43
+
+import django.db.models.deletion
+import subscriptions.models
+from django.db import migrations, models
+
+
+# The search table and its triggers as this migration creates them. Copied
+# here rather than imported from subscriptions.search, so later changes
+# there cannot change what this migration does.
+CREATE_SEARCH_TABLE = """
+CREATE VIRTUAL TABLE subscriptions_subscription_fts USING fts5(
+    name,
+    category,
+    content='subscriptions_subscription',
+    content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2',
+    prefix='2 3'
+)
+"""
+
+SET_SEARCH_RANK = (
+    "INSERT INTO subscriptions_subscription_fts(subscriptions_subscription_fts, rank) "
+    "VALUES('rank', 'bm25(10.0, 1.0)')"
+)
+
+REBUILD_SEARCH_TABLE = (
+    "INSERT INTO subscriptions_subscription_fts(subscriptions_subscription_fts) VALUES('rebuild')"
+)
+
+CREATE_SEARCH_TRIGGERS = [
+    """
+    CREATE TRIGGER subscriptions_subscription_fts_insert AFTER INSERT ON subscriptions_subscription BEGIN
+        INSERT INTO subscriptions_subscription_fts(rowid, name, category) VALUES (new.id, new.name, new.category);
+    END
+    """,
+    """
+    CREATE TRIGGER subscriptions_subscription_fts_delete AFTER DELETE ON subscriptions_subscription BEGIN
+        INSERT INTO subscriptions_subscription_fts(subscriptions_subscription_fts, rowid, name, category)
+        VALUES ('delete', old.id, old.name, old.category);
+    END
+    """,
+    """
+    CREATE TRIGGER subscriptions_subscription_fts_update AFTER UPDATE OF name, category ON subscriptions_subscription BEGIN
+        INSERT INTO subscriptions_subscription_fts(subscriptions_subscription_fts, rowid, name, category)
+        VALUES ('delete', old.id, old.name, old.category);
+        INSERT INTO subscriptions_subscription_fts(rowid, name, category) VALUES (new.id, new.name, new.category);
+    END
+    """,
+]
+
+DROP_SEARCH_TRIGGERS = [
+    f'DROP TRIGGER IF EXISTS subscriptions_subscription_fts_{event}' for event in ('insert', 'delete', 'update')
+]
+
+
+def create_search_index(apps, schema_editor):
+    """
+    Create and fill the search table and its triggers, on SQLite only.
+    """
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for sql in [CREATE_SEARCH_TABLE, SET_SEARCH_RANK, *DROP_SEARCH_TRIGGERS, *CREATE_SEARCH_TRIGGERS]:
+        schema_editor.execute(sql)
+    schema_editor.execute(REBUILD_SEARCH_TABLE)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for sql in [*DROP_SEARCH_TRIGGERS, 'DROP TABLE IF EXISTS subscriptions_subscription_fts']:
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('subscriptions', '0007_daily_snapshot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SubscriptionSearchIndex',
+            fields=[
+                ('subscription', models.OneToOneField(db_column='rowid', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_document', serialize=False, to='subscriptions.subscription')),
+                ('document', subscriptions.models.SearchDocumentField(db_column='subscriptions_subscription_fts')),
+                ('name', models.TextField()),
+                ('category', models.TextField()),
+                ('rank', models.FloatField()),
+            ],
+            options={
+                'db_table': 'subscriptions_subscription_fts',
+                'managed': False,
+            },
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
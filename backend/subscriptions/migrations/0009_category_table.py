@@ -0,0 +1,177 @@
+# Generated by Django 5.2.6 on 2026-10-17 06:48
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models.functions import Round
+
+
+# The triggers as this migration creates them. Copied here rather than
+# imported from subscriptions.search and subscriptions.categories, so later
+# changes there cannot change what this migration does.
+CREATE_SEARCH_TRIGGERS = [
+    """
+    CREATE TRIGGER subscriptions_subscription_fts_insert AFTER INSERT ON subscriptions_subscription BEGIN
+        INSERT INTO subscriptions_subscription_fts(rowid, name, category) VALUES (new.id, new.name, new.category);
+    END
+    """,
+    """
+    CREATE TRIGGER subscriptions_subscription_fts_delete AFTER DELETE ON subscriptions_subscription BEGIN
+        INSERT INTO subscriptions_subscription_fts(subscriptions_subscription_fts, rowid, name, category)
+        VALUES ('delete', old.id, old.name, old.category);
+    END
+    """,
+    """
+    CREATE TRIGGER subscriptions_subscription_fts_update AFTER UPDATE OF name, category ON subscriptions_subscription BEGIN
+        INSERT INTO subscriptions_subscription_fts(subscriptions_subscription_fts, rowid, name, category)
+        VALUES ('delete', old.id, old.name, old.category);
+        INSERT INTO subscriptions_subscription_fts(rowid, name, category) VALUES (new.id, new.name, new.category);
+    END
+    """,
+]
+
+DROP_SEARCH_TRIGGERS = [
+    f'DROP TRIGGER IF EXISTS subscriptions_subscription_fts_{event}' for event in ('insert', 'delete', 'update')
+]
+
+ADD_SUBSCRIPTION = """
+    UPDATE subscriptions_category
+    SET active_count = active_count + 1,
+        monthly_total = ROUND(monthly_total + ROUND(new.monthly_equivalent_cost, 6), 6)
+    WHERE name = new.category
+"""
+REMOVE_SUBSCRIPTION = """
+    UPDATE subscriptions_category
+    SET active_count = active_count - 1,
+        monthly_total = ROUND(monthly_total - ROUND(old.monthly_equivalent_cost, 6), 6)
+    WHERE name = old.category
+"""
+
+CREATE_COUNTER_TRIGGERS = [
+    f"""
+    CREATE TRIGGER subscriptions_category_count_insert AFTER INSERT ON subscriptions_subscription
+    WHEN new.is_active BEGIN
+        {ADD_SUBSCRIPTION};
+    END
+    """,
+    f"""
+    CREATE TRIGGER subscriptions_category_count_delete AFTER DELETE ON subscriptions_subscription
+    WHEN old.is_active BEGIN
+        {REMOVE_SUBSCRIPTION};
+    END
+    """,
+    f"""
+    CREATE TRIGGER subscriptions_category_count_update
+    AFTER UPDATE OF is_active, category, billing_cycle, cost, yearly_price ON subscriptions_subscription
+    BEGIN
+        {REMOVE_SUBSCRIPTION} AND old.is_active;
+        {ADD_SUBSCRIPTION} AND new.is_active;
+    END
+    """,
+]
+
+DROP_COUNTER_TRIGGERS = [
+    f'DROP TRIGGER IF EXISTS subscriptions_category_count_{event}' for event in ('insert', 'delete', 'update')
+]
+
+
+def create_search_triggers(apps, schema_editor):
+    """
+    (Re)create the search triggers after the subscriptions table has been
+    rebuilt, on SQLite only.
+    """
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for sql in [*DROP_SEARCH_TRIGGERS, *CREATE_SEARCH_TRIGGERS]:
+        schema_editor.execute(sql)
+
+
+def create_counter_triggers(apps, schema_editor):
+    """
+    (Re)create the triggers maintaining the category counters, on SQLite only.
+    """
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for sql in [*DROP_COUNTER_TRIGGERS, *CREATE_COUNTER_TRIGGERS]:
+        schema_editor.execute(sql)
+
+
+def drop_counter_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for sql in DROP_COUNTER_TRIGGERS:
+        schema_editor.execute(sql)
+
+
+def create_categories(apps, schema_editor):
+    """
+    Create a category for every distinct category string, with the counters
+    the triggers would have reached. Blank categories become no category,
+    which they already counted as.
+    """
+    Category = apps.get_model('subscriptions', 'Category')
+    Subscription = apps.get_model('subscriptions', 'Subscription')
+    Subscription.objects.filter(category='').update(category=None)
+    
+    totals = {
+        row['category']: row
+        for row in (
+            Subscription.objects
+            .filter(is_active=True, category__isnull=False)
+            .values('category')
+            .annotate(active_count=models.Count('id'), monthly_total=models.Sum(Round('monthly_equivalent_cost', 6)))
+            .order_by()
+        )
+    }
+    names = (
+        Subscription.objects
+        .filter(category__isnull=False)
+        .values_list('category', flat=True)
+        .order_by('category')
+        .distinct()
+    )
+    Category.objects.bulk_create([
+        Category(
+            name=name,
+            active_count=totals[name]['active_count'] if name in totals else 0,
+            monthly_total=(
+                Decimal(totals[name]['monthly_total']).quantize(Decimal('0.000001')) if name in totals else 0
+            ),
+        )
+        for name in names
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('subscriptions', '0008_subscription_search_index'),
+    ]
+
+    operations = [
+        # Rebuilding the subscriptions table drops its triggers; going
+        # backwards, this puts the search triggers back last
+        migrations.RunPython(migrations.RunPython.noop, create_search_triggers),
+        migrations.CreateModel(
+            name='Category',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('active_count', models.PositiveIntegerField(default=0, editable=False)),
+                ('monthly_total', models.DecimalField(decimal_places=6, default=0, editable=False, max_digits=16)),
+            ],
+            options={
+                'verbose_name': 'Category',
+                'verbose_name_plural': 'Categories',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.RunPython(create_categories, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='subscription',
+            name='category',
+            field=models.ForeignKey(blank=True, db_column='category', db_index=False, help_text='Category for grouping subscriptions', null=True, on_delete=django.db.models.deletion.PROTECT, related_name='subscriptions', to='subscriptions.category', to_field='name'),
+        ),
+        migrations.RunPython(create_search_triggers, migrations.RunPython.noop),
+        migrations.RunPython(create_counter_triggers, drop_counter_triggers),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.6 on 2026-10-17 06:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('subscriptions', '0009_category_table'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='subscription',
+            index=models.Index(fields=['renewal_date'], name='sub_renewal_idx'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.6 on 2026-10-17 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('subscriptions', '0010_subscription_renewal_index'),
+    ]
+
+    operations = [
+        # Existing snapshots were backfilled by snapshot_stats, which
+        # defaults to the earliest start date, so they are marked
+        # approximate; new snapshots are exact unless built for older days.
+        migrations.AddField(
+            model_name='dailysnapshot',
+            name='approximate',
+            field=models.BooleanField(default=True, help_text='Backfilled after the day from the current costs and categories'),
+            preserve_default=False,
+        ),
+        migrations.AlterField(
+            model_name='dailysnapshot',
+            name='approximate',
+            field=models.BooleanField(default=False, help_text='Backfilled after the day from the current costs and categories'),
+        ),
+    ]
@@ -1,6 +1,138 @@
-from django.db import models
-from datetime import datetime, timedelta
+from collections import defaultdict
+from django.db import connection, models, transaction
+from django.db.models import Case, ExpressionWrapper, F, Q, Value, When
+from django.db.models.expressions import RawSQL
+from django.utils import timezone
+from datetime import date, datetime, timedelta
 from decimal import Decimal
+from .renewals import next_renewal_date, next_renewal_date_sql, next_renewal_dates
+from .search import SEARCH_TABLE
+
+
+# Keeps each "id IN (...)" list under SQLite's bound-parameter limit
+IN_CLAUSE_SIZE = 900
+
+# SQL equivalents of Subscription.get_monthly_equivalent_cost() and
+# get_yearly_equivalent_cost(), stored as generated columns so they can be
+# summed, sorted and filtered in the database.
+# The divisor is a float so SQLite does not fall back to integer division on
+# whole-number prices stored with NUMERIC affinity.
+MONTHLY_EQUIVALENT_COST = Case(
+    When(billing_cycle='monthly', then=F('cost')),
+    When(
+        Q(yearly_price__isnull=False) & ~Q(yearly_price=0),
+        then=ExpressionWrapper(F('yearly_price') / Value(12.0), output_field=models.DecimalField()),
+    ),
+    default=ExpressionWrapper(F('cost') / Value(12.0), output_field=models.DecimalField()),
+    output_field=models.DecimalField(max_digits=16, decimal_places=6),
+)
+
+YEARLY_EQUIVALENT_COST = Case(
+    When(billing_cycle='yearly', then=F('cost')),
+    When(
+        Q(monthly_price__isnull=False) & ~Q(monthly_price=0),
+        then=F('monthly_price') * 12,
+    ),
+    default=F('cost') * 12,
+    output_field=models.DecimalField(max_digits=16, decimal_places=6),
+)
+
+
+class SubscriptionQuerySet(models.QuerySet):
+    
+    def deactivate(self):
+        """
+        Soft delete every active subscription in the queryset with a single
+        UPDATE. Returns the number of subscriptions deactivated.
+        """
+        from .cache import bump_stats_version
+        from .events import publish_refresh
+        
+        now = timezone.now()
+        deactivated = self.filter(is_active=True).update(
+            is_active=False, deactivated_at=now, updated_at=now
+        )
+        if deactivated:
+            transaction.on_commit(bump_stats_version)
+            publish_refresh()
+        return deactivated
+    
+    def recompute_renewal_dates(self, today=None):
+        """
+        Recalculate renewal_date from start_date and billing_cycle for every
+        subscription in the queryset. On SQLite this is a single UPDATE
+        computing the dates in the database. Returns the number of renewal
+        dates changed.
+        """
+        from .cache import bump_stats_version
+        from .events import publish_refresh
+        
+        if today is None:
+            today = date.today()
+        now = timezone.now()
+        if connection.vendor == 'sqlite':
+            sql, params = next_renewal_date_sql(today)
+            # Rows already on the right date are left alone, which spares
+            # rewriting them and their index entries
+            updated = (
+                self.alias(next_renewal=RawSQL(sql, params, output_field=models.DateField()))
+                .exclude(renewal_date=F('next_renewal'))
+                .update(renewal_date=F('next_renewal'), updated_at=now)
+            )
+        else:
+            # One UPDATE per distinct renewal date, as roll_renewals does
+            rows = list(self.order_by().values_list('id', 'start_date', 'billing_cycle'))
+            ids_by_renewal = defaultdict(list)
+            if rows:
+                ids, start_dates, billing_cycles = zip(*rows)
+                renewals = next_renewal_dates(start_dates, billing_cycles, today).tolist()
+                for subscription_id, renewal in zip(ids, renewals):
+                    ids_by_renewal[renewal].append(subscription_id)
+            updated = 0
+            with transaction.atomic():
+                for renewal, renewal_ids in ids_by_renewal.items():
+                    for offset in range(0, len(renewal_ids), IN_CLAUSE_SIZE):
+                        updated += Subscription.objects.filter(
+                            id__in=renewal_ids[offset:offset + IN_CLAUSE_SIZE]
+                        ).update(renewal_date=renewal, updated_at=now)
+        if updated:
+            transaction.on_commit(bump_stats_version)
+            publish_refresh()
+        return updated
+
+
+class CategoryQuerySet(models.QuerySet):
+    
+    def ensure(self, names):
+        """
+        Create the categories with these names that do not exist yet, in a
+        single INSERT.
+        """
+        names = {name for name in names if name}
+        if names:
+            self.bulk_create([Category(name=name) for name in names], ignore_conflicts=True)
+
+
+class Category(models.Model):
+    """
+    A subscription category, with running totals of its active
+    subscriptions. The totals are maintained by database triggers (see
+    categories.py), never by the application.
+    """
+    name = models.CharField(max_length=50, unique=True)
+    active_count = models.PositiveIntegerField(default=0, editable=False)
+    # Sum of the active subscriptions' monthly_equivalent_cost
+    monthly_total = models.DecimalField(max_digits=16, decimal_places=6, default=0, editable=False)
+    
+    objects = CategoryQuerySet.as_manager()
+    
+    class Meta:
+        ordering = ['name']
+        verbose_name = "Category"
+        verbose_name_plural = "Categories"
+    
+    def __str__(self):
+        return self.name
 
 
 class Subscription(models.Model):
@@ -47,28 +179,141 @@ class Subscription(models.Model):
         default=True, 
         help_text="Whether the subscription is currently active"
     )
-    category = models.CharField(
-        max_length=50, 
-        blank=True, 
+    # References the category by name, so category_id (column "category")
+    # is the name itself and reads never need the categories table
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.PROTECT,
+        to_field='name',
+        db_column='category',
+        related_name='subscriptions',
+        blank=True,
         null=True,
+        # sub_active_category_idx serves the queries filtering on it
+        db_index=False,
         help_text="Category for grouping subscriptions"
     )
+    deactivated_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        editable=False,
+        help_text="When the subscription was last deactivated"
+    )
+    # Ledger watermark: billing events exist for every charge up to this day
+    billed_through = models.DateField(null=True, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    # Computed by the database on every write; reload the instance to read
+    # them after a save. The API keeps using the get_*_equivalent_cost()
+    # methods, which do not round to 6 decimal places.
+    monthly_equivalent_cost = models.GeneratedField(
+        expression=MONTHLY_EQUIVALENT_COST,
+        output_field=models.DecimalField(max_digits=16, decimal_places=6),
+        db_persist=True,
+    )
+    yearly_equivalent_cost = models.GeneratedField(
+        expression=YEARLY_EQUIVALENT_COST,
+        output_field=models.DecimalField(max_digits=16, decimal_places=6),
+        db_persist=True,
+    )
+    
+    objects = SubscriptionQuerySet.as_manager()
+    
     class Meta:
         ordering = ['renewal_date']
         verbose_name = "Subscription"
         verbose_name_plural = "Subscriptions"
+        # Every API query filters on is_active first, then optionally on
+        # category or billing_cycle, and orders by renewal_date. The indexes
+        # are partial on active rows: SQLite renders is_active=True as a bare
+        # column test, which can only match an index with the same condition.
+        indexes = [
+            models.Index(
+                fields=['renewal_date'],
+                condition=Q(is_active=True),
+                name='sub_active_renewal_idx',
+            ),
+            models.Index(
+                fields=['category', 'renewal_date'],
+                condition=Q(is_active=True),
+                name='sub_active_category_idx',
+            ),
+            models.Index(
+                fields=['billing_cycle', 'renewal_date'],
+                condition=Q(is_active=True),
+                name='sub_active_cycle_idx',
+            ),
+            # ?ordering= and range filters on the normalized costs
+            models.Index(
+                fields=['monthly_equivalent_cost'],
+                condition=Q(is_active=True),
+                name='sub_active_monthly_cost_idx',
+            ),
+            models.Index(
+                fields=['yearly_equivalent_cost'],
+                condition=Q(is_active=True),
+                name='sub_active_yearly_cost_idx',
+            ),
+            # Lets imports check names against the table in bulk
+            models.Index(fields=['name'], name='sub_name_idx'),
+            # The admin lists inactive subscriptions too: its ordering, date
+            # hierarchy and page queries walk this instead of sorting
+            models.Index(fields=['renewal_date'], name='sub_renewal_idx'),
+        ]
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """
+        Remember the stored values of the loaded fields, so saves can tell
+        what changed without reading the row again.
+        """
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+    
+    def has_changed(self, attname):
+        """
+        Whether a field differs from the stored row, as far as this instance
+        knows: on new instances and for fields never loaded it has.
+        """
+        loaded = getattr(self, '_loaded_values', None)
+        if self._state.adding or loaded is None or attname not in loaded:
+            return True
+        return loaded[attname] != getattr(self, attname)
     
     def save(self, *args, **kwargs):
         """
         Override save method to automatically calculate renewal_date
         based on billing_cycle and start_date.
         """
-        # Always recalculate renewal_date when start_date or billing_cycle changes
-        self.calculate_renewal_date()
+        # Always recalculate renewal_date when start_date or billing_cycle changes.
+        # Saves limited to other fields (e.g. a manual renewal_date) keep it as is.
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or {'start_date', 'billing_cycle'} & set(update_fields):
+            self.calculate_renewal_date()
+        # Billing stops at deactivation, so keep track of when it happened
+        if update_fields is None or 'is_active' in update_fields:
+            if self.is_active:
+                self.deactivated_at = None
+            elif self.deactivated_at is None:
+                self.deactivated_at = timezone.now()
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'deactivated_at'}
+        # Only a new category name needs its row; most saves keep theirs
+        if (update_fields is None or 'category' in update_fields) and self.has_changed('category_id'):
+            Category.objects.ensure([self.category_id])
         super().save(*args, **kwargs)
+        
+        # The row now holds the saved values
+        saved_fields = (
+            self._meta.concrete_fields if update_fields is None
+            else [self._meta.get_field(name) for name in kwargs['update_fields']]
+        )
+        self._loaded_values = {
+            **getattr(self, '_loaded_values', {}),
+            **{field.attname: getattr(self, field.attname) for field in saved_fields if not field.generated},
+        }
     
     def update_renewal_date_manually(self, new_renewal_date):
         """
@@ -76,61 +321,17 @@ class Subscription(models.Model):
         This allows users to set custom renewal dates.
         """
         self.renewal_date = new_renewal_date
-        self.save(update_fields=['renewal_date'])
+        self.save(update_fields=['renewal_date', 'updated_at'])
     
-    def calculate_renewal_date(self):
+    def calculate_renewal_date(self, today=None):
         """
         Calculate the next upcoming renewal date based on billing cycle and start date.
         This finds the next renewal date that is in the future, not just the first one.
         """
         if not self.start_date or not self.billing_cycle:
             return
-            
-        from datetime import date
-        today = date.today()
-        
-        if self.billing_cycle == 'monthly':
-            # Calculate the next monthly renewal date
-            self.renewal_date = self._get_next_monthly_renewal(today)
-        elif self.billing_cycle == 'yearly':
-            # Calculate the next yearly renewal date
-            self.renewal_date = self._get_next_yearly_renewal(today)
-    
-    def _get_next_monthly_renewal(self, today):
-        """
-        Get the next monthly renewal date that is in the future.
-        """
-        from datetime import date
-        
-        # Start with the first renewal date (1 month after start)
-        if self.start_date.month == 12:
-            next_renewal = self.start_date.replace(year=self.start_date.year + 1, month=1)
-        else:
-            next_renewal = self.start_date.replace(month=self.start_date.month + 1)
-        
-        # Keep adding months until we find a date in the future
-        while next_renewal <= today:
-            if next_renewal.month == 12:
-                next_renewal = next_renewal.replace(year=next_renewal.year + 1, month=1)
-            else:
-                next_renewal = next_renewal.replace(month=next_renewal.month + 1)
-        
-        return next_renewal
-    
-    def _get_next_yearly_renewal(self, today):
-        """
-        Get the next yearly renewal date that is in the future.
-        """
-        from datetime import date
-        
-        # Start with the first renewal date (1 year after start)
-        next_renewal = self.start_date.replace(year=self.start_date.year + 1)
         
-        # Keep adding years until we find a date in the future
-        while next_renewal <= today:
-            next_renewal = next_renewal.replace(year=next_renewal.year + 1)
-        
-        return next_renewal
+        self.renewal_date = next_renewal_date(self.start_date, self.billing_cycle, today)
     
     def get_days_until_renewal(self):
         """
@@ -214,3 +415,104 @@ class Subscription(models.Model):
     
     def __str__(self):
         return f"{self.name} - ${self.cost}/{self.billing_cycle}"
+
+
+class SearchDocumentField(models.TextField):
+    """
+    The column named after an FTS5 table, which stands for the whole row in
+    MATCH queries.
+    """
+
+
+@SearchDocumentField.register_lookup
+class Match(models.Lookup):
+    lookup_name = 'match'
+    
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f"{lhs} MATCH {rhs}", [*lhs_params, *rhs_params]
+
+
+class SubscriptionSearchIndex(models.Model):
+    """
+    Read-only view of the FTS5 search index over subscription names and
+    categories. The table and the triggers filling it are created by
+    migration (see search.py), on SQLite only.
+    """
+    subscription = models.OneToOneField(
+        Subscription,
+        on_delete=models.DO_NOTHING,
+        primary_key=True,
+        db_column='rowid',
+        db_constraint=False,
+        related_name='search_document'
+    )
+    document = SearchDocumentField(db_column=SEARCH_TABLE)
+    name = models.TextField()
+    category = models.TextField()
+    # BM25 score of the current MATCH; lower is a better match
+    rank = models.FloatField()
+    
+    class Meta:
+        managed = False
+        db_table = SEARCH_TABLE
+    
+    def __str__(self):
+        return f"Search document for subscription {self.subscription_id}"
+
+
+class BillingEvent(models.Model):
+    """
+    One charge of a subscription: the ledger of what has actually been
+    spent, appended to by the build_ledger command.
+    """
+    subscription = models.ForeignKey(
+        Subscription,
+        on_delete=models.CASCADE,
+        related_name='billing_events',
+        # The unique constraint below starts with the subscription
+        db_index=False
+    )
+    date = models.DateField(help_text="Day the subscription was charged")
+    amount = models.DecimalField(max_digits=10, decimal_places=2)
+    
+    class Meta:
+        ordering = ['date']
+        verbose_name = "Billing event"
+        verbose_name_plural = "Billing events"
+        constraints = [
+            models.UniqueConstraint(fields=['subscription', 'date'], name='billing_event_sub_date_uniq'),
+        ]
+        # Covers total, date range and per-subscription sums, so they never
+        # read the table itself
+        indexes = [
+            models.Index(fields=['date', 'subscription', 'amount'], name='billing_event_date_sub_idx'),
+        ]
+    
+    def __str__(self):
+        return f"Subscription {self.subscription_id} - ${self.amount} on {self.date}"
+
+
+class DailySnapshot(models.Model):
+    """
+    End-of-day totals of the active subscriptions, written once per day by
+    the snapshot_stats command and charted by the trends endpoint.
+    """
+    date = models.DateField(unique=True)
+    active_subscriptions = models.PositiveIntegerField()
+    total_monthly_cost = models.DecimalField(max_digits=14, decimal_places=2)
+    # Category -> monthly cost, as in the stats category breakdown
+    category_breakdown = models.JSONField(default=dict)
+    approximate = models.BooleanField(
+        default=False,
+        help_text="Backfilled after the day from the current costs and categories"
+    )
+    
+    class Meta:
+        ordering = ['date']
+        verbose_name = "Daily snapshot"
+        verbose_name_plural = "Daily snapshots"
+    
+    def __str__(self):
+        return f"{self.date} - {self.active_subscriptions} active, ${self.total_monthly_cost}/month"
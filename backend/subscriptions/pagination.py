@@ -0,0 +1,135 @@
+from base64 import b64decode, b64encode
+from datetime import date
+from urllib import parse
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class SubscriptionCursorPagination(BasePagination):
+    """
+    Keyset pagination over the (renewal_date, id) ordering.
+
+    Each page seeks straight to the row after (or before) the cursor
+    position and never counts the queryset, so a deep page costs the same
+    as the first one. Cursors are opaque to clients.
+    """
+    page_size = api_settings.PAGE_SIZE
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.get_page(list(self.page_queryset(queryset, request)))
+
+    async def apaginate_queryset(self, queryset, request):
+        """
+        Async version of paginate_queryset, for the async read views.
+        """
+        return self.get_page([subscription async for subscription in self.page_queryset(queryset, request)])
+
+    def page_queryset(self, queryset, request):
+        """
+        Narrow the queryset to the rows of the requested page, plus one.
+        """
+        self.base_url = request.build_absolute_uri()
+        self.position, self.reverse = self.decode_cursor(request)
+
+        if self.reverse:
+            queryset = queryset.order_by('-renewal_date', '-id')
+        else:
+            queryset = queryset.order_by('renewal_date', 'id')
+
+        if self.position is not None:
+            renewal_date, pk = self.position
+            # The renewal_date bound lets the database seek the index before
+            # checking the id tiebreaker.
+            if self.reverse:
+                queryset = queryset.filter(
+                    Q(renewal_date__lte=renewal_date)
+                    & (Q(renewal_date__lt=renewal_date) | Q(id__lt=pk))
+                )
+            else:
+                queryset = queryset.filter(
+                    Q(renewal_date__gte=renewal_date)
+                    & (Q(renewal_date__gt=renewal_date) | Q(id__gt=pk))
+                )
+
+        # Fetch one extra row to know whether another page follows
+        return queryset[:self.page_size + 1]
+
+    def get_page(self, results):
+        """
+        Trim the rows fetched by page_queryset to the page.
+        """
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if self.reverse:
+            results.reverse()
+            self.has_next = self.position is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = self.position is not None
+
+        self.first = results[0] if results else None
+        self.last = results[-1] if results else None
+        return results
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_next_link(self):
+        if not self.has_next or self.last is None:
+            return None
+        return self.encode_cursor(self.last, reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or self.first is None:
+            return None
+        return self.encode_cursor(self.first, reverse=True)
+
+    def decode_cursor(self, request):
+        """
+        Get ((renewal_date, id), reverse) from the cursor query parameter.
+        """
+        # request.GET rather than query_params, so plain Django requests work too
+        encoded = request.GET.get(self.cursor_query_param)
+        if encoded is None:
+            return None, False
+
+        try:
+            querystring = b64decode(encoded.encode('ascii')).decode('ascii')
+            tokens = parse.parse_qs(querystring, keep_blank_values=True)
+            renewal_date = date.fromisoformat(tokens['d'][0])
+            pk = int(tokens['i'][0])
+            reverse = bool(int(tokens.get('r', ['0'])[0]))
+        except (TypeError, ValueError, KeyError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+        return (renewal_date, pk), reverse
+
+    def encode_cursor(self, subscription, reverse):
+        tokens = {'d': subscription.renewal_date.isoformat(), 'i': subscription.pk}
+        if reverse:
+            tokens['r'] = '1'
+        encoded = b64encode(parse.urlencode(tokens, doseq=True).encode('ascii')).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
@@ -0,0 +1,188 @@
+"""
+Closed-form renewal date calculation.
+
+A renewal falls a whole number of billing cycles after the start date. When
+the start day does not exist in the target month (the 31st, or Feb 29 in a
+non-leap year) the renewal is clamped to the last day of that month, while
+later renewals keep using the original start day.
+
+``next_renewal_date`` handles one subscription; ``next_renewal_dates`` takes
+arrays and computes every renewal in one vectorized pass. Both use the same
+month arithmetic, so they always agree. ``billing_dates_between`` expands
+the same schedule into every billing date within a range, and
+``next_renewal_date_sql`` is the same calculation as an SQLite expression,
+for updates that never load the rows.
+"""
+import calendar
+from datetime import date
+
+import numpy as np
+
+
+CYCLE_MONTHS = {
+    'monthly': 1,
+    'yearly': 12,
+}
+
+
+def add_months(start_date, months):
+    """
+    Return start_date moved forward by a number of months, clamping the day
+    to the end of the target month.
+    """
+    month_index = start_date.year * 12 + start_date.month - 1 + months
+    year, month = divmod(month_index, 12)
+    month += 1
+    day = min(start_date.day, calendar.monthrange(year, month)[1])
+    return date(year, month, day)
+
+
+def next_renewal_date(start_date, billing_cycle, today=None):
+    """
+    Get the first renewal after today for a subscription, in constant time.
+    Start dates in the future renew one full cycle after they start.
+    """
+    if today is None:
+        today = date.today()
+    step = CYCLE_MONTHS[billing_cycle]
+
+    months_elapsed = (today.year - start_date.year) * 12 + today.month - start_date.month
+    cycles = max(1, months_elapsed // step)
+    renewal = add_months(start_date, cycles * step)
+    if renewal <= today:
+        renewal = add_months(start_date, (cycles + 1) * step)
+    return renewal
+
+
+def add_months_array(start_dates, months):
+    """
+    Vectorized add_months over a datetime64[D] array and an integer array.
+    The arrays broadcast, so a column of start dates and a matrix of months
+    give a matrix of dates.
+    """
+    start_months = start_dates.astype('datetime64[M]')
+    day_offsets = (start_dates - start_months.astype('datetime64[D]')).astype(np.int64)
+
+    target_months = start_months.astype(np.int64) + months
+    if not target_months.size:
+        return target_months.astype('datetime64[D]')
+    # Month starts and lengths from a table of the few months spanned, which
+    # is much cheaper than converting every target month to days.
+    first_month = target_months.min()
+    first_days = np.arange(first_month, target_months.max() + 2).astype('datetime64[M]').astype('datetime64[D]')
+    month_lengths = np.diff(first_days).astype(np.int64)
+    index = target_months - first_month
+    return first_days[index] + np.minimum(day_offsets, month_lengths[index] - 1).astype('timedelta64[D]')
+
+
+def cycle_steps(billing_cycles):
+    """
+    Get the months per cycle of each name in an array of billing cycles.
+    """
+    steps = np.ones(len(billing_cycles), dtype=np.int64)
+    for cycle, months in CYCLE_MONTHS.items():
+        steps[billing_cycles == cycle] = months
+    return steps
+
+
+def next_renewal_dates(start_dates, billing_cycles, today=None):
+    """
+    Batch version of next_renewal_date.
+
+    ``start_dates`` and ``billing_cycles`` are equal-length sequences (or
+    NumPy arrays) of dates and cycle names. Returns a datetime64[D] array of
+    next renewals in the same order.
+    """
+    if today is None:
+        today = date.today()
+    start_dates = np.asarray(start_dates, dtype='datetime64[D]')
+    billing_cycles = np.asarray(billing_cycles)
+
+    steps = cycle_steps(billing_cycles)
+
+    today_value = np.datetime64(today, 'D')
+    months_elapsed = (
+        np.datetime64(today, 'M') - start_dates.astype('datetime64[M]')
+    ).astype(np.int64)
+    cycles = np.maximum(1, months_elapsed // steps)
+
+    renewals = add_months_array(start_dates, cycles * steps)
+    overdue = renewals <= today_value
+    if overdue.any():
+        renewals[overdue] = add_months_array(
+            start_dates[overdue], (cycles[overdue] + 1) * steps[overdue]
+        )
+    return renewals
+
+
+def billing_dates_between(start_dates, steps, first_dates, last_dates):
+    """
+    Get every billing date of each row from its first to its last date
+    (both included). Billing starts on the start date and repeats every
+    step months, on the same renewal days as next_renewal_dates.
+
+    All arguments are equal-length arrays (datetime64[D], and integer
+    months per cycle). Returns (row index, billing date) arrays.
+    """
+    start_months = start_dates.astype('datetime64[M]')
+    # Cycles landing in the months of the first and last dates; the day
+    # check below drops the ends that fall outside the range.
+    first_cycles = np.maximum(0, (first_dates.astype('datetime64[M]') - start_months).astype(np.int64) // steps)
+    last_cycles = (last_dates.astype('datetime64[M]') - start_months).astype(np.int64) // steps
+    width = int((last_cycles - first_cycles).max(initial=-1)) + 1
+    if width <= 0:
+        return np.array([], dtype=np.int64), np.array([], dtype='datetime64[D]')
+
+    # One row per input row, one column per cycle
+    cycles = first_cycles[:, np.newaxis] + np.arange(width)
+    dates = add_months_array(start_dates[:, np.newaxis], cycles * steps[:, np.newaxis])
+    billed = (
+        (cycles <= last_cycles[:, np.newaxis])
+        & (dates >= first_dates[:, np.newaxis])
+        & (dates <= last_dates[:, np.newaxis])
+    )
+    rows = np.broadcast_to(np.arange(len(start_dates))[:, np.newaxis], billed.shape)
+    return rows[billed], dates[billed]
+
+
+def apply_renewal_dates(subscriptions, today=None):
+    """
+    Set renewal_date on a list of Subscription instances in one batch.
+    Returns the list for convenience.
+    """
+    if not subscriptions:
+        return subscriptions
+    renewals = next_renewal_dates(
+        [subscription.start_date for subscription in subscriptions],
+        [subscription.billing_cycle for subscription in subscriptions],
+        today,
+    )
+    for subscription, renewal in zip(subscriptions, renewals.tolist()):
+        subscription.renewal_date = renewal
+    return subscriptions
+
+
+def next_renewal_date_sql(today=None):
+    """
+    SQLite expression for next_renewal_date() of the start_date and
+    billing_cycle columns. Returns (sql, params).
+    """
+    if today is None:
+        today = date.today()
+    step = '(CASE billing_cycle {} ELSE 1 END)'.format(
+        ' '.join(f"WHEN '{cycle}' THEN {months}" for cycle, months in CYCLE_MONTHS.items())
+    )
+    start_month = "(CAST(strftime('%%Y', start_date) AS INTEGER) * 12 + CAST(strftime('%%m', start_date) AS INTEGER))"
+    # SQLite division truncates where Python's floors, which only differs
+    # for start dates in the future, and MAX() sends those to 1 either way
+    cycles = f'MAX(1, ({today.year * 12 + today.month} - {start_month}) / {step})'
+
+    def add_months(months):
+        month_start = f"date(start_date, 'start of month', ({months}) || ' months')"
+        day = f"date({month_start}, (CAST(strftime('%%d', start_date) AS INTEGER) - 1) || ' days')"
+        month_end = f"date({month_start}, '+1 month', '-1 day')"
+        return f'MIN({day}, {month_end})'
+
+    renewal = add_months(f'{cycles} * {step}')
+    following = add_months(f'({cycles} + 1) * {step}')
+    return f'CASE WHEN {renewal} > %s THEN {renewal} ELSE {following} END', [today.isoformat()]
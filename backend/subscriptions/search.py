@@ -0,0 +1,94 @@
+"""
+Full-text search over subscription names and categories.
+
+On SQLite the search index is an FTS5 table using the subscriptions table as
+its external content, so it stores only the index itself. Triggers keep it in
+sync with every insert, update and delete, including bulk_create() and
+queryset updates that never send model signals. Prefix indexes on 2 and 3
+characters keep typeahead queries from scanning the term list.
+
+The SQL below is the current definition of the table and its triggers.
+Migrations keep their own copies, so a change here needs a new migration;
+checks.py reports a database that lost them.
+
+Other databases fall back to case-insensitive substring matches.
+"""
+import re
+
+from django.db import connection, models
+
+
+SEARCH_TABLE = 'subscriptions_subscription_fts'
+CONTENT_TABLE = 'subscriptions_subscription'
+
+# Largest number of typeahead suggestions
+TYPEAHEAD_MAX_RESULTS = 50
+
+CREATE_SEARCH_TABLE = f"""
+CREATE VIRTUAL TABLE {SEARCH_TABLE} USING fts5(
+    name,
+    category,
+    content='{CONTENT_TABLE}',
+    content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2',
+    prefix='2 3'
+)
+"""
+
+# A name match ranks well above a category match
+SET_SEARCH_RANK = f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}, rank) VALUES('rank', 'bm25(10.0, 1.0)')"
+
+REBUILD_SEARCH_TABLE = f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES('rebuild')"
+
+# Triggers are dropped with their table, so migrations that rebuild the
+# subscriptions table have to create them again
+CREATE_SEARCH_TRIGGERS = [
+    f"""
+    CREATE TRIGGER {SEARCH_TABLE}_insert AFTER INSERT ON {CONTENT_TABLE} BEGIN
+        INSERT INTO {SEARCH_TABLE}(rowid, name, category) VALUES (new.id, new.name, new.category);
+    END
+    """,
+    f"""
+    CREATE TRIGGER {SEARCH_TABLE}_delete AFTER DELETE ON {CONTENT_TABLE} BEGIN
+        INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}, rowid, name, category)
+        VALUES ('delete', old.id, old.name, old.category);
+    END
+    """,
+    f"""
+    CREATE TRIGGER {SEARCH_TABLE}_update AFTER UPDATE OF name, category ON {CONTENT_TABLE} BEGIN
+        INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}, rowid, name, category)
+        VALUES ('delete', old.id, old.name, old.category);
+        INSERT INTO {SEARCH_TABLE}(rowid, name, category) VALUES (new.id, new.name, new.category);
+    END
+    """,
+]
+
+SEARCH_TRIGGERS = [f'{SEARCH_TABLE}_{event}' for event in ('insert', 'delete', 'update')]
+
+DROP_SEARCH_TRIGGERS = [f'DROP TRIGGER IF EXISTS {trigger}' for trigger in SEARCH_TRIGGERS]
+
+
+def search_terms(text):
+    """
+    Get the words of a search, lowercased.
+    """
+    return re.findall(r'\w+', text.lower())
+
+
+def search_subscriptions(queryset, text):
+    """
+    Filter a Subscription queryset to the rows matching every word of the
+    search, each as a prefix. Returns (queryset, ranked), where ranked says
+    whether the queryset can be ordered by search_document__rank. A search
+    without any words leaves the queryset as it is.
+    """
+    terms = search_terms(text)
+    if not terms:
+        return queryset, False
+    if connection.vendor != 'sqlite':
+        for term in terms:
+            queryset = queryset.filter(models.Q(name__icontains=term) | models.Q(category__name__icontains=term))
+        return queryset, False
+    # Quoted, so words are never read as FTS5 operators
+    match = ' '.join(f'"{term}"*' for term in terms)
+    return queryset.filter(search_document__document__match=match), True
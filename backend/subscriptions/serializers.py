@@ -1,6 +1,121 @@
 from rest_framework import serializers
-from .models import Subscription
+from django.db import transaction
+from django.utils import timezone
+from .models import Category, Subscription, IN_CLAUSE_SIZE
+from .renewals import apply_renewal_dates
+from .cache import bump_stats_version
+from .events import publish_refresh
+from collections import defaultdict
 from datetime import datetime
+from decimal import Decimal
+
+
+class SubscriptionListSerializer(serializers.ListSerializer):
+    """
+    Writes many subscriptions with bulk queries instead of one save() each.
+    For updates, pass a dict of instances keyed by id and give every item
+    an "id".
+    """
+    
+    def to_internal_value(self, data):
+        self.update_targets = []
+        self.update_target_ids = set()
+        return super().to_internal_value(data)
+    
+    def run_child_validation(self, data):
+        """Validate each update item against the instance it targets."""
+        if self.instance is not None:
+            try:
+                instance = self.instance.get(int(data['id']))
+            except (TypeError, ValueError, KeyError):
+                instance = None
+            if instance is None or instance.pk in self.update_target_ids:
+                raise serializers.ValidationError({'id': ['Unknown or duplicate subscription id']})
+            self.child.instance = instance
+            self.child.initial_data = data
+            self.update_targets.append(instance)
+            self.update_target_ids.add(instance.pk)
+        return super().run_child_validation(data)
+    
+    def create(self, validated_data):
+        now = timezone.now()
+        subscriptions = [Subscription(**attrs) for attrs in validated_data]
+        for subscription in subscriptions:
+            # As Subscription.save() does
+            if not subscription.is_active:
+                subscription.deactivated_at = now
+        apply_renewal_dates(subscriptions)
+        with transaction.atomic():
+            Category.objects.ensure(attrs.get('category_id') for attrs in validated_data)
+            subscriptions = Subscription.objects.bulk_create(subscriptions)
+        transaction.on_commit(bump_stats_version)
+        publish_refresh()
+        return subscriptions
+    
+    def update(self, instances, validated_data):
+        now = timezone.now()
+        item_fields = []
+        needs_renewal = []
+        for instance, attrs in zip(self.update_targets, validated_data):
+            for attr, value in attrs.items():
+                setattr(instance, attr, value)
+            instance.updated_at = now
+            fields = set(attrs)
+            if 'start_date' in attrs or 'billing_cycle' in attrs:
+                needs_renewal.append(instance)
+                fields.add('renewal_date')
+            if 'is_active' in attrs:
+                # As Subscription.save() does
+                if instance.is_active:
+                    instance.deactivated_at = None
+                elif instance.deactivated_at is None:
+                    instance.deactivated_at = now
+                fields.add('deactivated_at')
+            item_fields.append(tuple(sorted(fields)))
+        apply_renewal_dates(needs_renewal)
+        
+        # Each row only gets the fields its item sent, so other fields keep
+        # whatever concurrent writes gave them. Rows receiving identical
+        # values for the same fields share one UPDATE; this is much cheaper
+        # than the per-row CASE expressions bulk_update() builds.
+        ids_by_values = defaultdict(list)
+        for instance, fields in zip(self.update_targets, item_fields):
+            values = tuple(getattr(instance, field) for field in fields)
+            ids_by_values[fields, values].append(instance.pk)
+        
+        with transaction.atomic():
+            Category.objects.ensure(attrs.get('category_id') for attrs in validated_data)
+            for (fields, values), ids in ids_by_values.items():
+                for offset in range(0, len(ids), IN_CLAUSE_SIZE):
+                    Subscription.objects.filter(
+                        id__in=ids[offset:offset + IN_CLAUSE_SIZE]
+                    ).update(updated_at=now, **dict(zip(fields, values)))
+        transaction.on_commit(bump_stats_version)
+        publish_refresh()
+        return self.update_targets
+
+
+def pricing_options(subscription):
+    """
+    Get Subscription.get_available_pricing_options() with float prices.
+    """
+    return {
+        cycle: {**option, 'price': float(option['price'])}
+        for cycle, option in subscription.get_available_pricing_options().items()
+    }
+
+
+def savings_opportunity(subscription):
+    """
+    Get Subscription.get_savings_opportunity() with float amounts.
+    """
+    savings = subscription.get_savings_opportunity()
+    if savings is None:
+        return None
+    return {
+        key: value if key == 'recommendation' else float(value)
+        for key, value in savings.items()
+    }
 
 
 class SubscriptionSerializer(serializers.ModelSerializer):
@@ -12,6 +127,14 @@ class SubscriptionSerializer(serializers.ModelSerializer):
     yearly_equivalent_cost = serializers.SerializerMethodField()
     available_pricing_options = serializers.SerializerMethodField()
     savings_opportunity = serializers.SerializerMethodField()
+    # By name; unknown names create the category
+    category = serializers.CharField(
+        source='category_id',
+        max_length=Category._meta.get_field('name').max_length,
+        allow_blank=True,
+        allow_null=True,
+        required=False
+    )
     
     class Meta:
         model = Subscription
@@ -22,6 +145,7 @@ class SubscriptionSerializer(serializers.ModelSerializer):
             'yearly_equivalent_cost', 'available_pricing_options', 'savings_opportunity'
         ]
         read_only_fields = ['id', 'created_at', 'updated_at', 'renewal_date', 'cost']
+        list_serializer_class = SubscriptionListSerializer
     
     def get_days_until_renewal(self, obj):
         """Calculate days until renewal."""
@@ -37,22 +161,11 @@ class SubscriptionSerializer(serializers.ModelSerializer):
     
     def get_available_pricing_options(self, obj):
         """Get available pricing options for this subscription."""
-        return obj.get_available_pricing_options()
+        return pricing_options(obj)
     
     def get_savings_opportunity(self, obj):
         """Get savings opportunity information."""
-        savings = obj.get_savings_opportunity()
-        if savings:
-            # Convert Decimal to float for JSON serialization
-            return {
-                'monthly_cost': float(savings['monthly_cost']),
-                'yearly_cost': float(savings['yearly_cost']),
-                'monthly_yearly_equivalent': float(savings['monthly_yearly_equivalent']),
-                'savings': float(savings['savings']),
-                'savings_percentage': float(savings['savings_percentage']),
-                'recommendation': savings['recommendation']
-            }
-        return None
+        return savings_opportunity(obj)
     
     
     def validate_monthly_price(self, value):
@@ -69,8 +182,14 @@ class SubscriptionSerializer(serializers.ModelSerializer):
     
     def validate(self, data):
         """Validate that at least one pricing option is provided."""
-        monthly_price = data.get('monthly_price')
-        yearly_price = data.get('yearly_price')
+        # Partial updates fall back to the stored values
+        def current(field):
+            if field in data:
+                return data[field]
+            return getattr(self.instance, field, None)
+        
+        monthly_price = current('monthly_price')
+        yearly_price = current('yearly_price')
         
         if not monthly_price and not yearly_price:
             raise serializers.ValidationError(
@@ -78,7 +197,7 @@ class SubscriptionSerializer(serializers.ModelSerializer):
             )
         
         # Validate that the current billing cycle has a corresponding price
-        billing_cycle = data.get('billing_cycle')
+        billing_cycle = current('billing_cycle')
         
         if billing_cycle == 'monthly' and not monthly_price:
             raise serializers.ValidationError(
@@ -90,8 +209,18 @@ class SubscriptionSerializer(serializers.ModelSerializer):
                 "Yearly price is required when billing cycle is yearly"
             )
         
+        # cost is read-only: it is always the price of the current billing cycle
+        if billing_cycle == 'monthly':
+            data['cost'] = monthly_price
+        elif billing_cycle == 'yearly':
+            data['cost'] = yearly_price
+        
         return data
     
+    def validate_category(self, value):
+        """Blank categories are stored as no category."""
+        return value or None
+    
     def validate_renewal_date(self, value):
         """Validate that renewal date is not in the past."""
         if value < datetime.now().date():
@@ -110,3 +239,70 @@ class SubscriptionStatsSerializer(serializers.Serializer):
     category_breakdown = serializers.DictField()
     total_spent = serializers.DecimalField(max_digits=10, decimal_places=2)
     time_since_first_subscription = serializers.IntegerField(allow_null=True)
+
+
+class SubscriptionReadSerializer(serializers.BaseSerializer):
+    """
+    Read-only fast path producing the same output as SubscriptionSerializer.
+    
+    Output fields are resolved once per serializer instead of once per row,
+    "today" comes from the serializer context (one per request), and a
+    `fields` set in the context limits the output to those fields so the
+    derived ones are skipped entirely when not requested.
+    """
+    FIELDS = SubscriptionSerializer.Meta.fields
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        requested = self.context.get('fields')
+        today = self.context.get('today') or datetime.now().date()
+        # DateTimeField looks the timezone up again for every value
+        tz = serializers.DateTimeField().default_timezone()
+        
+        # Prices set in code may be ints or floats until the row is
+        # reloaded; show those with the places the database stores
+        places = Decimal(1).scaleb(-Subscription._meta.get_field('cost').decimal_places)
+        
+        def decimal(value):
+            if value is None:
+                return None
+            if not isinstance(value, Decimal):
+                value = Decimal(str(value)).quantize(places)
+            return f'{value:f}'
+        
+        def timestamp(value):
+            if value is None:
+                return None
+            if tz is not None:
+                value = value.astimezone(tz)
+            value = value.isoformat()
+            if value.endswith('+00:00'):
+                value = value[:-6] + 'Z'
+            return value
+        
+        getters = {
+            'id': lambda obj: obj.id,
+            'name': lambda obj: obj.name,
+            'monthly_price': lambda obj: decimal(obj.monthly_price),
+            'yearly_price': lambda obj: decimal(obj.yearly_price),
+            'cost': lambda obj: decimal(obj.cost),
+            'billing_cycle': lambda obj: obj.billing_cycle,
+            'start_date': lambda obj: obj.start_date.isoformat(),
+            'renewal_date': lambda obj: obj.renewal_date.isoformat(),
+            'is_active': lambda obj: obj.is_active,
+            'category': lambda obj: obj.category_id,
+            'created_at': lambda obj: timestamp(obj.created_at),
+            'updated_at': lambda obj: timestamp(obj.updated_at),
+            'days_until_renewal': lambda obj: (obj.renewal_date - today).days,
+            'monthly_equivalent_cost': lambda obj: float(obj.get_monthly_equivalent_cost()),
+            'yearly_equivalent_cost': lambda obj: float(obj.get_yearly_equivalent_cost()),
+            'available_pricing_options': pricing_options,
+            'savings_opportunity': savings_opportunity,
+        }
+        self.getters = [
+            (name, getters[name]) for name in self.FIELDS
+            if requested is None or name in requested
+        ]
+    
+    def to_representation(self, instance):
+        return {name: getter(instance) for name, getter in self.getters}
@@ -0,0 +1,95 @@
+from datetime import datetime
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .cache import bump_stats_version
+from .events import publish_on_commit, publish_refresh
+from .models import Subscription
+from .serializers import SubscriptionReadSerializer
+from .stats import stats_contribution, stats_delta
+
+
+# Changes that leave the row's other fields alone are published as renewal_moved
+RENEWAL_FIELDS = {'renewal_date', 'updated_at'}
+
+# The stored columns, which make up a subscription's state
+STATE_FIELDS = [field.attname for field in Subscription._meta.concrete_fields if not field.generated]
+
+
+@receiver(post_save, sender=Subscription)
+@receiver(post_delete, sender=Subscription)
+def invalidate_stats(sender, **kwargs):
+    """
+    Any saved or deleted subscription makes the cached stats stale.
+
+    The version moves once the write commits: a stats read in between
+    still sees the old rows, and must not cache them under the new version.
+    """
+    transaction.on_commit(bump_stats_version)
+
+
+def subscription_state(instance):
+    """
+    Get the stored columns of a subscription as they are in memory now.
+    """
+    return {name: getattr(instance, name) for name in STATE_FIELDS}
+
+
+def previous_state(instance):
+    """
+    Get the stored columns of a saved subscription as they were before the
+    save, from the values it was loaded with (see Subscription.from_db), or
+    None if it was not loaded with all of them.
+    """
+    loaded = getattr(instance, '_loaded_values', None)
+    if loaded is None or not all(name in loaded for name in STATE_FIELDS):
+        return None
+    return {name: loaded[name] for name in STATE_FIELDS}
+
+
+def change_payload(old_state, new_state):
+    """
+    Get a function making the event data for a change from one state to
+    another (None for no row), so it is only built for listening clients.
+    """
+    def build():
+        today = datetime.now().date()
+        old = old_state and Subscription(**old_state)
+        new = new_state and Subscription(**new_state)
+        return {
+            'subscription': SubscriptionReadSerializer(new or old, context={'today': today}).data,
+            'stats_delta': stats_delta(stats_contribution(old, today), stats_contribution(new, today)),
+        }
+    return build
+
+
+@receiver(post_save, sender=Subscription)
+def publish_change(sender, instance, created, **kwargs):
+    """
+    Publish the saved subscription and its stats delta to the event stream.
+    A save of an instance not loaded with every column has no previous
+    state to compare, so clients are told to refresh instead.
+    """
+    state = subscription_state(instance)
+    if created:
+        publish_on_commit('created', change_payload(None, state))
+        return
+    previous = previous_state(instance)
+    if previous is None:
+        publish_refresh()
+        return
+
+    if previous['is_active'] and not state['is_active']:
+        event = 'deactivated'
+    else:
+        changed = {name for name in STATE_FIELDS if previous[name] != state[name]}
+        event = 'renewal_moved' if 'renewal_date' in changed and changed <= RENEWAL_FIELDS else 'updated'
+    publish_on_commit(event, change_payload(previous, state))
+
+
+@receiver(post_delete, sender=Subscription)
+def publish_delete(sender, instance, **kwargs):
+    """
+    A hard delete leaves the stream as a deactivation.
+    """
+    publish_on_commit('deactivated', change_payload(subscription_state(instance), None))
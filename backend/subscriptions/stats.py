@@ -0,0 +1,257 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+from django.db import connection
+from django.db.models import Count, DecimalField, F, Min, Sum
+from .models import BillingEvent, Category, Subscription
+
+
+UPCOMING_RENEWAL_DAYS = 7
+
+# Wide enough that large tables never overflow the aggregate's precision.
+TOTAL_FIELD = DecimalField(max_digits=20, decimal_places=6)
+
+# The places the generated equivalent cost columns are stored with
+EQUIVALENT_COST_PLACES = Decimal('0.000001')
+
+# category_breakdown key of the subscriptions without a category
+UNCATEGORIZED = 'Uncategorized'
+
+
+def category_rows():
+    """
+    Get the categories with active subscriptions, in name order, as dicts
+    of category, active_count and monthly_cost.
+    
+    On SQLite these are the counters kept by triggers (see categories.py),
+    so this never reads the subscriptions table.
+    """
+    if connection.vendor == 'sqlite':
+        return (
+            Category.objects
+            .filter(active_count__gt=0)
+            .values('active_count', category=F('name'), monthly_cost=F('monthly_total'))
+            .order_by('name')
+        )
+    return (
+        Subscription.objects
+        .filter(is_active=True, category__isnull=False)
+        .values('category')
+        .annotate(active_count=Count('id'), monthly_cost=Sum('monthly_equivalent_cost', output_field=TOTAL_FIELD))
+        .order_by('category')
+    )
+
+
+def stats_querysets(today):
+    """
+    Get the stats queries: (queryset, aggregates) pairs, then the category
+    and upcoming renewal querysets. There is a fixed number of them,
+    independent of how many subscriptions exist.
+    """
+    active_subscriptions = Subscription.objects.filter(is_active=True)
+
+    aggregates = [
+        # Totals and count for active subscriptions in a single query
+        (active_subscriptions, {
+            'total_monthly_cost': Sum('monthly_equivalent_cost', output_field=TOTAL_FIELD),
+            'total_yearly_cost': Sum('yearly_equivalent_cost', output_field=TOTAL_FIELD),
+            'total_active_subscriptions': Count('id'),
+        }),
+        # Subscriptions without a category have no counters
+        (active_subscriptions.filter(category__isnull=True), {
+            'uncategorized_monthly_cost': Sum('monthly_equivalent_cost', output_field=TOTAL_FIELD),
+        }),
+        # Including inactive subscriptions
+        (Subscription.objects.all(), {'first_start_date': Min('start_date')}),
+        # Every charge recorded in the ledger (see the build_ledger command)
+        (BillingEvent.objects.all(), {'total_spent': Sum('amount', output_field=TOTAL_FIELD)}),
+    ]
+
+    upcoming_renewals = active_subscriptions.filter(
+        renewal_date__range=[today, today + timedelta(days=UPCOMING_RENEWAL_DAYS)]
+    ).values('id', 'name', 'renewal_date', 'cost', 'billing_cycle')
+
+    return aggregates, category_rows(), upcoming_renewals
+
+
+def compute_stats(today=None):
+    """
+    Build the data for SubscriptionStatsSerializer.
+    """
+    if today is None:
+        today = datetime.now().date()
+
+    aggregates, category_rows, upcoming_renewals = stats_querysets(today)
+    totals = {}
+    for queryset, aggregate in aggregates:
+        totals.update(queryset.aggregate(**aggregate))
+    return assemble_stats(today, totals, list(category_rows), list(upcoming_renewals))
+
+
+async def acompute_stats(today=None):
+    """
+    Async version of compute_stats, for the async read views.
+    """
+    if today is None:
+        today = datetime.now().date()
+
+    aggregates, category_rows, upcoming_renewals = stats_querysets(today)
+    totals = {}
+    for queryset, aggregate in aggregates:
+        totals.update(await queryset.aaggregate(**aggregate))
+    return assemble_stats(
+        today,
+        totals,
+        [row async for row in category_rows],
+        [row async for row in upcoming_renewals],
+    )
+
+
+def assemble_stats(today, totals, category_rows, upcoming_renewals):
+    """
+    Combine the aggregate query results into the stats payload.
+    
+    The payload also lists the category names, so the dashboard takes
+    them from the same (cached) category query as the breakdown.
+    """
+    time_since_first_subscription = None
+    if totals['first_start_date']:
+        time_since_first_subscription = (today - totals['first_start_date']).days
+
+    upcoming_renewals_list = [
+        {
+            'id': renewal['id'],
+            'name': renewal['name'],
+            'renewal_date': renewal['renewal_date'],
+            'cost': float(renewal['cost']),
+            'billing_cycle': renewal['billing_cycle'],
+            'days_until_renewal': (renewal['renewal_date'] - today).days,
+        }
+        for renewal in upcoming_renewals
+    ]
+
+    category_breakdown = {row['category']: float(row['monthly_cost']) for row in category_rows}
+    if totals['uncategorized_monthly_cost'] is not None:
+        category_breakdown[UNCATEGORIZED] = (
+            category_breakdown.get(UNCATEGORIZED, 0.0) + float(totals['uncategorized_monthly_cost'])
+        )
+
+    return {
+        'total_monthly_cost': float(totals['total_monthly_cost'] or 0),
+        'total_yearly_cost': float(totals['total_yearly_cost'] or 0),
+        'total_active_subscriptions': totals['total_active_subscriptions'],
+        'upcoming_renewals': upcoming_renewals_list,
+        'category_breakdown': category_breakdown,
+        'total_spent': float(totals['total_spent'] or 0),
+        'time_since_first_subscription': time_since_first_subscription,
+        'categories': [row['category'] for row in category_rows],
+    }
+
+
+def stats_contribution(subscription, today=None):
+    """
+    Get what one subscription adds to the stats, or None if it adds
+    nothing (inactive or deleted). Take it before and after a change and
+    pass both to stats_delta.
+    """
+    if subscription is None or not subscription.is_active:
+        return None
+    if today is None:
+        today = datetime.now().date()
+
+    upcoming_renewal = None
+    days_until_renewal = (subscription.renewal_date - today).days
+    if 0 <= days_until_renewal <= UPCOMING_RENEWAL_DAYS:
+        upcoming_renewal = {
+            'id': subscription.id,
+            'name': subscription.name,
+            'renewal_date': subscription.renewal_date,
+            'cost': float(subscription.cost),
+            'billing_cycle': subscription.billing_cycle,
+            'days_until_renewal': days_until_renewal,
+        }
+
+    # Rounded like the generated columns the stats sum; prices set in code
+    # may still be ints or floats until the row is reloaded
+    return {
+        'monthly_cost': Decimal(str(subscription.get_monthly_equivalent_cost())).quantize(EQUIVALENT_COST_PLACES),
+        'yearly_cost': Decimal(str(subscription.get_yearly_equivalent_cost())).quantize(EQUIVALENT_COST_PLACES),
+        'category': subscription.category_id or UNCATEGORIZED,
+        'upcoming_renewal': upcoming_renewal,
+    }
+
+
+def stats_delta(old, new):
+    """
+    Get the change to the stats payload from one subscription's
+    contribution going from old to new (see stats_contribution; None for
+    a subscription that is created, or deleted).
+
+    Totals and category_breakdown hold differences to add; upcoming_renewals
+    lists the ids to drop and the entries to (re)insert. Other stats are
+    unchanged: total_spent only moves with the ledger, and a new earliest
+    start date shows in time_since_first_subscription on the next fetch.
+    """
+    old_monthly = old['monthly_cost'] if old else Decimal(0)
+    new_monthly = new['monthly_cost'] if new else Decimal(0)
+    old_yearly = old['yearly_cost'] if old else Decimal(0)
+    new_yearly = new['yearly_cost'] if new else Decimal(0)
+
+    category_breakdown = {}
+    if old:
+        category_breakdown[old['category']] = -old_monthly
+    if new:
+        category_breakdown[new['category']] = category_breakdown.get(new['category'], 0) + new_monthly
+
+    old_renewal = old and old['upcoming_renewal']
+    new_renewal = new and new['upcoming_renewal']
+    return {
+        'total_monthly_cost': float(new_monthly - old_monthly),
+        'total_yearly_cost': float(new_yearly - old_yearly),
+        'total_active_subscriptions': bool(new) - bool(old),
+        'category_breakdown': {name: float(change) for name, change in category_breakdown.items()},
+        'upcoming_renewals': {
+            'removed': [old_renewal['id']] if old_renewal else [],
+            'added': [new_renewal] if new_renewal else [],
+        },
+    }
+
+
+def compute_spend(start=None, end=None, category=None):
+    """
+    Sum the ledger's charges between two dates (both included, either one
+    optional), in total and per category.
+    """
+    events = BillingEvent.objects.all()
+    if start:
+        events = events.filter(date__gte=start)
+    if end:
+        events = events.filter(date__lte=end)
+    if category:
+        events = events.filter(subscription__category=category)
+
+    category_rows = (
+        events
+        .values('subscription__category')
+        .annotate(spent=Sum('amount', output_field=TOTAL_FIELD), charges=Count('subscription'))
+        .order_by()
+    )
+
+    total_spent = 0.0
+    total_charges = 0
+    category_breakdown = {}
+    for row in category_rows:
+        category_name = row['subscription__category'] or 'Uncategorized'
+        spent = float(row['spent'] or 0)
+        category_breakdown[category_name] = category_breakdown.get(category_name, 0.0) + spent
+        total_spent += spent
+        total_charges += row['charges']
+
+    # SQLite sums the amounts as floats; report whole cents
+    return {
+        'start': start,
+        'end': end,
+        'category': category,
+        'total_spent': round(total_spent, 2),
+        'total_charges': total_charges,
+        'category_breakdown': {name: round(spent, 2) for name, spent in category_breakdown.items()},
+    }
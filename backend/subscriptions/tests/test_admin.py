@@ -0,0 +1,110 @@
+from datetime import date, timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from subscriptions.admin import ChangeListQuerySet
+from subscriptions.models import Category, Subscription
+
+from .utils import SubscriptionTestCase, make_subscription
+
+
+CHANGELIST_URL = '/admin/subscriptions/subscription/'
+
+
+class SubscriptionAdminTests(SubscriptionTestCase):
+
+    def setUp(self):
+        super().setUp()
+        user = get_user_model().objects.create_superuser('admin', 'admin@example.com', None)
+        self.client.force_login(user)
+        today = date.today()
+        for i in range(30):
+            make_subscription(
+                f'Service {i}',
+                start_date=today - timedelta(days=40 * i + 5),
+                billing_cycle='yearly' if i % 3 == 0 else 'monthly',
+                category_id='Music' if i % 2 else None,
+            )
+
+    def changelist(self, **params):
+        response = self.client.get(CHANGELIST_URL, params)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_changelist(self):
+        response = self.changelist()
+        expected = list(Subscription.objects.order_by('renewal_date', 'id')[:10].values_list('pk', flat=True))
+        self.assertEqual([row.pk for row in response.context['cl'].result_list][:10], expected)
+        first = response.context['cl'].result_list[0]
+        self.assertEqual(first.days_until_renewal.days, (first.renewal_date - date.today()).days)
+
+    def test_query_count_does_not_grow_with_rows(self):
+        with CaptureQueriesContext(connection) as few:
+            self.changelist()
+        for i in range(200):
+            make_subscription(f'More {i}', start_date=date.today() - timedelta(days=3 * i + 1), category_id='Video')
+        with CaptureQueriesContext(connection) as many:
+            self.changelist()
+        self.assertEqual(len(few), len(many))
+
+    def test_count_is_capped(self):
+        with mock.patch('subscriptions.admin.CHANGELIST_COUNT_LIMIT', 12):
+            response = self.changelist()
+        self.assertEqual(response.context['cl'].result_count, 12)
+
+    def test_search_filters_and_drilldown(self):
+        self.assertEqual(
+            [row.name for row in self.changelist(q='service 7').context['cl'].result_list], ['Service 7']
+        )
+        yearly = self.changelist(billing_cycle__exact='yearly').context['cl'].result_list
+        self.assertEqual({row.billing_cycle for row in yearly}, {'yearly'})
+
+        renewal = Subscription.objects.order_by('renewal_date').first().renewal_date
+        response = self.changelist(renewal_date__year=renewal.year, renewal_date__month=renewal.month)
+        self.assertEqual(
+            {row.pk for row in response.context['cl'].result_list},
+            set(Subscription.objects.filter(
+                renewal_date__year=renewal.year, renewal_date__month=renewal.month
+            ).values_list('pk', flat=True)),
+        )
+
+    def test_date_hierarchy_periods(self):
+        queryset = ChangeListQuerySet(Subscription)
+        for kind in ('year', 'month', 'day'):
+            for order in ('ASC', 'DESC'):
+                with self.subTest(kind=kind, order=order):
+                    self.assertEqual(
+                        queryset.dates('renewal_date', kind, order),
+                        list(Subscription.objects.dates('renewal_date', kind, order)),
+                    )
+        self.assertEqual(ChangeListQuerySet(Subscription).none().dates('renewal_date', 'month'), [])
+
+    def run_action(self, action, subscriptions):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(CHANGELIST_URL, {
+                'action': action,
+                '_selected_action': [subscription.pk for subscription in subscriptions],
+            }, follow=True)
+
+    def test_deactivate_action(self):
+        selected = list(Subscription.objects.filter(category='Music')[:3])
+        response = self.run_action('deactivate_subscriptions', selected)
+        self.assertContains(response, 'Deactivated 3 subscriptions.')
+        for subscription in selected:
+            subscription.refresh_from_db()
+            self.assertFalse(subscription.is_active)
+            self.assertIsNotNone(subscription.deactivated_at)
+        self.assertEqual(Category.objects.get(name='Music').active_count, 12)
+
+    def test_recompute_action(self):
+        selected = list(Subscription.objects.order_by('id')[:4])
+        Subscription.objects.filter(pk__in=[selected[0].pk, selected[1].pk]).update(renewal_date=date(2020, 1, 1))
+        response = self.run_action('recompute_renewal_dates', selected)
+        self.assertContains(response, 'Changed 2 renewal dates.')
+        for subscription in selected:
+            renewal_date = subscription.renewal_date
+            subscription.refresh_from_db()
+            self.assertEqual(subscription.renewal_date, renewal_date)
@@ -0,0 +1,108 @@
+from datetime import date
+from decimal import Decimal
+
+from subscriptions.models import Category, Subscription
+from subscriptions.renewals import next_renewal_date
+from subscriptions.serializers import SubscriptionSerializer
+
+from .utils import SubscriptionTestCase, make_subscription
+
+
+class BatchEndpointTests(SubscriptionTestCase):
+
+    def item(self, name, **fields):
+        return {
+            'name': name,
+            'monthly_price': '9.99',
+            'billing_cycle': 'monthly',
+            'start_date': '2024-01-31',
+            **fields,
+        }
+
+    def test_batch_create(self):
+        response = self.write('post', '/api/subscriptions/batch_create/', [
+            self.item('Netflix', category='Entertainment'),
+            self.item('Max', category='Entertainment'),
+            self.item('Spotify'),
+        ])
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual([row['name'] for row in response.json()['results']], ['Netflix', 'Max', 'Spotify'])
+        for subscription in Subscription.objects.all():
+            self.assertEqual(subscription.renewal_date, next_renewal_date(date(2024, 1, 31), 'monthly'))
+        self.assertEqual(Category.objects.get(name='Entertainment').active_count, 2)
+
+    def test_batch_create_is_all_or_nothing(self):
+        response = self.write('post', '/api/subscriptions/batch_create/', [
+            self.item('Netflix'),
+            self.item('Yearly', billing_cycle='yearly'),
+        ])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['errors'][0], {})
+        self.assertIn('non_field_errors', response.json()['errors'][1])
+        self.assertFalse(Subscription.objects.exists())
+
+    def test_batch_update(self):
+        netflix = make_subscription('Netflix')
+        spotify = make_subscription('Spotify')
+        response = self.write('patch', '/api/subscriptions/batch_update/', [
+            {'id': netflix.pk, 'category': 'Entertainment'},
+            {'id': spotify.pk, 'billing_cycle': 'yearly', 'yearly_price': '99.00', 'start_date': '2024-02-29'},
+        ])
+        self.assertEqual(response.status_code, 200)
+        netflix.refresh_from_db()
+        spotify.refresh_from_db()
+        self.assertEqual((netflix.name, netflix.category_id), ('Netflix', 'Entertainment'))
+        self.assertEqual((spotify.billing_cycle, spotify.cost), ('yearly', Decimal('99.00')))
+        self.assertEqual(spotify.renewal_date, next_renewal_date(date(2024, 2, 29), 'yearly'))
+
+    def test_batch_update_writes_only_sent_fields(self):
+        netflix = make_subscription('Netflix')
+        spotify = make_subscription('Spotify')
+        instances = Subscription.objects.in_bulk([netflix.pk, spotify.pk])
+        # Changed by another request after the batch read its targets
+        Subscription.objects.filter(pk=spotify.pk).update(name='Spotify Family')
+
+        serializer = SubscriptionSerializer(instances, data=[
+            {'id': netflix.pk, 'name': 'Netflix Premium'},
+            {'id': spotify.pk, 'category': 'Music'},
+        ], many=True, partial=True)
+        self.assertTrue(serializer.is_valid())
+        with self.captureOnCommitCallbacks(execute=True):
+            serializer.save()
+        spotify.refresh_from_db()
+        self.assertEqual((spotify.name, spotify.category_id), ('Spotify Family', 'Music'))
+        self.assertEqual(Subscription.objects.get(pk=netflix.pk).name, 'Netflix Premium')
+
+    def test_batch_update_rejects_unknown_and_duplicate_ids(self):
+        netflix = make_subscription('Netflix')
+        inactive = make_subscription('Old', is_active=False)
+        response = self.write('patch', '/api/subscriptions/batch_update/', [
+            {'id': netflix.pk, 'name': 'Renamed'},
+            {'id': netflix.pk, 'name': 'Again'},
+            {'id': inactive.pk, 'name': 'Revived'},
+            {'name': 'No id'},
+        ])
+        self.assertEqual(response.status_code, 400)
+        errors = response.json()['errors']
+        self.assertEqual(errors[0], {})
+        for error in errors[1:]:
+            self.assertIn('id', error)
+        netflix.refresh_from_db()
+        self.assertEqual(netflix.name, 'Netflix')
+
+    def test_batch_deactivate(self):
+        netflix = make_subscription('Netflix', category_id='Entertainment')
+        inactive = make_subscription('Old', is_active=False)
+        response = self.write('post', '/api/subscriptions/batch_deactivate/', {'ids': [netflix.pk, inactive.pk, 0]})
+        self.assertEqual(response.json()['results'], [
+            {'id': netflix.pk, 'status': 'deactivated'},
+            {'id': inactive.pk, 'status': 'not_found'},
+            {'id': 0, 'status': 'not_found'},
+        ])
+        netflix.refresh_from_db()
+        self.assertFalse(netflix.is_active)
+        self.assertIsNotNone(netflix.deactivated_at)
+        self.assertEqual(Category.objects.get(name='Entertainment').active_count, 0)
+
+        response = self.write('post', '/api/subscriptions/batch_deactivate/', {'ids': ['x']})
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,67 @@
+import json
+
+from django.db import transaction
+
+from subscriptions.cache import get_cache_counters, get_stats_version
+from subscriptions.models import Subscription
+
+from .utils import SubscriptionTestCase, make_subscription
+
+
+class StatsCacheTests(SubscriptionTestCase):
+
+    def get_stats(self):
+        return self.client.get('/api/subscriptions/stats/')
+
+    def test_second_read_is_a_hit(self):
+        make_subscription()
+        first = self.get_stats()
+        second = self.get_stats()
+        self.assertEqual(first['X-Cache'], 'MISS')
+        self.assertEqual(second['X-Cache'], 'HIT')
+        self.assertEqual(first.json(), second.json())
+        counters = self.client.get('/api/subscriptions/stats_cache/').json()
+        self.assertEqual((counters['hits'], counters['misses']), (1, 1))
+        self.assertEqual(counters, get_cache_counters())
+
+    def test_write_invalidates(self):
+        self.get_stats()
+        self.write('post', '/api/subscriptions/', {
+            'name': 'Spotify',
+            'billing_cycle': 'monthly',
+            'monthly_price': '10.99',
+            'start_date': '2025-01-01',
+        })
+        response = self.get_stats()
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.json()['total_active_subscriptions'], 1)
+
+    def test_version_moves_only_after_commit(self):
+        subscription = make_subscription()
+        version = get_stats_version()
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            self.client.patch(
+                f'/api/subscriptions/{subscription.pk}/',
+                json.dumps({'name': 'Renamed'}),
+                content_type='application/json',
+            )
+            # Until the commit, readers must not cache the old rows as new
+            self.assertEqual(get_stats_version(), version)
+        self.assertTrue(callbacks)
+        for callback in callbacks:
+            callback()
+        self.assertNotEqual(get_stats_version(), version)
+
+    def test_rolled_back_write_keeps_cache(self):
+        self.get_stats()
+        version = get_stats_version()
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    make_subscription()
+                    Subscription.objects.update(name='Rolled back')
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+        self.assertEqual(get_stats_version(), version)
+        self.assertEqual(self.get_stats()['X-Cache'], 'HIT')
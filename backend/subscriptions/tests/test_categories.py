@@ -0,0 +1,111 @@
+from datetime import date
+from decimal import Decimal
+
+from django.contrib.admin.sites import site
+from django.db import connection, models, transaction
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+
+from subscriptions.categories import COUNTER_TRIGGERS
+from subscriptions.checks import check_database_objects
+from subscriptions.models import Category, Subscription
+
+from .utils import SubscriptionTestCase, make_subscription
+
+
+class CategoryCounterTests(TestCase):
+    """
+    The database triggers keep every category's counters equal to the sums
+    over its active subscriptions.
+    """
+
+    def assertCountersCorrect(self):
+        expected = {
+            row['category']: (row['count'], row['total'])
+            for row in (
+                Subscription.objects.filter(is_active=True, category__isnull=False)
+                .values('category')
+                .annotate(count=models.Count('id'), total=models.Sum('monthly_equivalent_cost'))
+                .order_by()
+            )
+        }
+        for category in Category.objects.all():
+            count, total = expected.get(category.name, (0, Decimal(0)))
+            self.assertEqual((category.active_count, category.monthly_total), (count, total), category.name)
+
+    def test_counters_follow_writes(self):
+        netflix = make_subscription('Netflix', '15.49', category_id='Entertainment')
+        make_subscription('Max', '120.00', billing_cycle='yearly', category_id='Entertainment')
+        spotify = make_subscription('Spotify', '11.99', category_id='Music')
+        self.assertCountersCorrect()
+        self.assertEqual(Category.objects.get(name='Entertainment').active_count, 2)
+
+        netflix.category_id = 'Music'
+        netflix.save()
+        spotify.billing_cycle = 'yearly'
+        spotify.yearly_price = spotify.cost = Decimal('99.00')
+        spotify.save()
+        self.assertCountersCorrect()
+
+        Subscription.objects.filter(category='Entertainment').deactivate()
+        self.assertCountersCorrect()
+        self.assertEqual(Category.objects.get(name='Entertainment').active_count, 0)
+
+        Subscription.objects.filter(pk=netflix.pk).update(is_active=True)
+        netflix.delete()
+        self.assertCountersCorrect()
+
+    def test_counters_follow_bulk_create(self):
+        Category.objects.ensure(['Storage'])
+        Subscription.objects.bulk_create([
+            Subscription(
+                name=f'Drive {i}', cost=Decimal('2.99'), monthly_price=Decimal('2.99'),
+                billing_cycle='monthly', start_date=date(2024, 1, 1), renewal_date=date(2024, 2, 1),
+                category_id='Storage', is_active=i % 3 != 0,
+            )
+            for i in range(9)
+        ])
+        self.assertCountersCorrect()
+        self.assertEqual(Category.objects.get(name='Storage').active_count, 6)
+
+    def test_counters_roll_back(self):
+        make_subscription('Netflix', '15.49', category_id='Entertainment')
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            make_subscription('Max', '16.99', category_id='Entertainment')
+            raise RuntimeError
+        self.assertCountersCorrect()
+        self.assertEqual(Category.objects.get(name='Entertainment').active_count, 1)
+
+
+    def test_missing_counter_triggers_are_reported(self):
+        # Rolled back with the test
+        with connection.cursor() as cursor:
+            cursor.execute(f'DROP TRIGGER {COUNTER_TRIGGERS[0]}')
+        errors = check_database_objects(None, databases=['default'])
+        self.assertEqual([error.id for error in errors], ['subscriptions.W001'])
+        self.assertIn(COUNTER_TRIGGERS[0], errors[0].msg)
+
+
+class CategoryNameTests(SubscriptionTestCase):
+
+    def test_admin_name_is_read_only_once_saved(self):
+        category_admin = site._registry[Category]
+        request = RequestFactory().get('/')
+        self.assertNotIn('name', category_admin.get_readonly_fields(request))
+        category = Category.objects.create(name='Music')
+        self.assertIn('name', category_admin.get_readonly_fields(request, category))
+
+    def test_category_row_is_ensured_only_on_change(self):
+        subscription = make_subscription('Spotify', category_id='Music')
+        url = f'/api/subscriptions/{subscription.pk}/'
+        category_table = Category._meta.db_table
+
+        with CaptureQueriesContext(connection) as queries:
+            self.write('patch', url, {'name': 'Spotify Family'})
+        self.assertFalse([query for query in queries if category_table in query['sql'] and 'INSERT' in query['sql']])
+
+        with CaptureQueriesContext(connection) as queries:
+            self.write('patch', url, {'category': 'Streaming'})
+        self.assertTrue([query for query in queries if category_table in query['sql'] and 'INSERT' in query['sql']])
+        self.assertEqual(Category.objects.get(name='Streaming').active_count, 1)
+        self.assertEqual(Category.objects.get(name='Music').active_count, 0)
@@ -0,0 +1,42 @@
+from django.db import transaction
+
+from .utils import SubscriptionTestCase, make_subscription
+
+
+class ConditionalRequestTests(SubscriptionTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.subscription = make_subscription('Netflix')
+
+    def test_not_modified_until_a_write(self):
+        for url in ('/api/subscriptions/', '/api/subscriptions/stats/'):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                etag = response['ETag']
+                self.assertIn('no-cache', response['Cache-Control'])
+
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response['ETag'], etag)
+                self.assertEqual(response.content, b'')
+
+                self.write('patch', f'/api/subscriptions/{self.subscription.pk}/', {'name': url})
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 200)
+                self.assertNotEqual(response['ETag'], etag)
+
+    def test_etag_depends_on_the_query(self):
+        etag = self.client.get('/api/subscriptions/')['ETag']
+        response = self.client.get('/api/subscriptions/', {'billing_cycle': 'yearly'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_rolled_back_write_keeps_etag(self):
+        etag = self.client.get('/api/subscriptions/')['ETag']
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            self.subscription.name = 'Renamed'
+            self.subscription.save()
+            raise RuntimeError
+        self.assertEqual(self.client.get('/api/subscriptions/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
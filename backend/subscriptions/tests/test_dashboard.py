@@ -0,0 +1,71 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from subscriptions.models import DailySnapshot
+
+from .utils import SubscriptionTestCase, make_subscription
+
+
+class DashboardTests(SubscriptionTestCase):
+
+    def setUp(self):
+        super().setUp()
+        today = date.today()
+        for i in range(25):
+            make_subscription(
+                f'Service {i}',
+                f'{3 + i}.50',
+                billing_cycle='monthly' if i % 2 else 'yearly',
+                start_date=today - timedelta(days=7 * i + 1),
+                category_id=['Music', 'Video', None][i % 3],
+            )
+        for offset in (400, 100, 10):
+            DailySnapshot.objects.create(
+                date=today - timedelta(days=offset),
+                active_subscriptions=offset,
+                total_monthly_cost=Decimal(offset),
+            )
+
+    def test_matches_the_separate_endpoints(self):
+        dashboard = self.client.get('/api/subscriptions/dashboard/').json()
+        self.assertEqual(dashboard['subscriptions'], self.client.get('/api/subscriptions/').json())
+        self.assertEqual(dashboard['stats'], self.client.get('/api/subscriptions/stats/').json())
+        self.assertEqual(dashboard['categories'], self.client.get('/api/subscriptions/categories/').json())
+
+        today = date.today()
+        trends = self.client.get('/api/subscriptions/trends/', {
+            'start': (today - timedelta(days=365)).isoformat(),
+            'end': today.isoformat(),
+            'granularity': 'month',
+        }).json()
+        self.assertEqual(dashboard['trend'], trends['points'])
+        self.assertEqual(len(dashboard['trend']), 2)
+
+    def test_events_url_only_under_asgi(self):
+        # The test client goes through WSGI, which has no event stream
+        self.assertIsNone(self.client.get('/api/subscriptions/dashboard/').json()['events_url'])
+
+    def test_warm_reads_skip_stats_queries(self):
+        self.assertEqual(self.client.get('/api/subscriptions/dashboard/')['X-Cache'], 'MISS')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/subscriptions/dashboard/')
+        self.assertEqual(response['X-Cache'], 'HIT')
+        # One page of rows and the trend's snapshots
+        self.assertEqual(len(queries), 2)
+
+    def test_not_modified_until_a_write(self):
+        etag = self.client.get('/api/subscriptions/dashboard/')['ETag']
+        self.assertEqual(self.client.get('/api/subscriptions/dashboard/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.write('post', '/api/subscriptions/', {
+            'name': 'Spotify', 'billing_cycle': 'monthly', 'monthly_price': '10.99', 'start_date': '2025-01-01',
+        })
+        response = self.client.get('/api/subscriptions/dashboard/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['subscriptions']['count'], 26)
+
+    def test_sparse_fieldset(self):
+        results = self.client.get('/api/subscriptions/dashboard/', {'fields': 'id,name'}).json()
+        self.assertEqual(list(results['subscriptions']['results'][0]), ['id', 'name'])
@@ -0,0 +1,67 @@
+from datetime import date
+from decimal import Decimal
+
+from django.test import TestCase
+
+from subscriptions.models import Subscription
+
+
+class EquivalentCostColumnTests(TestCase):
+
+    CASES = [
+        # (billing cycle, cost, monthly price, yearly price)
+        ('monthly', '9.99', '9.99', None),
+        ('monthly', '10.00', '10.00', '100.00'),
+        ('monthly', '15', None, None),
+        ('monthly', '7.50', '0', '80.00'),
+        ('yearly', '100.00', None, '100.00'),
+        ('yearly', '99.99', '9.99', '99.99'),
+        ('yearly', '120.00', '10.00', '120.00'),
+        ('yearly', '50.00', None, None),
+        ('yearly', '61.00', '0', '0'),
+        ('yearly', '1.01', None, '1.01'),
+    ]
+
+    def setUp(self):
+        for i, (billing_cycle, cost, monthly_price, yearly_price) in enumerate(self.CASES):
+            Subscription.objects.create(
+                name=f'{billing_cycle} {i}',
+                billing_cycle=billing_cycle,
+                cost=Decimal(cost),
+                monthly_price=monthly_price and Decimal(monthly_price),
+                yearly_price=yearly_price and Decimal(yearly_price),
+                start_date=date(2024, 1, 31),
+            )
+
+    def assertColumnsMatchMethods(self):
+        subscriptions = Subscription.objects.order_by('id')
+        self.assertEqual(len(subscriptions), len(self.CASES))
+        for subscription in subscriptions:
+            with self.subTest(subscription=subscription.name):
+                self.assertEqual(
+                    subscription.monthly_equivalent_cost,
+                    subscription.get_monthly_equivalent_cost().quantize(Decimal('0.000001')),
+                )
+                self.assertEqual(
+                    subscription.yearly_equivalent_cost,
+                    subscription.get_yearly_equivalent_cost().quantize(Decimal('0.000001')),
+                )
+
+    def test_columns_match_methods(self):
+        self.assertColumnsMatchMethods()
+
+    def test_columns_follow_queryset_updates(self):
+        Subscription.objects.filter(billing_cycle='monthly').update(yearly_price=Decimal('90.00'))
+        Subscription.objects.filter(billing_cycle='yearly').update(cost=Decimal('240.00'), yearly_price=None)
+        self.assertColumnsMatchMethods()
+
+    def test_filter_and_order_in_the_database(self):
+        expected = sorted(
+            (subscription for subscription in Subscription.objects.all()
+             if subscription.get_monthly_equivalent_cost() >= 8),
+            key=lambda subscription: (subscription.get_monthly_equivalent_cost(), subscription.id),
+        )
+        self.assertEqual(
+            list(Subscription.objects.filter(monthly_equivalent_cost__gte=8).order_by('monthly_equivalent_cost', 'id')),
+            expected,
+        )
@@ -0,0 +1,143 @@
+import json
+from datetime import timedelta
+
+from django.db import transaction
+from django.test import TestCase, override_settings
+
+from subscriptions.events import REFRESH_EVENT, EventBroker, broker
+from subscriptions.models import Subscription
+
+from .utils import TEST_CACHES, make_subscription
+
+
+class FakeSubscriber:
+    """
+    Stands in for a connected event stream client.
+    """
+
+    def __init__(self):
+        self.messages = []
+
+    def deliver(self, message):
+        self.messages.append(message)
+
+    def events(self):
+        return [message.decode().split('\n')[1].removeprefix('event: ') for message in self.messages]
+
+
+class EventBrokerTests(TestCase):
+
+    def setUp(self):
+        self.broker = EventBroker(history_size=3)
+        self.subscriber = FakeSubscriber()
+
+    def test_new_client_gets_current_id(self):
+        self.broker.publish('updated', {})
+        [message] = self.broker.subscribe(self.subscriber)
+        self.assertEqual(message, f'id: {self.broker.epoch}-1\n\n'.encode())
+
+    def test_fan_out_and_resume(self):
+        self.broker.subscribe(self.subscriber)
+        for n in range(3):
+            self.broker.publish('updated', {'n': n})
+        self.assertEqual(self.subscriber.events(), ['updated'] * 3)
+        self.assertEqual(
+            self.subscriber.messages[0],
+            f'id: {self.broker.epoch}-1\nevent: updated\ndata: {{"n":0}}\n\n'.encode(),
+        )
+
+        resumed = self.broker.subscribe(FakeSubscriber(), f'{self.broker.epoch}-1')
+        self.assertEqual(resumed, self.subscriber.messages[1:])
+        self.assertEqual(self.broker.subscribe(FakeSubscriber(), f'{self.broker.epoch}-3'), [])
+
+    def test_lost_events_mean_refresh(self):
+        self.broker.subscribe(self.subscriber)
+        for n in range(5):
+            self.broker.publish('updated', {'n': n})
+        for last_event_id in (f'{self.broker.epoch}-1', f'{self.broker.epoch}-9', '1-1', 'garbage'):
+            with self.subTest(last_event_id=last_event_id):
+                [message] = self.broker.subscribe(FakeSubscriber(), last_event_id)
+                self.assertIn(f'event: {REFRESH_EVENT}'.encode(), message)
+        # Replaying from the oldest kept event still works
+        self.assertEqual(len(self.broker.subscribe(FakeSubscriber(), f'{self.broker.epoch}-2')), 3)
+
+    def test_no_subscribers_no_work(self):
+        built = []
+        self.broker.publish('updated', lambda: built.append(1) or {})
+        self.assertEqual(built, [])
+        # A client that was connected before that event has missed it
+        [message] = self.broker.subscribe(self.subscriber, f'{self.broker.epoch}-0')
+        self.assertIn(f'event: {REFRESH_EVENT}'.encode(), message)
+
+        self.broker.publish('updated', lambda: built.append(1) or {})
+        self.assertEqual(built, [1])
+        self.broker.unsubscribe(self.subscriber)
+        self.broker.publish('updated', {})
+        self.assertEqual(len(self.subscriber.messages), 1)
+
+
+@override_settings(CACHES=TEST_CACHES)
+class ChangeEventTests(TestCase):
+    """
+    Model signals publish committed changes to the event stream.
+    """
+
+    def setUp(self):
+        self.subscriber = FakeSubscriber()
+        broker.subscribe(self.subscriber)
+        self.addCleanup(broker.unsubscribe, self.subscriber)
+
+    def data(self, message):
+        return json.loads(message.decode().split('\n')[2].removeprefix('data: '))
+
+    def test_events_follow_commits(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            subscription = make_subscription('Netflix', category_id='Entertainment')
+            self.assertEqual(self.subscriber.messages, [])
+        subscription = Subscription.objects.get(pk=subscription.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            subscription.name = 'Hulu'
+            subscription.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            subscription.update_renewal_date_manually(subscription.renewal_date + timedelta(days=1))
+        with self.captureOnCommitCallbacks(execute=True):
+            subscription.is_active = False
+            subscription.save(update_fields=['is_active', 'updated_at'])
+        self.assertEqual(self.subscriber.events(), ['created', 'updated', 'renewal_moved', 'deactivated'])
+
+        created, updated, _, deactivated = map(self.data, self.subscriber.messages)
+        self.assertEqual(created['subscription']['name'], 'Netflix')
+        self.assertEqual(created['stats_delta']['total_active_subscriptions'], 1)
+        self.assertEqual(updated['subscription']['name'], 'Hulu')
+        self.assertEqual(updated['stats_delta']['total_monthly_cost'], 0)
+        self.assertEqual(deactivated['stats_delta']['category_breakdown'], {'Entertainment': -9.99})
+
+    def test_save_reads_nothing_extra(self):
+        subscription = make_subscription('Netflix')
+        subscription = Subscription.objects.get(pk=subscription.pk)
+        subscription.name = 'Hulu'
+        # The UPDATE alone
+        with self.assertNumQueries(1), self.captureOnCommitCallbacks(execute=True):
+            subscription.save(update_fields=['name', 'updated_at'])
+        self.assertEqual(self.subscriber.events(), ['updated'])
+
+    def test_rolled_back_change_is_not_published(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                make_subscription('Netflix')
+                raise RuntimeError
+        self.assertEqual(self.subscriber.messages, [])
+
+    def test_prices_set_in_code(self):
+        subscription = make_subscription('Netflix')
+        with self.captureOnCommitCallbacks(execute=True):
+            subscription.monthly_price = subscription.cost = 4
+            subscription.save()
+        subscription_data = self.data(self.subscriber.messages[-1])['subscription']
+        self.assertEqual((subscription_data['monthly_price'], subscription_data['cost']), ('4.00', '4.00'))
+
+    def test_bulk_changes_ask_for_refresh(self):
+        make_subscription('Netflix')
+        with self.captureOnCommitCallbacks(execute=True):
+            Subscription.objects.all().deactivate()
+        self.assertEqual(self.subscriber.events(), [REFRESH_EVENT])
@@ -0,0 +1,70 @@
+import csv
+import io
+import json
+from datetime import date, timedelta
+from unittest import mock
+
+from subscriptions.exports import EXPORT_COLUMNS
+
+from .utils import SubscriptionTestCase, make_subscription
+
+
+class ExportTests(SubscriptionTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.netflix = make_subscription('Netflix', '15.49', category_id='Entertainment')
+        self.max = make_subscription('Max', '120.00', billing_cycle='yearly')
+        make_subscription('Old', is_active=False)
+
+    def export(self, **params):
+        response = self.client.get('/api/subscriptions/export/', params)
+        self.assertEqual(response.status_code, 200)
+        return response, b''.join(response.streaming_content).decode()
+
+    def test_csv(self):
+        response, content = self.export()
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="subscriptions.csv"')
+        rows = list(csv.DictReader(io.StringIO(content)))
+        self.assertEqual(list(rows[0]), EXPORT_COLUMNS)
+        self.assertEqual({row['name'] for row in rows}, {'Netflix', 'Max'})
+        netflix = next(row for row in rows if row['name'] == 'Netflix')
+        self.assertEqual(netflix['id'], str(self.netflix.pk))
+        self.assertEqual(netflix['yearly_price'], '')
+        self.assertEqual(netflix['category'], 'Entertainment')
+        self.assertEqual(netflix['yearly_equivalent_cost'], '185.88')
+        self.assertEqual(netflix['renewal_date'], self.netflix.renewal_date.isoformat())
+        self.assertEqual(
+            netflix['days_until_renewal'], str((self.netflix.renewal_date - date.today()).days)
+        )
+
+    def test_ndjson(self):
+        response, content = self.export(output='ndjson')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        rows = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual([list(row) for row in rows], [EXPORT_COLUMNS] * 2)
+        yearly = next(row for row in rows if row['name'] == 'Max')
+        self.assertEqual(yearly['cost'], '120.00')
+        self.assertIsNone(yearly['monthly_price'])
+        self.assertIsNone(yearly['category'])
+        self.assertEqual(yearly['monthly_equivalent_cost'], 10.0)
+        self.assertIs(yearly['is_active'], True)
+        self.assertEqual(yearly['start_date'], (date.today() - timedelta(days=10)).isoformat())
+
+    def test_filters_apply(self):
+        _, content = self.export(output='ndjson', billing_cycle='yearly')
+        self.assertEqual([json.loads(line)['name'] for line in content.splitlines()], ['Max'])
+
+    def test_rows_span_chunks(self):
+        for i in range(5):
+            make_subscription(f'Service {i}')
+        with mock.patch('subscriptions.exports.EXPORT_CHUNK_SIZE', 2):
+            _, content = self.export()
+        rows = list(csv.DictReader(io.StringIO(content)))
+        self.assertEqual(len(rows), 7)
+        self.assertEqual(len({row['id'] for row in rows}), 7)
+
+    def test_unknown_output(self):
+        response = self.client.get('/api/subscriptions/export/', {'output': 'xml'})
+        self.assertEqual(response.status_code, 400)
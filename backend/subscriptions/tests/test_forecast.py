@@ -0,0 +1,126 @@
+from collections import defaultdict
+from datetime import date, timedelta
+
+from django.test import TestCase
+
+from subscriptions.forecast import compute_forecast
+from subscriptions.models import Subscription
+from subscriptions.renewals import CYCLE_MONTHS, add_months, next_renewal_date
+
+from .utils import SubscriptionTestCase, make_subscription
+
+
+def loop_forecast(today, end, category=None):
+    """
+    Every charge before end, one subscription and one cycle at a time, as
+    ({charge date: {category: cents}}, number of charges).
+    """
+    charges = defaultdict(lambda: defaultdict(int))
+    count = 0
+    subscriptions = Subscription.objects.filter(is_active=True)
+    if category:
+        subscriptions = subscriptions.filter(category=category)
+    for subscription in subscriptions:
+        step = CYCLE_MONTHS[subscription.billing_cycle]
+        cycle = 1
+        while (charge := add_months(subscription.start_date, cycle * step)) < end:
+            if charge > today:
+                charges[charge][subscription.category_id or 'Uncategorized'] += int(subscription.cost * 100)
+                count += 1
+            cycle += 1
+    return charges, count
+
+
+class ForecastTests(TestCase):
+
+    today = date(2025, 6, 15)
+
+    def setUp(self):
+        starts = [date(2024, 1, 31), date(2023, 2, 28), date(2024, 2, 29), date(2025, 3, 15), date(2020, 12, 1)]
+        for i, start_date in enumerate(starts * 3):
+            subscription = make_subscription(
+                f'Service {i}',
+                f'{5 + i}.99',
+                billing_cycle='yearly' if i % 4 == 0 else 'monthly',
+                start_date=start_date,
+                category_id=['Music', 'Video', None][i % 3],
+            )
+            Subscription.objects.filter(pk=subscription.pk).update(
+                renewal_date=next_renewal_date(start_date, subscription.billing_cycle, self.today)
+            )
+        # Not rolled forward yet
+        stale = make_subscription('Stale', '3.00', start_date=date(2024, 10, 31), category_id='Music')
+        Subscription.objects.filter(pk=stale.pk).update(renewal_date=date(2025, 1, 31))
+        make_subscription('Cancelled', '100.00', start_date=date(2024, 1, 1), is_active=False)
+
+    def test_matches_per_subscription_loop(self):
+        for horizon in (1, 12, 25):
+            for granularity in ('day', 'week', 'month'):
+                with self.subTest(horizon=horizon, granularity=granularity):
+                    forecast = compute_forecast(horizon, granularity, today=self.today)
+                    end = add_months(self.today, horizon)
+                    self.assertEqual(forecast['end'], end)
+                    expected, count = loop_forecast(self.today, end)
+                    self.assertEqual(forecast['total_charges'], count)
+                    self.assertEqual(
+                        round(forecast['total'] * 100),
+                        sum(sum(cents.values()) for cents in expected.values()),
+                    )
+
+                    totals = defaultdict(int)
+                    for charge, cents in expected.items():
+                        for name, amount in cents.items():
+                            totals[name] += amount
+                    self.assertEqual(
+                        {name: round(total * 100) for name, total in forecast['category_totals'].items()},
+                        dict(totals),
+                    )
+
+    def test_periods(self):
+        forecast = compute_forecast(3, 'week', today=self.today)
+        starts = [period['start'] for period in forecast['periods']]
+        self.assertEqual(starts[0], date(2025, 6, 9))
+        self.assertTrue(all(start.weekday() == 0 for start in starts))
+        self.assertEqual(starts, [starts[0] + timedelta(weeks=i) for i in range(len(starts))])
+        self.assertEqual(sum(period['charges'] for period in forecast['periods']), forecast['total_charges'])
+
+        expected, _ = loop_forecast(self.today, forecast['end'])
+        monthly = compute_forecast(3, 'month', today=self.today)
+        for period in monthly['periods']:
+            cents = sum(
+                sum(amounts.values()) for charge, amounts in expected.items()
+                if (charge.year, charge.month) == (period['start'].year, period['start'].month)
+            )
+            self.assertEqual(round(period['total'] * 100), cents, period['start'])
+
+    def test_category(self):
+        forecast = compute_forecast(12, 'month', category='Music', today=self.today)
+        self.assertEqual(list(forecast['category_totals']), ['Music'])
+        expected, _ = loop_forecast(self.today, forecast['end'], category='Music')
+        self.assertEqual(round(forecast['total'] * 100), sum(cents['Music'] for cents in expected.values()))
+
+    def test_no_subscriptions(self):
+        Subscription.objects.all().delete()
+        forecast = compute_forecast(2, 'month', today=self.today)
+        self.assertEqual((forecast['total'], forecast['total_charges']), (0, 0))
+        self.assertEqual(len(forecast['periods']), 3)
+
+
+class ForecastEndpointTests(SubscriptionTestCase):
+
+    def test_response(self):
+        make_subscription('Netflix', '15.49', category_id='Entertainment')
+        response = self.client.get('/api/subscriptions/forecast/', {'horizon': 6})
+        self.assertEqual(response.status_code, 200)
+        forecast = response.json()
+        self.assertEqual((forecast['horizon'], forecast['granularity']), (6, 'month'))
+        self.assertEqual(forecast['total'], 92.94)
+        self.assertEqual(forecast['category_totals'], {'Entertainment': 92.94})
+        self.assertEqual(forecast['total_charges'], 6)
+
+    def test_invalid_parameters(self):
+        for params in ({'horizon': 0}, {'horizon': 61}, {'horizon': 'x'}, {'granularity': 'year'}):
+            with self.subTest(params=params):
+                response = self.client.get('/api/subscriptions/forecast/', params)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn(next(iter(params)), response.json())
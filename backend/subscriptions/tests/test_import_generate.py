@@ -0,0 +1,116 @@
+import json
+import os
+import tempfile
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+
+from subscriptions.models import Category, Subscription
+from subscriptions.renewals import next_renewal_date
+
+from .utils import SubscriptionTestCase, make_subscription
+
+
+class ImportSubscriptionsTests(SubscriptionTestCase):
+
+    def run_import(self, content, suffix, *args):
+        handle, path = tempfile.mkstemp(suffix=suffix)
+        self.addCleanup(os.remove, path)
+        with os.fdopen(handle, 'w', encoding='utf-8') as file:
+            file.write(content)
+        out, err = StringIO(), StringIO()
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('import_subscriptions', path, *args, stdout=out, stderr=err)
+        return out.getvalue(), err.getvalue()
+
+    def test_csv(self):
+        make_subscription('Netflix')
+        out, err = self.run_import(
+            'name,monthly_price,yearly_price,billing_cycle,start_date,category,is_active\n'
+            'Netflix,15.49,,monthly,2024-01-31,Entertainment,true\n'
+            'Spotify,10.99,,monthly,2024-01-31,Music,true\n'
+            'Max,,99.9,yearly,2024-02-29,,true\n'
+            'Spotify,11.99,,monthly,2024-03-01,Music,true\n'
+            'Broken,,,monthly,2024-01-01,,true\n',
+            '.csv',
+        )
+        self.assertIn('Imported 2 subscriptions', out)
+        self.assertIn('(2 duplicate names skipped, 1 invalid records)', out)
+        self.assertIn('Line 6: monthly price is required', err)
+
+        spotify = Subscription.objects.get(name='Spotify')
+        self.assertEqual((spotify.cost, spotify.category_id), (Decimal('10.99'), 'Music'))
+        self.assertEqual(spotify.renewal_date, next_renewal_date(date(2024, 1, 31), 'monthly'))
+        max_ = Subscription.objects.get(name='Max')
+        self.assertEqual((max_.cost, max_.category_id), (Decimal('99.90'), None))
+        self.assertEqual(max_.renewal_date, next_renewal_date(date(2024, 2, 29), 'yearly'))
+        self.assertEqual(Category.objects.get(name='Music').active_count, 1)
+
+    def test_inactive_rows_are_deactivated(self):
+        self.run_import(
+            'name,monthly_price,billing_cycle,start_date,is_active\n'
+            'Active,5,monthly,2024-01-01,yes\n'
+            'Cancelled,5,monthly,2024-01-01,false\n',
+            '.csv',
+        )
+        self.assertIsNone(Subscription.objects.get(name='Active').deactivated_at)
+        self.assertIsNotNone(Subscription.objects.get(name='Cancelled').deactivated_at)
+
+    def test_ndjson_in_chunks(self):
+        records = [
+            {'name': f'Service {i}', 'monthly_price': '5', 'billing_cycle': 'monthly', 'start_date': '2024-05-01'}
+            for i in range(5)
+        ]
+        lines = [json.dumps(record) for record in records] + ['', '[1, 2]', '{"name": ']
+        out, err = self.run_import('\n'.join(lines) + '\n', '.ndjson', '--chunk-size', '2')
+        self.assertIn('Imported 5 subscriptions', out)
+        self.assertIn('2 invalid records', out)
+        self.assertIn('Line 7: not a JSON object', err)
+        self.assertIn('Line 8: not a JSON object', err)
+        self.assertEqual(Subscription.objects.count(), 5)
+
+    def test_rejects_unknown_format(self):
+        with self.assertRaises(CommandError):
+            self.run_import('', '.txt')
+
+
+class GenerateSubscriptionsTests(SubscriptionTestCase):
+
+    def generate(self, *args):
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('generate_subscriptions', *args, stdout=StringIO())
+        return list(
+            Subscription.objects.order_by('id').values_list(
+                'name', 'monthly_price', 'yearly_price', 'billing_cycle', 'start_date', 'is_active', 'category',
+            )
+        )
+
+    def test_generates_valid_rows(self):
+        self.generate('--count', '250', '--chunk-size', '100')
+        self.assertEqual(Subscription.objects.count(), 250)
+        today = date.today()
+        for subscription in Subscription.objects.all():
+            price = subscription.monthly_price if subscription.billing_cycle == 'monthly' else subscription.yearly_price
+            self.assertEqual(subscription.cost, price)
+            self.assertLessEqual(subscription.start_date, today)
+            self.assertEqual(
+                subscription.renewal_date,
+                next_renewal_date(subscription.start_date, subscription.billing_cycle, today),
+            )
+            self.assertEqual(subscription.deactivated_at is None, subscription.is_active)
+
+        counted = sum(category.active_count for category in Category.objects.all())
+        self.assertEqual(counted, Subscription.objects.filter(is_active=True, category__isnull=False).count())
+
+    def test_same_seed_same_data(self):
+        first = self.generate('--count', '50', '--seed', '7')
+        Subscription.objects.all().delete()
+        self.assertEqual(self.generate('--count', '50', '--seed', '7'), first)
+        Subscription.objects.all().delete()
+        self.assertNotEqual(self.generate('--count', '50', '--seed', '8'), first)
+
+    def test_rejects_bad_count(self):
+        with self.assertRaises(CommandError):
+            self.generate('--count', '0')
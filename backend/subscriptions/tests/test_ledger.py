@@ -0,0 +1,124 @@
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+
+from subscriptions.models import BillingEvent, Subscription
+from subscriptions.renewals import CYCLE_MONTHS, add_months
+
+from .utils import SubscriptionTestCase, make_subscription
+
+
+def loop_ledger(today):
+    """
+    Every charge up to today, one subscription and one cycle at a time, as a
+    set of (subscription id, date, amount).
+    """
+    charges = set()
+    for subscription in Subscription.objects.all():
+        last = today
+        if subscription.deactivated_at is not None:
+            last = min(today, subscription.deactivated_at.date() - timedelta(days=1))
+        cycle = 0
+        while (charge := add_months(subscription.start_date, cycle * CYCLE_MONTHS[subscription.billing_cycle])) <= last:
+            charges.add((subscription.id, charge, subscription.cost))
+            cycle += 1
+    return charges
+
+
+class BuildLedgerTests(SubscriptionTestCase):
+
+    def setUp(self):
+        super().setUp()
+        for i, start_date in enumerate([date(2023, 1, 31), date(2024, 2, 29), date(2024, 11, 30), date(2025, 5, 1)]):
+            make_subscription(f'Monthly {i}', f'{10 + i}.00', start_date=start_date)
+            make_subscription(f'Yearly {i}', f'{100 + i}.00', billing_cycle='yearly', start_date=start_date)
+        self.cancelled = make_subscription('Cancelled', '7.00', start_date=date(2024, 1, 15), is_active=False)
+        self.cancel(self.cancelled, date(2024, 6, 15))
+
+    def cancel(self, subscription, day):
+        Subscription.objects.filter(pk=subscription.pk).update(
+            is_active=False, deactivated_at=datetime.combine(day, datetime.min.time(), tzinfo=timezone.utc)
+        )
+
+    def build(self, *args):
+        out = StringIO()
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('build_ledger', *args, stdout=out)
+        return out.getvalue()
+
+    def ledger(self):
+        return set(BillingEvent.objects.values_list('subscription_id', 'date', 'amount'))
+
+    def test_matches_per_subscription_loop(self):
+        today = date(2025, 6, 15)
+        output = self.build('--date', today.isoformat(), '--chunk-size', '3')
+        self.assertIn('Chunk 3: 3 subscriptions', output)
+        self.assertEqual(self.ledger(), loop_ledger(today))
+        cancelled = {day for pk, day, _ in self.ledger() if pk == self.cancelled.pk}
+        self.assertEqual(max(cancelled), date(2024, 5, 15))
+        self.assertEqual(
+            set(Subscription.objects.values_list('billed_through', flat=True)), {today}
+        )
+
+    def test_runs_extend_the_ledger(self):
+        self.build('--date', '2024-03-31')
+        self.build('--date', '2024-12-31')
+        self.assertIn(': 0 new events', self.build('--date', '2024-12-31'))
+        self.build('--date', '2025-06-15')
+        self.assertEqual(self.ledger(), loop_ledger(date(2025, 6, 15)))
+
+    def test_deactivation_after_billing(self):
+        self.build('--date', '2025-01-10')
+        subscription = Subscription.objects.get(name='Monthly 0')
+        self.cancel(subscription, date(2025, 4, 1))
+        self.build('--date', '2025-06-15')
+        days = sorted(day for pk, day, _ in self.ledger() if pk == subscription.pk)
+        self.assertEqual(days[-2:], [date(2025, 2, 28), date(2025, 3, 31)])
+        self.assertEqual(self.ledger(), loop_ledger(date(2025, 6, 15)))
+
+    def test_rebuild(self):
+        self.build('--date', '2025-06-15')
+        Subscription.objects.filter(name='Monthly 0').update(cost=Decimal('99.00'))
+        self.build('--rebuild', '--date', '2025-06-15')
+        self.assertEqual(self.ledger(), loop_ledger(date(2025, 6, 15)))
+
+    def test_feeds_spend_and_stats(self):
+        self.build('--date', '2024-12-31')
+        events = BillingEvent.objects.filter(date__year=2024)
+        spent_2024 = sum(event.amount for event in events)
+        spend = self.client.get('/api/subscriptions/spend/', {'start': '2024-01-01', 'end': '2024-12-31'}).json()
+        self.assertEqual(Decimal(str(spend['total_spent'])), spent_2024)
+        self.assertEqual(spend['total_charges'], events.count())
+        self.assertEqual(spend['category_breakdown'], {'Uncategorized': spend['total_spent']})
+
+        stats = self.client.get('/api/subscriptions/stats/').json()
+        self.assertEqual(Decimal(stats['total_spent']), sum(event.amount for event in BillingEvent.objects.all()))
+
+    def test_rejects_bad_arguments(self):
+        with self.assertRaises(CommandError):
+            self.build('--chunk-size', '0')
+        with self.assertRaises(CommandError):
+            self.build('--date', 'yesterday')
+
+    def test_inactive_rows_from_bulk_inserts(self):
+        item = {'name': 'Batch', 'monthly_price': '5.00', 'billing_cycle': 'monthly',
+                'start_date': '2020-01-01', 'is_active': False}
+        self.write('post', '/api/subscriptions/batch_create/', [item])
+        self.write('post', '/api/subscriptions/', {**item, 'name': 'Single'})
+        batch = Subscription.objects.get(name='Batch')
+        single = Subscription.objects.get(name='Single')
+        self.assertIsNotNone(batch.deactivated_at)
+
+        # Written before bulk inserts set a deactivation time
+        legacy = make_subscription('Legacy', start_date=date(2020, 1, 1), is_active=False)
+        Subscription.objects.filter(pk=legacy.pk).update(deactivated_at=None)
+
+        self.build()
+        events = BillingEvent.objects.filter(subscription__in=[batch, single, legacy])
+        self.assertEqual(
+            events.filter(subscription=batch).count(), events.filter(subscription=single).count()
+        )
+        self.assertFalse(events.filter(subscription=legacy).exists())
+        self.assertFalse(events.filter(date__gte=date.today()).exists())
@@ -0,0 +1,88 @@
+import re
+
+from subscriptions.metrics import registry
+
+from .utils import SubscriptionTestCase, make_subscription
+
+
+class MetricsTests(SubscriptionTestCase):
+
+    def setUp(self):
+        super().setUp()
+        # The registry lives as long as the process; start each test empty
+        with registry.lock:
+            registry.routes.clear()
+
+    def scrape(self):
+        response = self.client.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        return response.content.decode()
+
+    def sample(self, metrics, name, **labels):
+        """
+        Get the value of the sample with exactly these labels.
+        """
+        label_text = ','.join(f'{key}="{value}"' for key, value in labels.items())
+        match = re.search(rf'^{re.escape(name)}\{{{re.escape(label_text)}\}} (\S+)$', metrics, re.MULTILINE)
+        self.assertIsNotNone(match, f'{name}{{{label_text}}} not in output')
+        return float(match.group(1))
+
+    def test_requests_are_recorded_by_view_and_method(self):
+        subscription = make_subscription()
+        self.client.get('/api/subscriptions/')
+        self.client.get('/api/subscriptions/')
+        self.client.get(f'/api/subscriptions/{subscription.pk}/')
+        self.client.get('/api/subscriptions/0/')
+        metrics = self.scrape()
+
+        route = {'view': 'subscription-list', 'method': 'GET'}
+        self.assertEqual(self.sample(metrics, 'subscriptions_http_request_duration_seconds_count', **route), 2)
+        self.assertEqual(
+            self.sample(metrics, 'subscriptions_http_request_duration_seconds_bucket', **route, le='+Inf'), 2
+        )
+        self.assertEqual(self.sample(metrics, 'subscriptions_http_responses_total', **route, status=200), 2)
+        self.assertGreaterEqual(self.sample(metrics, 'subscriptions_http_request_sql_queries_sum', **route), 2)
+        self.assertGreater(self.sample(metrics, 'subscriptions_http_response_size_bytes_sum', **route), 0)
+
+        detail = {'view': 'subscription-detail', 'method': 'GET'}
+        self.assertEqual(self.sample(metrics, 'subscriptions_http_responses_total', **detail, status=200), 1)
+        self.assertEqual(self.sample(metrics, 'subscriptions_http_responses_total', **detail, status=404), 1)
+
+    def test_buckets_are_cumulative(self):
+        for _ in range(3):
+            self.client.get('/api/subscriptions/stats/')
+        metrics = self.scrape()
+        counts = [
+            float(value) for value in re.findall(
+                r'^subscriptions_http_request_sql_queries_bucket\{view="subscription-stats",method="GET",'
+                r'le="[^"]+"\} (\S+)$',
+                metrics, re.MULTILINE,
+            )
+        ]
+        self.assertEqual(counts, sorted(counts))
+        self.assertEqual(counts[-1], 3)
+
+    def test_labels_are_bounded(self):
+        self.client.get('/no/such/page/1')
+        self.client.get('/no/such/page/2')
+        self.client.generic('BREW', '/api/subscriptions/')
+        self.client.generic('PROPFIND', '/api/subscriptions/')
+        self.client.options('/api/subscriptions/')
+        metrics = self.scrape()
+
+        self.assertEqual(
+            self.sample(metrics, 'subscriptions_http_responses_total', view='unmatched', method='GET', status=404), 2
+        )
+        self.assertEqual(
+            self.sample(metrics, 'subscriptions_http_responses_total', view='subscription-list', method='OTHER',
+                        status=405),
+            2,
+        )
+        self.assertEqual(
+            self.sample(metrics, 'subscriptions_http_responses_total', view='subscription-list', method='OPTIONS',
+                        status=200),
+            1,
+        )
+        self.assertNotIn('BREW', metrics)
+        self.assertNotIn('/no/such/page', metrics)
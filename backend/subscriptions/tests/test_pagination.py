@@ -0,0 +1,49 @@
+from base64 import b64encode
+from datetime import date, timedelta
+
+from subscriptions.models import Subscription
+
+from .utils import SubscriptionTestCase, make_subscription
+
+
+class CursorPaginationTests(SubscriptionTestCase):
+
+    def setUp(self):
+        super().setUp()
+        today = date.today()
+        # Many rows share a renewal date, so pages have to break ties by id
+        for i in range(45):
+            make_subscription(f'Service {i}', start_date=today - timedelta(days=20 + i % 4))
+        self.expected = list(
+            Subscription.objects.filter(is_active=True).order_by('renewal_date', 'id').values_list('id', flat=True)
+        )
+
+    def test_walk_forward_and_back(self):
+        response = self.client.get('/api/subscriptions/', {'pagination': 'cursor'}).json()
+        self.assertIsNone(response['previous'])
+        pages = [response]
+        while response['next']:
+            response = self.client.get(response['next']).json()
+            pages.append(response)
+        self.assertEqual([len(page['results']) for page in pages], [20, 20, 5])
+        self.assertEqual([row['id'] for page in pages for row in page['results']], self.expected)
+
+        backwards = []
+        while response['previous']:
+            response = self.client.get(response['previous']).json()
+            backwards.append([row['id'] for row in response['results']])
+        self.assertEqual(backwards, [self.expected[20:40], self.expected[:20]])
+        self.assertIsNotNone(response['next'])
+
+    def test_rows_added_between_pages_are_not_repeated(self):
+        first = self.client.get('/api/subscriptions/', {'pagination': 'cursor'}).json()
+        make_subscription('Newcomer', start_date=date.today() - timedelta(days=29))
+        second = self.client.get(first['next']).json()
+        seen = [row['id'] for row in first['results']]
+        self.assertFalse(set(seen) & {row['id'] for row in second['results']})
+
+    def test_invalid_cursor(self):
+        for cursor in ('not base64!', b64encode(b'd=2024-01-01').decode(), b64encode(b'd=x&i=1').decode()):
+            with self.subTest(cursor=cursor):
+                self.assertEqual(self.client.get('/api/subscriptions/', {'cursor': cursor}).status_code, 404)
+
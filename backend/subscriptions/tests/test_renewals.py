@@ -0,0 +1,125 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.db import models
+from django.db.models.expressions import RawSQL
+from django.test import SimpleTestCase, TestCase
+
+from subscriptions.models import Subscription
+from subscriptions.renewals import (
+    add_months, apply_renewal_dates, next_renewal_date, next_renewal_date_sql, next_renewal_dates,
+)
+
+from .utils import make_subscription
+
+
+class RenewalDateTests(SimpleTestCase):
+    """
+    next_renewal_date and next_renewal_dates are two versions of one
+    calculation.
+    """
+
+    def test_add_months_clamps_to_month_end(self):
+        self.assertEqual(add_months(date(2024, 1, 31), 1), date(2024, 2, 29))
+        self.assertEqual(add_months(date(2023, 1, 31), 1), date(2023, 2, 28))
+        self.assertEqual(add_months(date(2024, 1, 31), 3), date(2024, 4, 30))
+        self.assertEqual(add_months(date(2024, 2, 29), 12), date(2025, 2, 28))
+        self.assertEqual(add_months(date(2024, 11, 30), 3), date(2025, 2, 28))
+
+    def test_month_end_start_is_clamped(self):
+        self.assertEqual(next_renewal_date(date(2024, 1, 31), 'monthly', date(2024, 2, 10)), date(2024, 2, 29))
+        self.assertEqual(next_renewal_date(date(2023, 1, 31), 'monthly', date(2023, 2, 10)), date(2023, 2, 28))
+        # Later renewals go back to the start day
+        self.assertEqual(next_renewal_date(date(2024, 1, 31), 'monthly', date(2024, 3, 1)), date(2024, 3, 31))
+        self.assertEqual(next_renewal_date(date(2024, 1, 31), 'monthly', date(2024, 4, 30)), date(2024, 5, 31))
+
+    def test_leap_day_start(self):
+        self.assertEqual(next_renewal_date(date(2024, 2, 29), 'yearly', date(2024, 6, 1)), date(2025, 2, 28))
+        self.assertEqual(next_renewal_date(date(2024, 2, 29), 'yearly', date(2025, 3, 1)), date(2026, 2, 28))
+        self.assertEqual(next_renewal_date(date(2024, 2, 29), 'yearly', date(2027, 6, 1)), date(2028, 2, 29))
+
+    def test_renewal_is_after_today(self):
+        self.assertEqual(next_renewal_date(date(2024, 1, 15), 'monthly', date(2024, 3, 15)), date(2024, 4, 15))
+        self.assertEqual(next_renewal_date(date(2024, 1, 15), 'monthly', date(2024, 3, 14)), date(2024, 3, 15))
+
+    def test_future_start_renews_one_cycle_after_it(self):
+        self.assertEqual(next_renewal_date(date(2026, 12, 15), 'monthly', date(2026, 10, 17)), date(2027, 1, 15))
+        self.assertEqual(next_renewal_date(date(2027, 1, 31), 'monthly', date(2026, 10, 17)), date(2027, 2, 28))
+        self.assertEqual(next_renewal_date(date(2028, 2, 29), 'yearly', date(2026, 10, 17)), date(2029, 2, 28))
+
+    def test_versions_agree(self):
+        start_dates = [date(2023, 11, 1) + timedelta(days=offset) for offset in range(520)] * 2
+        billing_cycles = ['monthly'] * 520 + ['yearly'] * 520
+
+        for today in (date(2024, 2, 28), date(2024, 2, 29), date(2024, 3, 31), date(2025, 1, 31), date(2024, 6, 15)):
+            with self.subTest(today=today):
+                self.assertEqual(
+                    next_renewal_dates(start_dates, billing_cycles, today).tolist(),
+                    [
+                        next_renewal_date(start_date, billing_cycle, today)
+                        for start_date, billing_cycle in zip(start_dates, billing_cycles)
+                    ],
+                )
+
+    def test_empty_batch(self):
+        self.assertEqual(next_renewal_dates([], [], date(2024, 1, 1)).tolist(), [])
+        self.assertEqual(apply_renewal_dates([]), [])
+
+
+class SubscriptionRenewalTests(TestCase):
+
+    def test_month_end_starts_save(self):
+        for start_date, billing_cycle in ((date(2024, 1, 31), 'monthly'), (date(2024, 2, 29), 'yearly')):
+            with self.subTest(start_date=start_date):
+                subscription = make_subscription(start_date=start_date, billing_cycle=billing_cycle)
+                self.assertEqual(subscription.renewal_date, next_renewal_date(start_date, billing_cycle))
+
+    def test_api_accepts_month_end_starts(self):
+        response = self.client.post('/api/subscriptions/', {
+            'name': 'Leap', 'yearly_price': '99.00', 'billing_cycle': 'yearly', 'start_date': '2024-02-29',
+        }, content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['renewal_date'], next_renewal_date(date(2024, 2, 29), 'yearly').isoformat())
+
+
+class RenewalDateSQLTests(TestCase):
+    """
+    next_renewal_date_sql computes the same dates in the database.
+    """
+
+    def test_versions_agree(self):
+        start_dates = [date(2023, 11, 1) + timedelta(days=offset) for offset in range(520)]
+        Subscription.objects.bulk_create([
+            Subscription(
+                name=f'{start_date} {billing_cycle}',
+                cost=Decimal('1.00'),
+                billing_cycle=billing_cycle,
+                start_date=start_date,
+                renewal_date=start_date,
+            )
+            for start_date in start_dates
+            for billing_cycle in ('monthly', 'yearly')
+        ])
+        rows = list(Subscription.objects.order_by('id').values_list('id', 'start_date', 'billing_cycle'))
+
+        for today in (date(2024, 2, 28), date(2024, 2, 29), date(2024, 3, 31), date(2025, 1, 31), date(2024, 6, 15)):
+            with self.subTest(today=today):
+                sql, params = next_renewal_date_sql(today)
+                renewals = dict(
+                    Subscription.objects
+                    .annotate(next_renewal=RawSQL(sql, params, output_field=models.DateField()))
+                    .values_list('id', 'next_renewal')
+                )
+                self.assertEqual(
+                    [renewals[pk] for pk, _, _ in rows],
+                    [next_renewal_date(start_date, billing_cycle, today) for _, start_date, billing_cycle in rows],
+                )
+
+    def test_recompute_renewal_dates(self):
+        subscription = make_subscription(start_date=date(2024, 1, 31))
+        Subscription.objects.filter(pk=subscription.pk).update(renewal_date=date(2024, 1, 31))
+        self.assertEqual(Subscription.objects.recompute_renewal_dates(date(2024, 2, 10)), 1)
+        subscription.refresh_from_db()
+        self.assertEqual(subscription.renewal_date, date(2024, 2, 29))
+        # Rows already on their date are not rewritten
+        self.assertEqual(Subscription.objects.recompute_renewal_dates(date(2024, 2, 10)), 0)
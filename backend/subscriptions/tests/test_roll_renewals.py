@@ -0,0 +1,66 @@
+from datetime import date
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+
+from subscriptions.cache import get_stats_version
+from subscriptions.models import Subscription
+from subscriptions.renewals import next_renewal_date
+
+from .utils import SubscriptionTestCase, make_subscription
+
+
+class RollRenewalsTests(SubscriptionTestCase):
+
+    def roll(self, *args):
+        out = StringIO()
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('roll_renewals', *args, stdout=out)
+        return out.getvalue()
+
+    def make_stale(self, name, start_date, billing_cycle='monthly', **fields):
+        subscription = make_subscription(name, billing_cycle=billing_cycle, start_date=start_date, **fields)
+        Subscription.objects.filter(pk=subscription.pk).update(renewal_date=start_date)
+        return subscription
+
+    def test_rolls_stale_dates_forward(self):
+        today = date(2025, 6, 15)
+        subscriptions = [
+            self.make_stale(f'Monthly {day}', date(2024, 1, day)) for day in (1, 15, 31)
+        ] + [
+            self.make_stale('Yearly', date(2024, 2, 29), 'yearly'),
+        ]
+        output = self.roll('--date', today.isoformat(), '--chunk-size', '2')
+        self.assertIn('Rolled 4 renewal dates forward', output)
+        self.assertIn('Chunk 2: 2 rows', output)
+        for subscription in subscriptions:
+            subscription.refresh_from_db()
+            self.assertEqual(
+                subscription.renewal_date,
+                next_renewal_date(subscription.start_date, subscription.billing_cycle, today),
+                subscription.name,
+            )
+
+    def test_leaves_current_and_inactive_rows(self):
+        today = date(2025, 6, 15)
+        current = make_subscription('Current', start_date=date(2025, 6, 1))
+        Subscription.objects.filter(pk=current.pk).update(renewal_date=date(2025, 7, 1))
+        inactive = self.make_stale('Inactive', date(2024, 1, 1), is_active=False)
+        version = get_stats_version()
+        output = self.roll('--date', today.isoformat())
+        self.assertIn('Rolled 0 renewal dates forward', output)
+        self.assertEqual(Subscription.objects.get(pk=current.pk).renewal_date, date(2025, 7, 1))
+        self.assertEqual(Subscription.objects.get(pk=inactive.pk).renewal_date, date(2024, 1, 1))
+        self.assertEqual(get_stats_version(), version)
+
+    def test_bumps_stats_version(self):
+        self.make_stale('Stale', date(2024, 1, 1))
+        version = get_stats_version()
+        self.roll('--date', '2025-06-15')
+        self.assertNotEqual(get_stats_version(), version)
+
+    def test_rejects_bad_arguments(self):
+        with self.assertRaises(CommandError):
+            self.roll('--chunk-size', '0')
+        with self.assertRaises(CommandError):
+            self.roll('--date', '15/06/2025')
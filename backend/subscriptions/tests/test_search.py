@@ -0,0 +1,75 @@
+from datetime import date
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase
+
+from subscriptions.checks import check_database_objects
+from subscriptions.models import Subscription
+from subscriptions.search import SEARCH_TRIGGERS
+
+from .utils import SubscriptionTestCase, make_subscription
+
+
+class DatabaseObjectCheckTests(TestCase):
+
+    def test_missing_triggers_are_reported(self):
+        self.assertEqual(check_database_objects(None, databases=['default']), [])
+        # Rolled back with the test
+        with connection.cursor() as cursor:
+            cursor.execute(f'DROP TRIGGER {SEARCH_TRIGGERS[2]}')
+        errors = check_database_objects(None, databases=['default'])
+        self.assertEqual([error.id for error in errors], ['subscriptions.W001'])
+        self.assertIn(SEARCH_TRIGGERS[2], errors[0].msg)
+
+    def test_only_database_checks_look(self):
+        self.assertEqual(check_database_objects(None), [])
+
+
+class SearchTests(SubscriptionTestCase):
+    """
+    The full-text index follows the subscriptions table.
+    """
+
+    def search(self, query):
+        return [row['name'] for row in self.client.get('/api/subscriptions/search/', {'q': query}).json()]
+
+    def test_prefix_search(self):
+        make_subscription('Netflix Premium', category_id='Entertainment')
+        make_subscription('Spotify', category_id='Music')
+        self.assertEqual(self.search('net'), ['Netflix Premium'])
+        self.assertEqual(self.search('netflix prem'), ['Netflix Premium'])
+        self.assertEqual(self.search('music'), ['Spotify'])
+        self.assertEqual(self.search('netflix spotify'), [])
+
+    def test_name_match_ranks_first(self):
+        make_subscription('Tidal', category_id='Music')
+        make_subscription('Music Unlimited')
+        self.assertEqual(self.search('music'), ['Music Unlimited', 'Tidal'])
+
+    def test_index_follows_writes(self):
+        subscription = make_subscription('Netflix')
+        subscription.name = 'Hulu'
+        subscription.save()
+        self.assertEqual(self.search('netflix'), [])
+        self.assertEqual(self.search('hulu'), ['Hulu'])
+
+        Subscription.objects.bulk_create([
+            Subscription(
+                name='Dropbox', cost=Decimal('11.99'), billing_cycle='monthly',
+                start_date=date(2024, 1, 1), renewal_date=date(2024, 2, 1),
+            )
+        ])
+        self.assertEqual(self.search('drop'), ['Dropbox'])
+
+        Subscription.objects.filter(name='Hulu').delete()
+        self.assertEqual(self.search('hulu'), [])
+
+    def test_inactive_subscriptions_are_not_suggested(self):
+        make_subscription('Netflix', is_active=False)
+        self.assertEqual(self.search('netflix'), [])
+
+    def test_search_words_are_not_operators(self):
+        make_subscription('Netflix')
+        self.assertEqual(self.search('netflix OR'), [])
+        self.assertEqual(self.search('"net*'), ['Netflix'])
@@ -0,0 +1,26 @@
+import json
+from decimal import Decimal
+
+from django.test import TestCase
+from rest_framework.renderers import JSONRenderer
+
+from subscriptions.models import Subscription
+from subscriptions.serializers import SubscriptionReadSerializer, SubscriptionSerializer
+
+from .utils import make_subscription
+
+
+class ReadSerializerTests(TestCase):
+
+    def test_same_output_as_full_serializer(self):
+        make_subscription('Monthly only')
+        make_subscription('Yearly only', '99.00', billing_cycle='yearly', category_id='Software')
+        make_subscription('Both', '10.00', yearly_price=Decimal('100.00'))
+        make_subscription('Yearly costs more', '130.00', billing_cycle='yearly', monthly_price=Decimal('10.00'))
+        subscriptions = Subscription.objects.order_by('id')
+        renderer = JSONRenderer()
+        self.assertEqual(
+            json.loads(renderer.render(SubscriptionReadSerializer(subscriptions, many=True).data)),
+            json.loads(renderer.render(SubscriptionSerializer(subscriptions, many=True).data)),
+        )
+
@@ -0,0 +1,120 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from subscriptions.models import Subscription
+from subscriptions.stats import UPCOMING_RENEWAL_DAYS, compute_stats
+
+from .utils import SubscriptionTestCase, make_subscription
+
+
+def loop_stats(today):
+    """
+    The stats as the endpoint computed them before the aggregates, one
+    subscription at a time (less total_spent, which now comes from the
+    ledger).
+    """
+    active_subscriptions = list(Subscription.objects.filter(is_active=True))
+    category_breakdown = {}
+    for subscription in active_subscriptions:
+        category = subscription.category_id or 'Uncategorized'
+        category_breakdown[category] = (
+            category_breakdown.get(category, 0.0) + float(subscription.get_monthly_equivalent_cost())
+        )
+    first = Subscription.objects.order_by('start_date').first()
+    return {
+        'total_monthly_cost': float(sum(sub.get_monthly_equivalent_cost() for sub in active_subscriptions)),
+        'total_yearly_cost': float(sum(sub.get_yearly_equivalent_cost() for sub in active_subscriptions)),
+        'total_active_subscriptions': len(active_subscriptions),
+        'upcoming_renewals': [
+            {
+                'id': sub.id,
+                'name': sub.name,
+                'renewal_date': sub.renewal_date,
+                'cost': float(sub.cost),
+                'billing_cycle': sub.billing_cycle,
+                'days_until_renewal': (sub.renewal_date - today).days,
+            }
+            for sub in sorted(active_subscriptions, key=lambda sub: (sub.renewal_date, sub.id))
+            if today <= sub.renewal_date <= today + timedelta(days=UPCOMING_RENEWAL_DAYS)
+        ],
+        'category_breakdown': category_breakdown,
+        'time_since_first_subscription': (today - first.start_date).days if first else None,
+    }
+
+
+class StatsTests(TestCase):
+
+    def create_subscriptions(self, count):
+        today = date.today()
+        categories = ['Music', 'Video', None]
+        for i in range(count):
+            yearly = i % 3 == 0
+            make_subscription(
+                f'Service {i}',
+                f'{7 + i}.{i % 100:02d}',
+                billing_cycle='yearly' if yearly else 'monthly',
+                # Some yearly subscriptions know their monthly price too
+                monthly_price=Decimal('9.99') if yearly and i % 2 else None,
+                yearly_price=Decimal(f'{100 + i}.00') if yearly or i % 4 == 1 else None,
+                start_date=today - timedelta(days=3 + 5 * i),
+                category_id=categories[i % 3],
+                is_active=i % 5 != 4,
+            )
+
+    def assertMatchesLoop(self, today):
+        stats = compute_stats(today)
+        expected = loop_stats(today)
+        for key in ('total_monthly_cost', 'total_yearly_cost'):
+            self.assertAlmostEqual(stats[key], expected[key], places=4, msg=key)
+        self.assertEqual(stats['category_breakdown'].keys(), expected['category_breakdown'].keys())
+        for category, cost in expected['category_breakdown'].items():
+            self.assertAlmostEqual(stats['category_breakdown'][category], cost, places=4, msg=category)
+        for key in ('total_active_subscriptions', 'time_since_first_subscription'):
+            self.assertEqual(stats[key], expected[key], key)
+        self.assertEqual(
+            sorted(stats['upcoming_renewals'], key=lambda row: (row['renewal_date'], row['id'])),
+            expected['upcoming_renewals'],
+        )
+
+    def test_matches_per_row_computation(self):
+        self.create_subscriptions(30)
+        today = date.today()
+        for offset in (0, 10, 40):
+            with self.subTest(today=today + timedelta(days=offset)):
+                self.assertMatchesLoop(today + timedelta(days=offset))
+
+    def test_no_subscriptions(self):
+        stats = compute_stats()
+        self.assertEqual(stats['total_monthly_cost'], 0)
+        self.assertEqual(stats['total_active_subscriptions'], 0)
+        self.assertEqual(stats['category_breakdown'], {})
+        self.assertEqual(stats['upcoming_renewals'], [])
+        self.assertIsNone(stats['time_since_first_subscription'])
+
+    def test_query_count_does_not_grow_with_rows(self):
+        self.create_subscriptions(3)
+        with CaptureQueriesContext(connection) as few:
+            compute_stats()
+        self.create_subscriptions(40)
+        with CaptureQueriesContext(connection) as many:
+            compute_stats()
+        self.assertEqual(len(few), len(many))
+
+
+class StatsEndpointTests(SubscriptionTestCase):
+
+    def test_response(self):
+        make_subscription('Netflix', '15.49', category_id='Entertainment')
+        make_subscription('Max', '120.00', billing_cycle='yearly')
+        response = self.client.get('/api/subscriptions/stats/')
+        self.assertEqual(response.status_code, 200)
+        stats = response.json()
+        self.assertEqual(stats['total_monthly_cost'], '25.49')
+        self.assertEqual(stats['total_yearly_cost'], '305.88')
+        self.assertEqual(stats['total_active_subscriptions'], 2)
+        self.assertEqual(stats['category_breakdown'], {'Entertainment': 15.49, 'Uncategorized': 10.0})
+        self.assertEqual(stats['time_since_first_subscription'], 10)
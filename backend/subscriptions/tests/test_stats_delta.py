@@ -0,0 +1,77 @@
+from datetime import date, timedelta
+
+from .utils import SubscriptionTestCase, make_subscription
+
+
+class StatsDeltaTests(SubscriptionTestCase):
+    """
+    Applying a write's stats_delta to the stats before it gives the stats
+    after it.
+    """
+
+    def stats(self):
+        stats = self.client.get('/api/subscriptions/stats/').json()
+        return {
+            'total_monthly_cost': round(float(stats['total_monthly_cost']), 2),
+            'total_yearly_cost': round(float(stats['total_yearly_cost']), 2),
+            'total_active_subscriptions': stats['total_active_subscriptions'],
+            'category_breakdown': {
+                name: round(cost, 4) for name, cost in stats['category_breakdown'].items()
+            },
+            'upcoming_renewals': sorted(stats['upcoming_renewals'], key=lambda row: row['id']),
+        }
+
+    def apply(self, stats, delta):
+        breakdown = dict(stats['category_breakdown'])
+        for name, change in delta['category_breakdown'].items():
+            breakdown[name] = round(breakdown.get(name, 0) + change, 4)
+            if not breakdown[name]:
+                del breakdown[name]
+        renewals = [
+            row for row in stats['upcoming_renewals'] if row['id'] not in delta['upcoming_renewals']['removed']
+        ]
+        return {
+            'total_monthly_cost': round(stats['total_monthly_cost'] + delta['total_monthly_cost'], 2),
+            'total_yearly_cost': round(stats['total_yearly_cost'] + delta['total_yearly_cost'], 2),
+            'total_active_subscriptions': stats['total_active_subscriptions'] + delta['total_active_subscriptions'],
+            'category_breakdown': breakdown,
+            'upcoming_renewals': sorted(renewals + delta['upcoming_renewals']['added'], key=lambda row: row['id']),
+        }
+
+    def test_deltas_match_recomputed_stats(self):
+        today = date.today()
+        make_subscription('Existing', '20.00', category_id='Music')
+        stats = self.stats()
+
+        response = self.write('post', '/api/subscriptions/?stats_delta=1', {
+            'name': 'Netflix', 'monthly_price': '15.49', 'yearly_price': '150.00', 'billing_cycle': 'monthly',
+            'category': 'Entertainment', 'start_date': (today - timedelta(days=27)).isoformat(),
+        })
+        pk = response.json()['id']
+        stats = self.apply(stats, response.json()['stats_delta'])
+        self.assertEqual(stats, self.stats())
+
+        writes = [
+            ('patch', f'/api/subscriptions/{pk}/?stats_delta=true', {'category': 'Music'}),
+            ('patch', f'/api/subscriptions/{pk}/?stats_delta=1', {'billing_cycle': 'yearly'}),
+            ('patch', f'/api/subscriptions/{pk}/update_renewal_date/?stats_delta=1', {
+                'renewal_date': (today + timedelta(days=3)).isoformat(),
+            }),
+            ('put', f'/api/subscriptions/{pk}/?stats_delta=1', {
+                'name': 'Netflix', 'monthly_price': '7.77', 'billing_cycle': 'monthly',
+                'start_date': (today - timedelta(days=40)).isoformat(),
+            }),
+            ('delete', f'/api/subscriptions/{pk}/?stats_delta=1', None),
+        ]
+        for method, url, data in writes:
+            with self.subTest(method=method, url=url):
+                response = self.write(method, url, data)
+                self.assertLess(response.status_code, 300)
+                stats = self.apply(stats, response.json()['stats_delta'])
+                self.assertEqual(stats, self.stats())
+
+    def test_only_on_request(self):
+        subscription = make_subscription()
+        response = self.write('patch', f'/api/subscriptions/{subscription.pk}/', {'name': 'Renamed'})
+        self.assertNotIn('stats_delta', response.json())
+        self.assertEqual(self.write('delete', f'/api/subscriptions/{subscription.pk}/').status_code, 204)
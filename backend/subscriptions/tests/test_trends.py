@@ -0,0 +1,123 @@
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+
+from subscriptions.models import DailySnapshot, Subscription
+from subscriptions.trends import build_snapshots
+
+from .utils import SubscriptionTestCase, make_subscription
+
+
+def loop_snapshot(day):
+    """
+    The totals of one day, one subscription at a time.
+    """
+    active = 0
+    total = Decimal(0)
+    categories = {}
+    for subscription in Subscription.objects.filter(start_date__lte=day):
+        if not subscription.is_active and subscription.deactivated_at.date() <= day:
+            continue
+        cost = subscription.monthly_equivalent_cost
+        active += 1
+        total += cost
+        category = subscription.category_id or 'Uncategorized'
+        categories[category] = categories.get(category, Decimal(0)) + cost
+    return active, total.quantize(Decimal('0.01')), {name: round(float(cost), 2) for name, cost in categories.items()}
+
+
+class SnapshotTests(SubscriptionTestCase):
+
+    def setUp(self):
+        super().setUp()
+        make_subscription('Netflix', '15.49', start_date=date(2025, 1, 31), category_id='Video')
+        make_subscription('Max', '100.00', billing_cycle='yearly', start_date=date(2025, 2, 10), category_id='Video')
+        make_subscription('Spotify', '10.99', start_date=date(2025, 3, 1), category_id='Music')
+        make_subscription('VPN', '4.00', start_date=date(2025, 1, 1))
+        cancelled = make_subscription('Cancelled', '7.00', start_date=date(2025, 1, 15), is_active=False)
+        Subscription.objects.filter(pk=cancelled.pk).update(
+            deactivated_at=datetime(2025, 2, 20, 15, 30, tzinfo=timezone.utc)
+        )
+
+    def snapshot(self, *args):
+        out = StringIO()
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('snapshot_stats', *args, stdout=out)
+        return out.getvalue()
+
+    def test_match_per_subscription_loop(self):
+        days = [date(2024, 12, 31) + timedelta(days=offset) for offset in range(0, 120, 3)]
+        for snapshot in build_snapshots(days, today=date(2025, 6, 1)):
+            with self.subTest(day=snapshot.date):
+                self.assertEqual(
+                    (snapshot.active_subscriptions, snapshot.total_monthly_cost, snapshot.category_breakdown),
+                    loop_snapshot(snapshot.date),
+                )
+
+    def test_backfilled_days_are_approximate(self):
+        today = date(2025, 4, 10)
+        snapshots = build_snapshots([date(2025, 4, 8), date(2025, 4, 9), date(2025, 4, 10)], today=today)
+        self.assertEqual([snapshot.approximate for snapshot in snapshots], [True, False, False])
+
+    def test_command_writes_missing_days(self):
+        yesterday = date.today() - timedelta(days=1)
+        output = self.snapshot('--since', '2025-01-01', '--until', '2025-01-31')
+        self.assertIn('Wrote 31 snapshots', output)
+        self.assertIn('Wrote 0 snapshots', self.snapshot('--since', '2025-01-01', '--until', '2025-01-31'))
+
+        self.snapshot()
+        self.assertEqual(DailySnapshot.objects.count(), (yesterday - date(2025, 1, 1)).days + 1)
+        self.assertEqual(
+            list(DailySnapshot.objects.filter(approximate=False).values_list('date', flat=True)), [yesterday]
+        )
+        with self.assertRaises(CommandError):
+            self.snapshot('--since', '2025-02-01', '--until', '2025-01-31')
+
+
+class TrendsEndpointTests(SubscriptionTestCase):
+
+    def setUp(self):
+        super().setUp()
+        for offset in range(90):
+            day = date(2025, 1, 1) + timedelta(days=offset)
+            DailySnapshot.objects.create(
+                date=day,
+                active_subscriptions=offset,
+                total_monthly_cost=Decimal(offset),
+                category_breakdown={'Video': float(offset)},
+                approximate=offset < 80,
+            )
+
+    def trends(self, **params):
+        return self.client.get('/api/subscriptions/trends/', params)
+
+    def test_daily(self):
+        points = self.trends(start='2025-01-10', end='2025-01-12').json()['points']
+        self.assertEqual([point['date'] for point in points], ['2025-01-10', '2025-01-11', '2025-01-12'])
+        self.assertEqual(points[0]['total_monthly_cost'], 9.0)
+        self.assertEqual(points[0]['category_breakdown'], {'Video': 9.0})
+
+    def test_periods_keep_their_last_snapshot(self):
+        response = self.trends(start='2025-01-01', end='2025-03-31', granularity='month').json()
+        self.assertEqual(response['granularity'], 'month')
+        self.assertEqual(
+            [(point['period'], point['date'], point['approximate']) for point in response['points']],
+            [('2025-01-01', '2025-01-31', True), ('2025-02-01', '2025-02-28', True),
+             ('2025-03-01', '2025-03-31', False)],
+        )
+        weeks = self.trends(start='2025-01-01', end='2025-01-31', granularity='week').json()['points']
+        self.assertEqual(weeks[0], {
+            'period': '2024-12-30', 'date': '2025-01-05', 'active_subscriptions': 4,
+            'total_monthly_cost': 4.0, 'category_breakdown': {'Video': 4.0}, 'approximate': True,
+        })
+
+    def test_invalid_parameters(self):
+        for params in ({'start': '2025-02-01', 'end': '2025-01-31'}, {'start': '2999-01-01'},
+                       {'start': '01/02/2025'}, {'granularity': 'year'}):
+            with self.subTest(params=params):
+                self.assertEqual(self.trends(**params).status_code, 400)
+        response = self.client.get('/api/subscriptions/spend/', {'start': '2025-02-01', 'end': '2025-01-31'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('end', response.json())
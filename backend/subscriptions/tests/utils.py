@@ -0,0 +1,53 @@
+import json
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.test import TestCase, override_settings
+
+from subscriptions.cache import get_stats_cache
+from subscriptions.models import Subscription
+
+
+# The stats cache is shared between processes on disk; tests get their own
+TEST_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'stats': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'stats-tests',
+    },
+}
+
+
+def make_subscription(name='Netflix', price='9.99', billing_cycle='monthly', start_date=None, **fields):
+    """
+    Save a subscription priced for its billing cycle.
+    """
+    prices = {'monthly_price': Decimal(price)} if billing_cycle == 'monthly' else {'yearly_price': Decimal(price)}
+    return Subscription.objects.create(
+        name=name,
+        billing_cycle=billing_cycle,
+        cost=Decimal(price),
+        start_date=start_date or date.today() - timedelta(days=10),
+        **{**prices, **fields},
+    )
+
+
+@override_settings(CACHES=TEST_CACHES)
+class SubscriptionTestCase(TestCase):
+    """
+    Base for tests of the API, with a stats cache of their own.
+    """
+
+    def setUp(self):
+        # Rolled back rows leave their stats behind
+        get_stats_cache().clear()
+
+    def write(self, method, url, data=None):
+        """
+        Make a write request and run what it left for after the commit, as
+        a real request would.
+        """
+        with self.captureOnCommitCallbacks(execute=True):
+            return getattr(self.client, method)(url, json.dumps(data), content_type='application/json')
@@ -0,0 +1,143 @@
+"""
+Daily stats snapshots and the spending trends charted from them.
+
+Snapshots are reconstructed from each subscription's start date and
+deactivation date: a subscription counts towards every day from its start
+until the day before it was deactivated. All requested days are built in one
+pass: each subscription adds its cost on the day it starts counting and
+takes it away on the day it stops, and a cumulative sum over the days gives
+the totals.
+
+Only the start and deactivation dates of the past are known, not the cost or
+category a subscription had then, so every day is built from the current
+ones. A snapshot written the day after its date (as the daily run does) is
+exact; older days filled in later are marked approximate.
+"""
+from datetime import date, timedelta
+from decimal import Decimal
+
+import numpy as np
+from django.utils import timezone
+
+from .forecast import UNCATEGORIZED, period_starts
+from .models import DailySnapshot, Subscription
+
+
+# Monthly costs are summed as whole millionths, the precision they are stored with
+COST_UNITS = 10 ** 6
+
+
+def build_snapshots(days, today=None):
+    """
+    Get unsaved DailySnapshot instances for the given days. Days before
+    yesterday are marked approximate.
+    """
+    if not days:
+        return []
+    if today is None:
+        today = date.today()
+    # Snapshots of yesterday and later only miss today's changes
+    first_exact_day = today - timedelta(days=1)
+    first_day = min(days)
+    last_day = max(days)
+    day_count = (last_day - first_day).days + 1
+
+    rows = list(
+        Subscription.objects
+        .filter(start_date__lte=last_day)
+        .order_by()
+        .values_list('start_date', 'is_active', 'deactivated_at', 'updated_at', 'monthly_equivalent_cost', 'category')
+    )
+
+    categories = sorted({category or UNCATEGORIZED for *_, category in rows})
+    category_index = {category: index for index, category in enumerate(categories)}
+
+    starts = []
+    stops = []
+    for start_date, is_active, deactivated_at, updated_at, _, _ in rows:
+        starts.append(max((start_date - first_day).days, 0))
+        if is_active:
+            stops.append(day_count)
+        else:
+            # Deactivated before deactivated_at was recorded: last change
+            deactivated = timezone.localdate(deactivated_at or updated_at)
+            stops.append(min(max((deactivated - first_day).days, 0), day_count))
+    starts = np.array(starts, dtype=np.int64)
+    stops = np.array(stops, dtype=np.int64)
+    costs = np.array([round(cost * COST_UNITS) for *_, cost, _ in rows], dtype=np.int64)
+    category_ids = np.array([category_index[category or UNCATEGORIZED] for *_, category in rows], dtype=np.int64)
+
+    # Changes per (day, category); one extra day for subscriptions still active
+    counted = starts < stops
+    cost_changes = np.zeros((day_count + 1, len(categories)), dtype=np.int64)
+    count_changes = np.zeros((day_count + 1, len(categories)), dtype=np.int64)
+    np.add.at(cost_changes, (starts[counted], category_ids[counted]), costs[counted])
+    np.add.at(cost_changes, (stops[counted], category_ids[counted]), -costs[counted])
+    np.add.at(count_changes, (starts[counted], category_ids[counted]), 1)
+    np.add.at(count_changes, (stops[counted], category_ids[counted]), -1)
+    cost_totals = np.cumsum(cost_changes[:-1], axis=0)
+    count_totals = np.cumsum(count_changes[:-1], axis=0)
+
+    snapshots = []
+    for day in days:
+        index = (day - first_day).days
+        snapshots.append(DailySnapshot(
+            date=day,
+            active_subscriptions=int(count_totals[index].sum()),
+            total_monthly_cost=(Decimal(int(cost_totals[index].sum())) / COST_UNITS).quantize(Decimal('0.01')),
+            category_breakdown={
+                category: round(int(cost) / COST_UNITS, 2)
+                for category, cost, count in zip(categories, cost_totals[index].tolist(), count_totals[index].tolist())
+                if count
+            },
+            approximate=day < first_exact_day,
+        ))
+    return snapshots
+
+
+def missing_days(first_day, last_day):
+    """
+    Get the days from first_day to last_day (both included) without a snapshot.
+    """
+    existing = set(
+        DailySnapshot.objects.filter(date__range=[first_day, last_day]).values_list('date', flat=True)
+    )
+    return [
+        first_day + timedelta(days=offset)
+        for offset in range((last_day - first_day).days + 1)
+        if first_day + timedelta(days=offset) not in existing
+    ]
+
+
+def compute_trends(start, end, granularity):
+    """
+    Get the snapshots from start to end (both included), keeping the last
+    snapshot of each day/week/month period.
+    """
+    snapshots = list(
+        DailySnapshot.objects
+        .filter(date__range=[start, end])
+        .values_list('date', 'active_subscriptions', 'total_monthly_cost', 'category_breakdown', 'approximate')
+    )
+    periods = period_starts(np.array([row[0] for row in snapshots], dtype='datetime64[D]'), granularity).tolist()
+
+    # Snapshots come in date order, so later days of a period replace earlier ones
+    latest = {}
+    for period, (day, active_subscriptions, total_monthly_cost, category_breakdown, approximate) in zip(
+        periods, snapshots
+    ):
+        latest[period] = {
+            'period': period,
+            'date': day,
+            'active_subscriptions': active_subscriptions,
+            'total_monthly_cost': float(total_monthly_cost),
+            'category_breakdown': category_breakdown,
+            'approximate': approximate,
+        }
+
+    return {
+        'start': start,
+        'end': end,
+        'granularity': granularity,
+        'points': list(latest.values()),
+    }
@@ -1,6 +1,6 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import SubscriptionViewSet
+from .views import SubscriptionViewSet, metrics
 
 # Create a router and register our viewsets
 router = DefaultRouter()
@@ -9,4 +9,5 @@ router.register(r'subscriptions', SubscriptionViewSet)
 # The API URLs are now determined automatically by the router
 urlpatterns = [
     path('api/', include(router.urls)),
+    path('metrics', metrics, name='metrics'),
 ]
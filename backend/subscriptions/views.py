@@ -1,11 +1,163 @@
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
-from django.db.models import Sum, Count, Q
-from datetime import datetime, timedelta
-from decimal import Decimal
-from .models import Subscription
-from .serializers import SubscriptionSerializer, SubscriptionStatsSerializer
+from rest_framework.utils.urls import replace_query_param
+from django.db import transaction
+from django.http import HttpResponse, StreamingHttpResponse
+from django.urls import NoReverseMatch, reverse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+from datetime import datetime, time, timedelta
+from decimal import Decimal, InvalidOperation
+import hashlib
+from .models import Subscription, IN_CLAUSE_SIZE
+from .serializers import SubscriptionSerializer, SubscriptionStatsSerializer, SubscriptionReadSerializer
+from .pagination import SubscriptionCursorPagination
+from .cache import get_cache_counters, get_cached_stats, get_stats_version
+from .exports import export_rows, stream_csv, stream_ndjson
+from .search import TYPEAHEAD_MAX_RESULTS, search_subscriptions, search_terms
+from .forecast import GRANULARITIES, FORECAST_MAX_HORIZON, compute_forecast
+from .stats import category_rows, compute_spend, stats_contribution, stats_delta
+from .trends import compute_trends
+from .metrics import registry
+
+
+# ?output= value -> (stream function, content type, file extension)
+EXPORT_FORMATS = {
+    'csv': (stream_csv, 'text/csv', 'csv'),
+    'ndjson': (stream_ndjson, 'application/x-ndjson', 'ndjson'),
+}
+
+# Largest list accepted by the batch endpoints
+BATCH_MAX_SIZE = 10000
+
+# ?stats_delta= values asking writes to return their change to the stats
+STATS_DELTA_VALUES = ('1', 'true')
+
+# Range of the trends endpoint when no ?start= is given
+TRENDS_DEFAULT_DAYS = 365
+
+# Fields the list can be sorted by with ?ordering=
+ORDERING_FIELDS = ['renewal_date', 'name', 'cost', 'monthly_equivalent_cost', 'yearly_equivalent_cost']
+
+# Range filter query parameter -> lookup
+COST_RANGE_FILTERS = {
+    'min_monthly_cost': 'monthly_equivalent_cost__gte',
+    'max_monthly_cost': 'monthly_equivalent_cost__lte',
+    'min_yearly_cost': 'yearly_equivalent_cost__gte',
+    'max_yearly_cost': 'yearly_equivalent_cost__lte',
+}
+
+
+def filter_subscriptions(params):
+    """
+    Active subscriptions, optionally filtered by category, billing cycle, a
+    range of monthly/yearly equivalent cost or a ?search= of names and
+    categories, in ?ordering= order. Searches without an ?ordering= come
+    best match first.
+    """
+    queryset = Subscription.objects.filter(is_active=True)
+    category = params.get('category', None)
+    billing_cycle = params.get('billing_cycle', None)
+    
+    if category:
+        queryset = queryset.filter(category=category)
+    if billing_cycle:
+        queryset = queryset.filter(billing_cycle=billing_cycle)
+    
+    for param, lookup in COST_RANGE_FILTERS.items():
+        value = params.get(param)
+        if value:
+            try:
+                bound = Decimal(value)
+            except InvalidOperation:
+                bound = None
+            if bound is None or not bound.is_finite():
+                raise ValidationError({param: ['A valid number is required.']})
+            queryset = queryset.filter(**{lookup: bound})
+    
+    ranked = False
+    search = params.get('search')
+    if search:
+        queryset, ranked = search_subscriptions(queryset, search)
+    
+    ordering = params.get('ordering')
+    if not ordering:
+        if ranked:
+            return queryset.order_by('search_document__rank', 'id')
+        return queryset.order_by('renewal_date')
+    if ordering.lstrip('-') not in ORDERING_FIELDS:
+        raise ValidationError({'ordering': [f'Order by one of: {", ".join(ORDERING_FIELDS)} (prefix - for descending)']})
+    if params.get('pagination') == 'cursor' or 'cursor' in params:
+        raise ValidationError({'ordering': ['Cursor pagination is always by renewal date.']})
+    # id breaks ties, so pages do not overlap
+    return queryset.order_by(ordering, '-id' if ordering.startswith('-') else 'id')
+
+
+def parse_fields(params):
+    """
+    Get the ?fields= sparse fieldset as a set of names, or None for all fields.
+    """
+    fields = params.get('fields')
+    if not fields:
+        return None
+    requested = {name.strip() for name in fields.split(',') if name.strip()}
+    unknown = requested - set(SubscriptionReadSerializer.FIELDS)
+    if unknown:
+        raise ValidationError({'fields': [f'Unknown fields: {", ".join(sorted(unknown))}']})
+    return requested
+
+
+def parse_dates(params, *names):
+    """
+    Get the YYYY-MM-DD date query parameters with these names, None for
+    those not given.
+    """
+    dates = []
+    for name in names:
+        value = params.get(name)
+        try:
+            dates.append(datetime.strptime(value, '%Y-%m-%d').date() if value else None)
+        except ValueError:
+            raise ValidationError({name: ['Invalid date format. Use YYYY-MM-DD']})
+    return dates
+
+
+def check_date_range(start, end):
+    """
+    Reject a date range that ends before it starts.
+    """
+    if start and end and start > end:
+        raise ValidationError({'end': ['The end date cannot be before the start date.']})
+
+
+def get_validators(version, request, media_type):
+    """
+    Get (etag, last_modified) for a conditional read endpoint.
+    
+    Both come from the data write version, so they cost one cache read.
+    Responses also depend on the date (days until renewal, upcoming
+    renewals), the query string and the response format.
+    """
+    today = datetime.now().date()
+    tag = f'{version}:{today.isoformat()}:{request.get_full_path()}:{media_type}'
+    etag = quote_etag(hashlib.md5(tag.encode(), usedforsecurity=False).hexdigest())
+    last_modified = int(max(version / 1e9, datetime.combine(today, time.min).timestamp()))
+    return etag, last_modified
+
+
+def add_validators(response, validators):
+    """
+    Add validators to a conditional read response, and make browsers
+    revalidate it instead of guessing a freshness lifetime.
+    """
+    if response.status_code in (status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+        etag, last_modified = validators
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        patch_cache_control(response, private=True, no_cache=True)
 
 
 class SubscriptionViewSet(viewsets.ModelViewSet):
@@ -15,135 +167,394 @@ class SubscriptionViewSet(viewsets.ModelViewSet):
     queryset = Subscription.objects.filter(is_active=True)
     serializer_class = SubscriptionSerializer
     
+    @property
+    def paginator(self):
+        """
+        Page-number pagination by default; keyset pagination when the client
+        asks for it with ?pagination=cursor or follows a cursor link.
+        """
+        if not hasattr(self, '_paginator'):
+            params = self.request.query_params
+            if params.get('pagination') == 'cursor' or 'cursor' in params:
+                self._paginator = SubscriptionCursorPagination()
+            else:
+                return super().paginator
+        return self._paginator
+    
     def get_queryset(self):
         """
         Optionally filter by category or billing cycle.
         """
-        queryset = Subscription.objects.filter(is_active=True)
-        category = self.request.query_params.get('category', None)
-        billing_cycle = self.request.query_params.get('billing_cycle', None)
-        
-        if category:
-            queryset = queryset.filter(category=category)
-        if billing_cycle:
-            queryset = queryset.filter(billing_cycle=billing_cycle)
-            
-        return queryset.order_by('renewal_date')
+        return filter_subscriptions(self.request.query_params)
+    
+    def get_serializer_class(self):
+        """
+        Lists use the read-optimized serializer; everything else the full one.
+        """
+        if self.action == 'list':
+            return SubscriptionReadSerializer
+        return super().get_serializer_class()
+    
+    def get_serializer_context(self):
+        """
+        Share one "today" across the request and pass through a ?fields=
+        sparse fieldset for list responses.
+        """
+        context = super().get_serializer_context()
+        context['today'] = datetime.now().date()
+        if self.request:
+            context['fields'] = parse_fields(self.request.query_params)
+        return context
+    
+    def not_modified(self, request):
+        """
+        Get a 304 response if the client's copy is still current, else None.
+        """
+        self.conditional_validators = get_validators(
+            get_stats_version(), request, request.accepted_media_type
+        )
+        etag, last_modified = self.conditional_validators
+        return get_conditional_response(request, etag=etag, last_modified=last_modified)
+    
+    def finalize_response(self, request, response, *args, **kwargs):
+        """
+        Add validators to conditional read responses.
+        """
+        response = super().finalize_response(request, response, *args, **kwargs)
+        validators = getattr(self, 'conditional_validators', None)
+        if validators:
+            add_validators(response, validators)
+        return response
+    
+    def list(self, request, *args, **kwargs):
+        not_modified = self.not_modified(request)
+        if not_modified is not None:
+            return not_modified
+        return super().list(request, *args, **kwargs)
+    
+    def wants_stats_delta(self):
+        """Whether the client asked for the stats change of a write."""
+        return self.request.query_params.get('stats_delta') in STATS_DELTA_VALUES
+    
+    def with_stats_delta(self, response):
+        """
+        Add the stats change recorded by a write to its response.
+        """
+        delta = getattr(self, 'stats_delta', None)
+        if delta is None:
+            return response
+        if response.data is None:
+            # A delete has no body of its own
+            return Response({'stats_delta': delta})
+        response.data['stats_delta'] = delta
+        return response
+    
+    def create(self, request, *args, **kwargs):
+        return self.with_stats_delta(super().create(request, *args, **kwargs))
+    
+    def update(self, request, *args, **kwargs):
+        return self.with_stats_delta(super().update(request, *args, **kwargs))
+    
+    def destroy(self, request, *args, **kwargs):
+        return self.with_stats_delta(super().destroy(request, *args, **kwargs))
+    
+    def perform_create(self, serializer):
+        """
+        With ?stats_delta=true, record the change to the stats from the new
+        row alone, so the client can update its stats without a re-fetch.
+        """
+        serializer.save()
+        if self.wants_stats_delta():
+            self.stats_delta = stats_delta(None, stats_contribution(serializer.instance))
+    
+    def perform_update(self, serializer):
+        """
+        With ?stats_delta=true, record the change to the stats from the old
+        and the new row.
+        """
+        today = datetime.now().date()
+        old = stats_contribution(serializer.instance, today)
+        serializer.save()
+        if self.wants_stats_delta():
+            self.stats_delta = stats_delta(old, stats_contribution(serializer.instance, today))
     
     def perform_destroy(self, instance):
         """
         Soft delete by setting is_active=False instead of hard delete.
+        With ?stats_delta=true the response has the change to the stats.
         """
+        old = stats_contribution(instance)
+        # Saved rather than updated through a queryset, so the model signals
+        # publish the deactivation to the event stream
         instance.is_active = False
-        instance.save()
+        instance.save(update_fields=['is_active', 'updated_at'])
+        if self.wants_stats_delta():
+            self.stats_delta = stats_delta(old, None)
+    
+    @action(detail=False, methods=['post'])
+    def batch_create(self, request):
+        """
+        Create many subscriptions from a list in one transaction.
+        """
+        serializer = self.get_serializer(data=request.data, many=True, max_length=BATCH_MAX_SIZE)
+        if not serializer.is_valid():
+            return Response({'errors': serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
+        serializer.save()
+        return Response({'results': serializer.data}, status=status.HTTP_201_CREATED)
+    
+    @action(detail=False, methods=['patch'])
+    def batch_update(self, request):
+        """
+        Partially update many subscriptions; every item needs its "id".
+        
+        The targets are read, validated and written in one transaction, with
+        their rows locked where the database supports it, so a concurrent
+        write cannot land between the read and the UPDATEs.
+        """
+        ids = []
+        if isinstance(request.data, list):
+            for item in request.data[:BATCH_MAX_SIZE]:
+                try:
+                    ids.append(int(item['id']))
+                except (TypeError, ValueError, KeyError):
+                    continue
+        
+        with transaction.atomic():
+            instances = Subscription.objects.select_for_update().filter(is_active=True).in_bulk(ids)
+            serializer = self.get_serializer(
+                instances, data=request.data, many=True, partial=True, max_length=BATCH_MAX_SIZE
+            )
+            if not serializer.is_valid():
+                return Response({'errors': serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
+            serializer.save()
+        return Response({'results': serializer.data})
+    
+    @action(detail=False, methods=['post'])
+    def batch_deactivate(self, request):
+        """
+        Soft delete many subscriptions given a list of ids.
+        """
+        ids = request.data.get('ids') if isinstance(request.data, dict) else request.data
+        if not isinstance(ids, list) or len(ids) > BATCH_MAX_SIZE:
+            return Response(
+                {'error': f'Provide a list of at most {BATCH_MAX_SIZE} subscription ids'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            ids = [int(pk) for pk in ids]
+        except (TypeError, ValueError):
+            return Response(
+                {'error': 'Subscription ids must be integers'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        with transaction.atomic():
+            active = Subscription.objects.filter(is_active=True).only('id').in_bulk(ids)
+            for offset in range(0, len(ids), IN_CLAUSE_SIZE):
+                Subscription.objects.filter(
+                    id__in=ids[offset:offset + IN_CLAUSE_SIZE]
+                ).deactivate()
+        
+        results = [
+            {'id': pk, 'status': 'deactivated' if pk in active else 'not_found'}
+            for pk in ids
+        ]
+        return Response({'results': results})
+    
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """
+        Stream every matching subscription as CSV (?output=csv, the default)
+        or newline-delimited JSON (?output=ndjson).
+        """
+        output = request.query_params.get('output', 'csv')
+        if output not in EXPORT_FORMATS:
+            return Response(
+                {'error': f'output must be one of: {", ".join(EXPORT_FORMATS)}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        stream, content_type, extension = EXPORT_FORMATS[output]
+        response = StreamingHttpResponse(
+            stream(export_rows(self.get_queryset())), content_type=content_type
+        )
+        response['Content-Disposition'] = f'attachment; filename="subscriptions.{extension}"'
+        return response
     
     @action(detail=False, methods=['get'])
     def stats(self, request):
         """
         Get subscription statistics and analytics.
         """
-        active_subscriptions = Subscription.objects.filter(is_active=True)
-        all_subscriptions = Subscription.objects.all()  # Include inactive for total spent calculation
+        not_modified = self.not_modified(request)
+        if not_modified is not None:
+            return not_modified
         
-        # Calculate total costs
-        total_monthly_cost = sum(
-            sub.get_monthly_equivalent_cost() for sub in active_subscriptions
-        )
-        total_yearly_cost = sum(
-            sub.get_yearly_equivalent_cost() for sub in active_subscriptions
-        )
+        stats_data, hit = get_cached_stats()
+        serializer = SubscriptionStatsSerializer(stats_data)
+        return Response(serializer.data, headers={'X-Cache': 'HIT' if hit else 'MISS'})
+    
+    @action(detail=False, methods=['get'])
+    def dashboard(self, request):
+        """
+        Get everything the dashboard shows first in one response: the first
+        page of subscriptions (as the list returns it), the stats, the
+        categories, the monthly trend of the last year (as the trends
+        endpoint returns its points) and the URL of the live event stream,
+        which is null unless this process serves it (under ASGI).
         
-        # Count active subscriptions
-        total_active_subscriptions = active_subscriptions.count()
+        All of them share one "today". The categories come from the stats'
+        category query and the page count from the stats' active count, so
+        beyond the (usually cached) stats this reads a single page of rows
+        and a year of daily snapshots.
+        """
+        not_modified = self.not_modified(request)
+        if not_modified is not None:
+            return not_modified
         
-        # Calculate total spent since first subscription
-        total_spent = Decimal('0.00')
-        time_since_first_subscription = None
+        context = self.get_serializer_context()
+        stats_data, hit = get_cached_stats(context['today'])
         
-        if all_subscriptions.exists():
-            # Get the earliest start date
-            first_subscription = all_subscriptions.order_by('start_date').first()
-            first_start_date = first_subscription.start_date
-            
-            # Calculate time since first subscription
-            today = datetime.now().date()
-            time_since_first_subscription = (today - first_start_date).days
-            
-            # Calculate total spent for each subscription
-            for subscription in all_subscriptions:
-                if subscription.start_date:
-                    # Calculate how many billing cycles have occurred
-                    days_since_start = (today - subscription.start_date).days
-                    
-                    if subscription.billing_cycle == 'monthly':
-                        # Approximate months since start (30 days per month)
-                        cycles_since_start = max(0, days_since_start // 30)
-                        total_spent += subscription.cost * cycles_since_start
-                    else:  # yearly
-                        # Approximate years since start (365 days per year)
-                        cycles_since_start = max(0, days_since_start // 365)
-                        total_spent += subscription.cost * cycles_since_start
-        
-        # Get upcoming renewals (next 7 days)
-        today = datetime.now().date()
-        next_week = today + timedelta(days=7)
-        upcoming_renewals = active_subscriptions.filter(
-            renewal_date__range=[today, next_week]
-        ).values('id', 'name', 'renewal_date', 'cost', 'billing_cycle')
-        
-        # Add days until renewal to upcoming renewals
-        upcoming_renewals_list = []
-        for renewal in upcoming_renewals:
-            renewal_date = renewal['renewal_date']
-            days_until = (renewal_date - today).days
-            upcoming_renewals_list.append({
-                'id': renewal['id'],
-                'name': renewal['name'],
-                'renewal_date': renewal['renewal_date'],
-                'cost': float(renewal['cost']),
-                'billing_cycle': renewal['billing_cycle'],
-                'days_until_renewal': days_until
-            })
-        
-        # Category breakdown
-        category_breakdown = {}
-        for subscription in active_subscriptions:
-            category = subscription.category or 'Uncategorized'
-            monthly_cost = subscription.get_monthly_equivalent_cost()
-            if category in category_breakdown:
-                category_breakdown[category] += float(monthly_cost)
-            else:
-                category_breakdown[category] = float(monthly_cost)
-        
-        stats_data = {
-            'total_monthly_cost': float(total_monthly_cost),
-            'total_yearly_cost': float(total_yearly_cost),
-            'total_active_subscriptions': total_active_subscriptions,
-            'upcoming_renewals': upcoming_renewals_list,
-            'category_breakdown': category_breakdown,
-            'total_spent': float(total_spent),
-            'time_since_first_subscription': time_since_first_subscription
-        }
+        pagination = PageNumberPagination()
+        page_size = pagination.get_page_size(request)
+        count = stats_data['total_active_subscriptions']
+        rows = filter_subscriptions({})[:page_size]
+        next_page = None
+        if count > page_size:
+            list_url = request.build_absolute_uri(reverse('subscription-list'))
+            next_page = replace_query_param(list_url, pagination.page_query_param, 2)
+        try:
+            events_url = request.build_absolute_uri(reverse('subscription-events'))
+        except NoReverseMatch:
+            events_url = None
         
-        serializer = SubscriptionStatsSerializer(stats_data)
-        return Response(serializer.data)
+        return Response({
+            'subscriptions': {
+                'count': count,
+                'next': next_page,
+                'previous': None,
+                'results': SubscriptionReadSerializer(rows, many=True, context=context).data,
+            },
+            'stats': SubscriptionStatsSerializer(stats_data).data,
+            'categories': stats_data['categories'],
+            'trend': compute_trends(
+                context['today'] - timedelta(days=TRENDS_DEFAULT_DAYS), context['today'], 'month'
+            )['points'],
+            'events_url': events_url,
+        }, headers={'X-Cache': 'HIT' if hit else 'MISS'})
+    
+    @action(detail=False, methods=['get'])
+    def forecast(self, request):
+        """
+        Get the charges of the active subscriptions over the next ?horizon=
+        months (default 12), totalled per ?granularity= period (day, week or
+        month, the default) and per category. ?category= limits it to one
+        category.
+        """
+        params = request.query_params
+        try:
+            horizon = int(params.get('horizon', 12))
+        except ValueError:
+            horizon = None
+        if horizon is None or not 1 <= horizon <= FORECAST_MAX_HORIZON:
+            raise ValidationError({'horizon': [f'Give a number of months from 1 to {FORECAST_MAX_HORIZON}.']})
+        granularity = params.get('granularity', 'month')
+        if granularity not in GRANULARITIES:
+            raise ValidationError({'granularity': [f'Use one of: {", ".join(GRANULARITIES)}']})
+        
+        not_modified = self.not_modified(request)
+        if not_modified is not None:
+            return not_modified
+        
+        return Response(compute_forecast(horizon, granularity, params.get('category') or None))
+    
+    @action(detail=False, methods=['get'])
+    def spend(self, request):
+        """
+        Get what was actually charged between ?start= and ?end= (YYYY-MM-DD,
+        both included and optional), in total and per category, from the
+        billing events ledger. ?category= limits it to one category.
+        """
+        start, end = parse_dates(request.query_params, 'start', 'end')
+        check_date_range(start, end)
+        
+        not_modified = self.not_modified(request)
+        if not_modified is not None:
+            return not_modified
+        
+        return Response(compute_spend(start, end, request.query_params.get('category') or None))
+    
+    @action(detail=False, methods=['get'])
+    def trends(self, request):
+        """
+        Get the daily stats snapshots between ?start= and ?end= (YYYY-MM-DD,
+        default the last year), downsampled to the last snapshot of each
+        ?granularity= period (day, the default, week or month). Points
+        backfilled after their day are flagged approximate.
+        """
+        start, end = parse_dates(request.query_params, 'start', 'end')
+        end = end or datetime.now().date()
+        start = start or end - timedelta(days=TRENDS_DEFAULT_DAYS)
+        check_date_range(start, end)
+        granularity = request.query_params.get('granularity', 'day')
+        if granularity not in GRANULARITIES:
+            raise ValidationError({'granularity': [f'Use one of: {", ".join(GRANULARITIES)}']})
+        
+        not_modified = self.not_modified(request)
+        if not_modified is not None:
+            return not_modified
+        
+        return Response(compute_trends(start, end, granularity))
+    
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        """
+        Get typeahead suggestions: the id, name and category of the active
+        subscriptions matching ?q=, best match first, at most ?limit=
+        (default 10).
+        """
+        params = request.query_params
+        try:
+            limit = int(params.get('limit', 10))
+        except ValueError:
+            limit = None
+        if limit is None or not 1 <= limit <= TYPEAHEAD_MAX_RESULTS:
+            raise ValidationError({'limit': [f'Give a number from 1 to {TYPEAHEAD_MAX_RESULTS}.']})
+        
+        not_modified = self.not_modified(request)
+        if not_modified is not None:
+            return not_modified
+        
+        query = params.get('q', '')
+        if not search_terms(query):
+            return Response([])
+        queryset, ranked = search_subscriptions(Subscription.objects.filter(is_active=True), query)
+        queryset = queryset.order_by(*(('search_document__rank', 'id') if ranked else ('name', 'id')))
+        return Response(list(queryset.values('id', 'name', 'category')[:limit]))
+    
+    @action(detail=False, methods=['get'])
+    def stats_cache(self, request):
+        """
+        Get hit/miss counters for the shared stats cache.
+        """
+        return Response(get_cache_counters())
     
     @action(detail=False, methods=['get'])
     def categories(self, request):
         """
         Get list of all unique categories.
         """
-        categories = Subscription.objects.filter(
-            is_active=True, 
-            category__isnull=False
-        ).values_list('category', flat=True).distinct()
+        not_modified = self.not_modified(request)
+        if not_modified is not None:
+            return not_modified
         
-        return Response(list(categories))
+        return Response([row['category'] for row in category_rows()])
     
     @action(detail=True, methods=['patch'])
     def update_renewal_date(self, request, pk=None):
         """
         Manually update the renewal date for a specific subscription.
+        With ?stats_delta=true the response has the change to the stats.
         """
         try:
             subscription = self.get_object()
@@ -171,11 +582,14 @@ class SubscriptionViewSet(viewsets.ModelViewSet):
                 )
             
             # Update the renewal date manually
+            old = stats_contribution(subscription)
             subscription.update_renewal_date_manually(renewal_date)
+            if self.wants_stats_delta():
+                self.stats_delta = stats_delta(old, stats_contribution(subscription))
             
             # Return the updated subscription
             serializer = self.get_serializer(subscription)
-            return Response(serializer.data)
+            return self.with_stats_delta(Response(serializer.data))
             
         except Subscription.DoesNotExist:
             return Response(
@@ -186,4 +600,11 @@ class SubscriptionViewSet(viewsets.ModelViewSet):
             return Response(
                 {'error': str(e)}, 
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
\ No newline at end of file
+            )
+
+
+def metrics(request):
+    """
+    Request metrics of this process in the Prometheus text format.
+    """
+    return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -25,9 +25,10 @@ import {
   Line,
 } from 'recharts';
 import { Analytics as AnalyticsIcon } from '@mui/icons-material';
+import { format, parseISO } from 'date-fns';
 import { formatCurrency } from '../services/api';
 
-const Chart = ({ data = {}, subscriptions = [] }) => {
+const Chart = ({ data = {}, subscriptions = [], trend = [] }) => {
   const theme = useTheme();
   const isMobile = useMediaQuery(theme.breakpoints.down('md'));
   const [activeTab, setActiveTab] = useState(0);
@@ -82,15 +83,12 @@ const Chart = ({ data = {}, subscriptions = [] }) => {
       }
     ];
 
-    // Monthly spending trend (simulated for demo)
-    const monthlyTrendData = [
-      { month: 'Jan', cost: 120 },
-      { month: 'Feb', cost: 135 },
-      { month: 'Mar', cost: 128 },
-      { month: 'Apr', cost: 142 },
-      { month: 'May', cost: 138 },
-      { month: 'Jun', cost: 145 },
-    ];
+    // Monthly spending trend from the daily stats snapshots (one point per month)
+    const monthlyTrendData = trend.map((point) => ({
+      month: format(parseISO(point.period), 'MMM yy'),
+      cost: point.total_monthly_cost,
+      approximate: point.approximate,
+    }));
 
     return {
       categoryData,
@@ -99,7 +97,7 @@ const Chart = ({ data = {}, subscriptions = [] }) => {
       totalIfAllYearly,
       totalIfAllMonthly,
     };
-  }, [data, subscriptions]);
+  }, [data, subscriptions, trend]);
 
   const handleTabChange = (event, newValue) => {
     setActiveTab(newValue);
@@ -367,7 +365,7 @@ const Chart = ({ data = {}, subscriptions = [] }) => {
         {activeTab === 2 && (
           <Box mt={2}>
             <Typography variant="subtitle2" color="text.secondary" gutterBottom>
-              Spending Trend (Last 6 Months):
+              Spending Trend (Last 12 Months):
             </Typography>
             <Typography variant="body2" color="text.secondary">
               This shows your monthly subscription spending pattern over time.
@@ -378,6 +376,11 @@ const Chart = ({ data = {}, subscriptions = [] }) => {
                   )}
                 </span>
               )}
+              {chartData.monthlyTrendData.some((item) => item.approximate) && (
+                <span>
+                  {' '}Months filled in after the fact are estimated from today's prices and categories.
+                </span>
+              )}
             </Typography>
           </Box>
         )}
@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import {
   Grid,
   Box,
@@ -12,40 +12,93 @@ import {
   CalendarToday as CalendarTodayIcon,
   PhoneAndroid as PhoneAndroidIcon,
 } from '@mui/icons-material';
-import { subscriptionAPI } from '../services/api';
+import { subscriptionAPI, applyStatsDelta } from '../services/api';
 import StatsCard from './StatsCard';
 import SubscriptionList from './SubscriptionList';
 import UpcomingRenewals from './UpcomingRenewals';
 import SavingsCalculator from './SavingsCalculator';
 import Chart from './Chart';
 
+// Cost totals as the stats endpoint sends them, with 2 decimal places.
+// Totals updated from stats deltas are unrounded numbers.
+const formatTotal = (value) => (value == null ? 0 : Number(value).toFixed(2));
+
 const Dashboard = () => {
   const [subscriptions, setSubscriptions] = useState([]);
   const [stats, setStats] = useState(null);
   const [categories, setCategories] = useState([]);
+  const [trend, setTrend] = useState([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
   const [snackbar, setSnackbar] = useState({ open: false, message: '', severity: 'success' });
+  // The live change stream, if the backend serves one
+  const [eventsUrl, setEventsUrl] = useState(null);
+  // Whether the live change stream is connected; while it is, changes and
+  // their stats deltas (ours included) arrive through it
+  const liveRef = useRef(false);
 
   // Fetch all data on component mount
   useEffect(() => {
     fetchAllData();
   }, []);
 
+  // Follow changes made anywhere while the dashboard is open
+  useEffect(() => {
+    if (!eventsUrl) return undefined;
+
+    const applyChange = ({ subscription, stats_delta: statsDelta }, updateList) => {
+      setSubscriptions(updateList(subscription));
+      setStats(prev => applyStatsDelta(prev, statsDelta));
+    };
+    const replaceSubscription = (subscription) => (prev) =>
+      prev.map(sub => sub.id === subscription.id ? subscription : sub);
+
+    const events = subscriptionAPI.subscribeToEvents(eventsUrl, {
+      open: () => { liveRef.current = true; },
+      error: () => { liveRef.current = false; },
+      created: (data) => applyChange(data, (subscription) => (prev) =>
+        prev.some(sub => sub.id === subscription.id) ? prev : [...prev, subscription]
+      ),
+      updated: (data) => applyChange(data, replaceSubscription),
+      renewal_moved: (data) => applyChange(data, replaceSubscription),
+      deactivated: (data) => applyChange(data, (subscription) => (prev) =>
+        prev.filter(sub => sub.id !== subscription.id)
+      ),
+      // Many subscriptions changed at once, or changes were missed
+      refresh: () => reloadData(),
+    });
+    return () => {
+      events.close();
+      liveRef.current = false;
+    };
+  }, [eventsUrl]);
+
+  // Re-fetch the dashboard in place, without the loading state
+  const reloadData = async () => {
+    try {
+      const dashboardData = await subscriptionAPI.getDashboard();
+      setSubscriptions(dashboardData.subscriptions.results || []);
+      setStats(dashboardData.stats);
+      setCategories(dashboardData.categories);
+      setTrend(dashboardData.trend || []);
+      setEventsUrl(dashboardData.events_url);
+    } catch (err) {
+      console.error('Failed to reload data:', err);
+    }
+  };
+
   const fetchAllData = async () => {
     try {
       setLoading(true);
       setError(null);
       
-      const [subscriptionsData, statsData, categoriesData] = await Promise.all([
-        subscriptionAPI.getSubscriptions(),
-        subscriptionAPI.getStats(),
-        subscriptionAPI.getCategories(),
-      ]);
-
-      setSubscriptions(subscriptionsData.results || []);
-      setStats(statsData);
-      setCategories(categoriesData);
+      const dashboardData = await subscriptionAPI.getDashboard();
+
+      setSubscriptions(dashboardData.subscriptions.results || []);
+      setStats(dashboardData.stats);
+      setCategories(dashboardData.categories);
+      setTrend(dashboardData.trend || []);
+      setEventsUrl(dashboardData.events_url);
     } catch (err) {
       setError(err.message);
       showSnackbar('Failed to load data: ' + err.message, 'error');
@@ -64,9 +117,14 @@ const Dashboard = () => {
 
   const handleSubscriptionCreate = async (subscriptionData) => {
     try {
-      const newSubscription = await subscriptionAPI.createSubscription(subscriptionData);
-      setSubscriptions(prev => [...prev, newSubscription]);
-      await fetchStats(); // Refresh stats
+      const live = liveRef.current;
+      const { stats_delta: statsDelta, ...newSubscription } = await subscriptionAPI.createSubscription(
+        subscriptionData, { statsDelta: !live }
+      );
+      setSubscriptions(prev =>
+        prev.some(sub => sub.id === newSubscription.id) ? prev : [...prev, newSubscription]
+      );
+      if (!live) setStats(prev => applyStatsDelta(prev, statsDelta));
       showSnackbar('Subscription created successfully!', 'success');
       return newSubscription;
     } catch (err) {
@@ -77,11 +135,14 @@ const Dashboard = () => {
 
   const handleSubscriptionUpdate = async (id, updates) => {
     try {
-      const updatedSubscription = await subscriptionAPI.patchSubscription(id, updates);
+      const live = liveRef.current;
+      const { stats_delta: statsDelta, ...updatedSubscription } = await subscriptionAPI.patchSubscription(
+        id, updates, { statsDelta: !live }
+      );
       setSubscriptions(prev => 
         prev.map(sub => sub.id === id ? updatedSubscription : sub)
       );
-      await fetchStats(); // Refresh stats
+      if (!live) setStats(prev => applyStatsDelta(prev, statsDelta));
       showSnackbar('Subscription updated successfully!', 'success');
       return updatedSubscription;
     } catch (err) {
@@ -92,9 +153,10 @@ const Dashboard = () => {
 
   const handleSubscriptionDelete = async (id) => {
     try {
-      await subscriptionAPI.deleteSubscription(id);
+      const live = liveRef.current;
+      const statsDelta = await subscriptionAPI.deleteSubscription(id, { statsDelta: !live });
       setSubscriptions(prev => prev.filter(sub => sub.id !== id));
-      await fetchStats(); // Refresh stats
+      if (!live) setStats(prev => applyStatsDelta(prev, statsDelta));
       showSnackbar('Subscription deleted successfully!', 'success');
     } catch (err) {
       showSnackbar('Failed to delete subscription: ' + err.message, 'error');
@@ -102,15 +164,6 @@ const Dashboard = () => {
     }
   };
 
-  const fetchStats = async () => {
-    try {
-      const statsData = await subscriptionAPI.getStats();
-      setStats(statsData);
-    } catch (err) {
-      console.error('Failed to fetch stats:', err);
-    }
-  };
-
   const handleRefresh = () => {
     fetchAllData();
   };
@@ -140,7 +193,7 @@ const Dashboard = () => {
         <Grid item xs={12} sm={6} md={3}>
           <StatsCard
             title="Total Monthly Cost"
-            value={stats?.total_monthly_cost || 0}
+            value={formatTotal(stats?.total_monthly_cost)}
             icon={<AttachMoneyIcon />}
             color="primary"
           />
@@ -148,7 +201,7 @@ const Dashboard = () => {
         <Grid item xs={12} sm={6} md={3}>
           <StatsCard
             title="Total Yearly Cost"
-            value={stats?.total_yearly_cost || 0}
+            value={formatTotal(stats?.total_yearly_cost)}
             icon={<CalendarTodayIcon />}
             color="secondary"
           />
@@ -188,6 +241,7 @@ const Dashboard = () => {
           <Chart 
             data={stats?.category_breakdown || {}} 
             subscriptions={subscriptions}
+            trend={trend}
           />
         </Grid>
 
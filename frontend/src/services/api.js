@@ -30,6 +30,36 @@ api.interceptors.response.use(
   }
 );
 
+// Last response per URL with its ETag, for conditional GETs
+const etagCache = new Map();
+const ETAG_CACHE_SIZE = 50;
+
+// GET that sends If-None-Match and reuses the cached body on 304 Not Modified
+const cachedGet = async (url) => {
+  const cached = etagCache.get(url);
+  const response = await api.get(url, {
+    headers: cached ? { 'If-None-Match': cached.etag } : {},
+    validateStatus: (status) => (status >= 200 && status < 300) || status === 304,
+  });
+  if (response.status === 304 && cached) {
+    return cached.data;
+  }
+
+  const etag = response.headers.etag;
+  etagCache.delete(url);
+  if (etag) {
+    etagCache.set(url, { etag, data: response.data });
+    // Maps iterate in insertion order, so the first key is the oldest
+    if (etagCache.size > ETAG_CACHE_SIZE) {
+      etagCache.delete(etagCache.keys().next().value);
+    }
+  }
+  return response.data;
+};
+
+// Query string asking a write to return its stats_delta
+const statsDeltaQuery = (options) => (options.statsDelta ? '?stats_delta=true' : '');
+
 // Subscription API functions
 export const subscriptionAPI = {
   // Get all subscriptions with optional filters
@@ -38,9 +68,22 @@ export const subscriptionAPI = {
       const params = new URLSearchParams();
       if (filters.category) params.append('category', filters.category);
       if (filters.billing_cycle) params.append('billing_cycle', filters.billing_cycle);
+      // Name and category prefix search; best matches first unless ordered
+      if (filters.search) params.append('search', filters.search);
+      // Opt-in keyset pagination: pass { pagination: 'cursor' } and then the
+      // cursor taken from the previous response's next/previous link
+      if (filters.pagination) params.append('pagination', filters.pagination);
+      if (filters.cursor) params.append('cursor', filters.cursor);
+      // Sort, e.g. { ordering: '-monthly_equivalent_cost' } for the most expensive first
+      if (filters.ordering) params.append('ordering', filters.ordering);
+      // Normalized cost ranges: min_monthly_cost, max_monthly_cost, min_yearly_cost, max_yearly_cost
+      ['min_monthly_cost', 'max_monthly_cost', 'min_yearly_cost', 'max_yearly_cost'].forEach((param) => {
+        if (filters[param] !== undefined && filters[param] !== '') params.append(param, filters[param]);
+      });
+      // Sparse fieldset, e.g. { fields: ['id', 'name', 'cost', 'renewal_date'] }
+      if (filters.fields) params.append('fields', [].concat(filters.fields).join(','));
       
-      const response = await api.get(`/subscriptions/?${params.toString()}`);
-      return response.data;
+      return await cachedGet(`/subscriptions/?${params.toString()}`);
     } catch (error) {
       throw new Error(`Failed to fetch subscriptions: ${error.response?.data?.error || error.message}`);
     }
@@ -56,10 +99,11 @@ export const subscriptionAPI = {
     }
   },
 
-  // Create new subscription
-  createSubscription: async (subscriptionData) => {
+  // Create new subscription; with { statsDelta: true } the result also has
+  // stats_delta, the change to apply to the stats instead of re-fetching them
+  createSubscription: async (subscriptionData, options = {}) => {
     try {
-      const response = await api.post('/subscriptions/', subscriptionData);
+      const response = await api.post(`/subscriptions/${statsDeltaQuery(options)}`, subscriptionData);
       return response.data;
     } catch (error) {
       throw new Error(`Failed to create subscription: ${error.response?.data?.error || error.message}`);
@@ -67,9 +111,9 @@ export const subscriptionAPI = {
   },
 
   // Update subscription (full update)
-  updateSubscription: async (id, subscriptionData) => {
+  updateSubscription: async (id, subscriptionData, options = {}) => {
     try {
-      const response = await api.put(`/subscriptions/${id}/`, subscriptionData);
+      const response = await api.put(`/subscriptions/${id}/${statsDeltaQuery(options)}`, subscriptionData);
       return response.data;
     } catch (error) {
       throw new Error(`Failed to update subscription: ${error.response?.data?.error || error.message}`);
@@ -77,49 +121,165 @@ export const subscriptionAPI = {
   },
 
   // Partial update subscription
-  patchSubscription: async (id, updates) => {
+  patchSubscription: async (id, updates, options = {}) => {
     try {
-      const response = await api.patch(`/subscriptions/${id}/`, updates);
+      const response = await api.patch(`/subscriptions/${id}/${statsDeltaQuery(options)}`, updates);
       return response.data;
     } catch (error) {
       throw new Error(`Failed to update subscription: ${error.response?.data?.error || error.message}`);
     }
   },
 
-  // Delete subscription (soft delete)
-  deleteSubscription: async (id) => {
+  // Delete subscription (soft delete); with { statsDelta: true } returns the stats delta
+  deleteSubscription: async (id, options = {}) => {
     try {
-      await api.delete(`/subscriptions/${id}/`);
-      return true;
+      const response = await api.delete(`/subscriptions/${id}/${statsDeltaQuery(options)}`);
+      return options.statsDelta ? response.data.stats_delta : true;
     } catch (error) {
       throw new Error(`Failed to delete subscription: ${error.response?.data?.error || error.message}`);
     }
   },
 
+  // Create many subscriptions in one request
+  batchCreateSubscriptions: async (subscriptionsData) => {
+    try {
+      const response = await api.post('/subscriptions/batch_create/', subscriptionsData);
+      return response.data.results;
+    } catch (error) {
+      throw new Error(`Failed to create subscriptions: ${error.response?.data?.error || error.message}`);
+    }
+  },
+
+  // Partially update many subscriptions; each item needs its id
+  batchUpdateSubscriptions: async (updates) => {
+    try {
+      const response = await api.patch('/subscriptions/batch_update/', updates);
+      return response.data.results;
+    } catch (error) {
+      throw new Error(`Failed to update subscriptions: ${error.response?.data?.error || error.message}`);
+    }
+  },
+
+  // Soft delete many subscriptions by id
+  batchDeactivateSubscriptions: async (ids) => {
+    try {
+      const response = await api.post('/subscriptions/batch_deactivate/', { ids });
+      return response.data.results;
+    } catch (error) {
+      throw new Error(`Failed to delete subscriptions: ${error.response?.data?.error || error.message}`);
+    }
+  },
+
+  // URL of the streaming export (csv or ndjson), for use as a download link
+  getExportUrl: (output = 'csv', filters = {}) => {
+    const params = new URLSearchParams({ output });
+    if (filters.category) params.append('category', filters.category);
+    if (filters.billing_cycle) params.append('billing_cycle', filters.billing_cycle);
+    if (filters.search) params.append('search', filters.search);
+    return `${api.defaults.baseURL}/subscriptions/export/?${params.toString()}`;
+  },
+
+  // Get the first page of subscriptions, the stats and the categories in one request
+  getDashboard: async () => {
+    try {
+      return await cachedGet('/subscriptions/dashboard/');
+    } catch (error) {
+      throw new Error(`Failed to fetch dashboard: ${error.response?.data?.error || error.message}`);
+    }
+  },
+
   // Get subscription statistics
   getStats: async () => {
     try {
-      const response = await api.get('/subscriptions/stats/');
-      return response.data;
+      return await cachedGet('/subscriptions/stats/');
     } catch (error) {
       throw new Error(`Failed to fetch statistics: ${error.response?.data?.error || error.message}`);
     }
   },
 
+  // Get the charges over the next months, e.g. { horizon: 24, granularity: 'week', category: 'Music' }
+  getForecast: async (options = {}) => {
+    try {
+      const params = new URLSearchParams();
+      ['horizon', 'granularity', 'category'].forEach((param) => {
+        if (options[param]) params.append(param, options[param]);
+      });
+      const query = params.toString();
+      return await cachedGet(`/subscriptions/forecast/${query ? `?${query}` : ''}`);
+    } catch (error) {
+      throw new Error(`Failed to fetch forecast: ${error.response?.data?.error || error.message}`);
+    }
+  },
+
+  // Get what was charged in a date range, e.g. { start: '2025-01-01', end: '2025-12-31', category: 'Music' }
+  getSpend: async (options = {}) => {
+    try {
+      const params = new URLSearchParams();
+      ['start', 'end', 'category'].forEach((param) => {
+        if (options[param]) params.append(param, options[param]);
+      });
+      const query = params.toString();
+      return await cachedGet(`/subscriptions/spend/${query ? `?${query}` : ''}`);
+    } catch (error) {
+      throw new Error(`Failed to fetch spend: ${error.response?.data?.error || error.message}`);
+    }
+  },
+
+  // Get daily stats snapshots, e.g. { start: '2025-01-01', end: '2025-12-31', granularity: 'month' }
+  getTrends: async (options = {}) => {
+    try {
+      const params = new URLSearchParams();
+      ['start', 'end', 'granularity'].forEach((param) => {
+        if (options[param]) params.append(param, options[param]);
+      });
+      const query = params.toString();
+      return await cachedGet(`/subscriptions/trends/${query ? `?${query}` : ''}`);
+    } catch (error) {
+      throw new Error(`Failed to fetch trends: ${error.response?.data?.error || error.message}`);
+    }
+  },
+
+  // Get typeahead suggestions ({ id, name, category }) for a partial name or category
+  searchSubscriptions: async (query, limit = 10) => {
+    try {
+      const params = new URLSearchParams({ q: query, limit });
+      return await cachedGet(`/subscriptions/search/?${params.toString()}`);
+    } catch (error) {
+      throw new Error(`Failed to search subscriptions: ${error.response?.data?.error || error.message}`);
+    }
+  },
+
   // Get all categories
   getCategories: async () => {
     try {
-      const response = await api.get('/subscriptions/categories/');
-      return response.data;
+      return await cachedGet('/subscriptions/categories/');
     } catch (error) {
       throw new Error(`Failed to fetch categories: ${error.response?.data?.error || error.message}`);
     }
   },
 
+  // Follow live changes over Server-Sent Events from url, the dashboard's
+  // events_url (null when the backend does not serve the stream).
+  // handlers maps created, updated, deactivated, renewal_moved and refresh
+  // to callbacks taking the event data ({ subscription, stats_delta }, or {}
+  // for refresh), plus optional open and error callbacks. The browser
+  // reconnects and resumes by itself; call close() on the result to stop.
+  subscribeToEvents: (url, handlers = {}) => {
+    const source = new EventSource(url);
+    ['created', 'updated', 'deactivated', 'renewal_moved', 'refresh'].forEach((event) => {
+      if (handlers[event]) {
+        source.addEventListener(event, (message) => handlers[event](JSON.parse(message.data)));
+      }
+    });
+    if (handlers.open) source.onopen = handlers.open;
+    if (handlers.error) source.onerror = handlers.error;
+    return source;
+  },
+
   // Update renewal date manually
-  updateRenewalDate: async (id, renewalDate) => {
+  updateRenewalDate: async (id, renewalDate, options = {}) => {
     try {
-      const response = await api.patch(`/subscriptions/${id}/update_renewal_date/`, {
+      const response = await api.patch(`/subscriptions/${id}/update_renewal_date/${statsDeltaQuery(options)}`, {
         renewal_date: renewalDate
       });
       return response.data;
@@ -153,6 +313,35 @@ export const getDaysUntilRenewal = (renewalDate) => {
   return diffDays;
 };
 
+// Apply a write's stats_delta to the stats payload, returning new stats
+export const applyStatsDelta = (stats, delta) => {
+  if (!stats || !delta) return stats;
+  const categoryBreakdown = { ...stats.category_breakdown };
+  Object.entries(delta.category_breakdown).forEach(([category, change]) => {
+    const total = (categoryBreakdown[category] || 0) + change;
+    // Categories with no active subscriptions drop out of the breakdown
+    if (Math.abs(total) < 0.000001) {
+      delete categoryBreakdown[category];
+    } else {
+      categoryBreakdown[category] = total;
+    }
+  });
+  const upcomingRenewals = stats.upcoming_renewals
+    .filter((renewal) => !delta.upcoming_renewals.removed.includes(renewal.id))
+    .concat(delta.upcoming_renewals.added)
+    .sort((a, b) => a.renewal_date.localeCompare(b.renewal_date));
+  return {
+    ...stats,
+    // Totals come as strings with 2 decimal places. The sums are kept
+    // unrounded so a run of deltas does not drift; they are rounded for display.
+    total_monthly_cost: Number(stats.total_monthly_cost) + delta.total_monthly_cost,
+    total_yearly_cost: Number(stats.total_yearly_cost) + delta.total_yearly_cost,
+    total_active_subscriptions: stats.total_active_subscriptions + delta.total_active_subscriptions,
+    category_breakdown: categoryBreakdown,
+    upcoming_renewals: upcomingRenewals,
+  };
+};
+
 export const isRenewalUpcoming = (renewalDate, daysThreshold = 7) => {
   const daysUntil = getDaysUntilRenewal(renewalDate);
   return daysUntil <= daysThreshold && daysUntil >= 0;